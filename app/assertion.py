@@ -27,7 +27,7 @@ def enforce_assertion_boundaries(stmts: List[FILStatement]) -> List[FILStatement
                     text=reason,
                     primary_sources=s.primary_sources,
                     secondary_sources=s.secondary_sources,
-                    metadata={"blocked_original": s.text, "rule": "STOPLINE_GUARD"},
+                    metadata={**(s.metadata or {}), "blocked_original": s.text, "rule": "STOPLINE_GUARD"},
                 )
             )
             continue
@@ -0,0 +1,381 @@
+from __future__ import annotations
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app import timing
+from app.db import connect, init_db
+
+# -----------------------------
+# Benchmark defaults
+# -----------------------------
+SIZES = (100, 1000)       # files per synthetic corpus
+SEED = 1337
+PDF_SHARE = 0.15          # fraction of files generated as PDFs
+IMAGE_SHARE = 0.05        # fraction rendered as page images (needs tesseract)
+PDF_PAGES = (2, 12)       # min/max pages per generated PDF
+LINES_PER_PAGE = 40
+DUPLICATE_SHARE = 0.02    # pages repeated verbatim, exercises content-hash dedupe
+
+FIRST = ["James", "Maria", "Robert", "Linda", "Michael", "Sarah", "David", "Ghislaine",
+         "Thomas", "Elena", "Richard", "Nadia", "William", "Lesley", "Jean", "Adriana"]
+LAST = ["Walker", "Brunel", "Epstein", "Kellen", "Marcinkova", "Dubin", "Staley", "Groff",
+        "Maxwell", "Wexner", "Black", "Indyke", "Kahn", "Visoski", "Rodgers", "Alessi"]
+ORGS = ["Southern Trust Company", "Financial Trust Company", "JEGE Inc", "Hyperion Air",
+        "Plan D LLC", "Butterfly Trust", "Gratitude America", "Zorro Management"]
+PLACES = ["Palm Beach", "New York", "Santa Fe", "Paris", "London", "St. Thomas",
+          "Little St. James", "Teterboro", "Columbus", "Stanley"]
+DOMAINS = ["gmail.com", "yahoo.com", "mindspring.com", "jeevacation.com", "aol.com"]
+VERBS = ["met with", "flew to", "wired funds to", "called", "emailed", "signed for",
+         "arranged travel for", "was copied on a note to"]
+FILLER = (
+    "The following record was produced in response to the subpoena and is reproduced "
+    "without alteration. Handwritten annotations appear in the margin of the original. "
+    "Portions of this page were redacted by the producing party prior to release."
+).split()
+
+
+# -----------------------------
+# Synthetic content
+# -----------------------------
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+
+
+def _email(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST).lower()}.{rng.choice(LAST).lower()}@{rng.choice(DOMAINS)}"
+
+
+def _phone(rng: random.Random) -> str:
+    return f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+
+
+def _tail_number(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return f"N{rng.randint(1, 99999)}"
+    letters = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+    return f"N{rng.randint(1, 999)}{rng.choice(letters)}{rng.choice(letters)}"
+
+
+def _line(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.30:
+        return (f"On {rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(1995, 2019)} "
+                f"{_person(rng)} {rng.choice(VERBS)} {_person(rng)} in {rng.choice(PLACES)}.")
+    if kind < 0.45:
+        return f"From: {_person(rng)} <{_email(rng)}> To: {_email(rng)} Subject: {rng.choice(PLACES)}"
+    if kind < 0.55:
+        return f"Call {_person(rng)} at {_phone(rng)} re {rng.choice(ORGS)}."
+    if kind < 0.65:
+        return (f"Aircraft {_tail_number(rng)} departed {rng.choice(PLACES)} with "
+                f"{_person(rng)} and {_person(rng)} on board.")
+    if kind < 0.70:
+        return f"Vessel IMO {rng.randint(1000000, 9999999)} registered to {rng.choice(ORGS)}."
+    return " ".join(rng.choice(FILLER) for _ in range(rng.randint(8, 16)))
+
+
+def synthetic_page(rng: random.Random, lines: int = LINES_PER_PAGE) -> str:
+    """One page of deposition/log-style text with names, emails, phones and tail numbers."""
+    return "\n".join(_line(rng) for _ in range(lines))
+
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: List[str]):
+    """Minimal text-layer PDF (Helvetica, one line per text row); no PDF library needed."""
+    n = len(pages)
+    objs: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>"
+         % (" ".join(f"{4 + 2 * i} 0 R" for i in range(n)), n)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        rows = [f"({_pdf_escape(r)}) '" for r in text.splitlines()]
+        stream = ("BT /F1 9 Tf 11 TL 36 770 Td\n" + "\n".join(rows) + "\nET").encode("latin-1", "replace")
+        objs.append(
+            ("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+             "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)).encode()
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def render_page_image(path: Path, text: str, width: int = 1275, height: int = 1650):
+    """Renders text onto a white letter-size page (150 dpi) for the OCR path."""
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.load_default(size=22)
+    except TypeError:  # Pillow < 10.1
+        font = ImageFont.load_default()
+    y = 60
+    for row in text.splitlines():
+        draw.text((60, y), row, fill=0, font=font)
+        y += 34
+        if y > height - 60:
+            break
+    img.save(path)
+
+
+def generate_corpus(
+    out_dir: Path,
+    files: int,
+    seed: int = SEED,
+    pdf_share: float = PDF_SHARE,
+    image_share: float = IMAGE_SHARE,
+) -> Dict[str, int]:
+    """Writes a reproducible mix of .txt, .pdf and .png files; returns counts by kind."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {"text": 0, "pdf": 0, "image": 0, "pages": 0}
+    seen: List[str] = []
+
+    def page() -> str:
+        if seen and rng.random() < DUPLICATE_SHARE:
+            return rng.choice(seen)
+        text = synthetic_page(rng)
+        seen.append(text)
+        return text
+
+    for n in range(files):
+        stem = f"SYNTH_{n:07d}"
+        r = rng.random()
+        if r < pdf_share:
+            pages = [page() for _ in range(rng.randint(*PDF_PAGES))]
+            write_pdf(out_dir / f"{stem}.pdf", pages)
+            counts["pdf"] += 1
+            counts["pages"] += len(pages)
+        elif r < pdf_share + image_share:
+            render_page_image(out_dir / f"{stem}.png", page())
+            counts["image"] += 1
+            counts["pages"] += 1
+        else:
+            (out_dir / f"{stem}.txt").write_text(page(), encoding="utf-8")
+            counts["text"] += 1
+            counts["pages"] += 1
+    return counts
+
+
+# -----------------------------
+# Benchmark runs
+# -----------------------------
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> Dict[str, object]:
+    from app.ingest import NLP
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "spacy_model": NLP.meta.get("name") if NLP is not None else None,
+        "tesseract": shutil.which("tesseract") is not None,
+        "pdftotext": shutil.which("pdftotext") is not None,
+    }
+
+
+def _db_counts(db_path: Path) -> Dict[str, int]:
+    conn = connect(db_path)
+    try:
+        return {
+            t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            for t in ("documents", "entities", "doc_entities", "assets", "doc_assets")
+        }
+    finally:
+        conn.close()
+
+
+def run_ingest(raw_dir: Path, db_path: Path, mode: str = "serial", workers: int = 4,
+               pdf_engine: str = "pdfplumber", ocr_workers: int = 0) -> Dict[str, object]:
+    """
+    Ingests raw_dir into a fresh db_path and returns wall time, rates and stage breakdown.
+    With ocr_workers > 0 (serial mode) the "ocr" stage is the OCR time summed
+    over the pool workers, so it can exceed its share of the wall time.
+    """
+    from app.ingest import ingest_all
+    from app.pipeline import ingest_pipeline
+
+    if db_path.exists():
+        db_path.unlink()
+    init_db(db_path)
+    files = sum(1 for p in raw_dir.rglob("*") if p.is_file())
+
+    timing.reset()
+    timing.enable(True)
+    t0 = time.perf_counter()
+    pipeline_stages = None
+    try:
+        if mode == "pipeline":
+            report = ingest_pipeline(raw_dir, db_path, workers=workers, pdf_engine=pdf_engine)
+            pipeline_stages = [s.to_dict() for s in report.stages]
+        else:
+            ingest_all(raw_dir, db_path, ocr_workers=ocr_workers, pdf_engine=pdf_engine)
+    finally:
+        wall = time.perf_counter() - t0
+        timing.enable(False)
+
+    counts = _db_counts(db_path)
+    stages = timing.snapshot()
+    accounted = sum(s["seconds"] for s in stages.values())
+    result: Dict[str, object] = {
+        "mode": mode,
+        "ocr_workers": ocr_workers if mode == "serial" else 0,
+        "files": files,
+        "pages": counts["documents"],
+        "wall_seconds": round(wall, 3),
+        "docs_per_second": round(files / wall, 2) if wall > 0 else 0.0,
+        "pages_per_second": round(counts["documents"] / wall, 2) if wall > 0 else 0.0,
+        "stages": stages,
+        "other_seconds": round(max(0.0, wall - accounted), 3),
+        "db": counts,
+        "db_bytes": db_path.stat().st_size,
+    }
+    if pipeline_stages is not None:
+        # stage timers only see this process; extraction ran in the worker pool
+        result["pipeline_stages"] = pipeline_stages
+    return result
+
+
+def run_benchmark(
+    sizes=SIZES,
+    seed: int = SEED,
+    mode: str = "serial",
+    workers: int = 4,
+    pdf_engine: str = "pdfplumber",
+    images: Optional[bool] = None,
+    work_dir: Optional[Path] = None,
+    keep: bool = False,
+    ocr_workers: int = 0,
+) -> Dict[str, object]:
+    """
+    Generates one synthetic corpus per size and ingests it into a fresh
+    database. Images are only generated when tesseract is installed
+    (images=None), so results stay comparable across machines without it.
+    """
+    env = environment()
+    if images is None:
+        images = bool(env["tesseract"])
+    base = Path(tempfile.mkdtemp(prefix="forensic-bench-", dir=work_dir))
+    runs = []
+    try:
+        for size in sizes:
+            raw = base / f"corpus_{size}"
+            t0 = time.perf_counter()
+            corpus = generate_corpus(raw, int(size), seed=seed, image_share=IMAGE_SHARE if images else 0.0)
+            gen_seconds = time.perf_counter() - t0
+            result = run_ingest(
+                raw, base / f"bench_{size}.db", mode=mode, workers=workers, pdf_engine=pdf_engine,
+                ocr_workers=ocr_workers,
+            )
+            result["size"] = int(size)
+            result["corpus"] = corpus
+            result["generate_seconds"] = round(gen_seconds, 3)
+            runs.append(result)
+    finally:
+        if not keep:
+            shutil.rmtree(base, ignore_errors=True)
+    return {"environment": env, "seed": seed, "runs": runs}
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object]) -> List[str]:
+    """Per-size pages/sec and stage-time ratios against an earlier results file."""
+    base_runs = {(r["size"], r["mode"]): r for r in baseline.get("runs", [])}
+    lines = []
+    for r in current.get("runs", []):
+        b = base_runs.get((r["size"], r["mode"]))
+        if b is None:
+            continue
+        speedup = r["pages_per_second"] / b["pages_per_second"] if b["pages_per_second"] else 0.0
+        lines.append(f"size={r['size']} {r['mode']}: {b['pages_per_second']:.1f} -> "
+                     f"{r['pages_per_second']:.1f} pages/s ({speedup:.2f}x)")
+        for name, st in r["stages"].items():
+            old = b["stages"].get(name, {}).get("seconds")
+            if old:
+                lines.append(f"  {name:<8} {old:.3f}s -> {st['seconds']:.3f}s ({st['seconds'] / old:.2f}x)")
+    return lines
+
+
+def format_results(results: Dict[str, object]) -> str:
+    lines = []
+    for r in results["runs"]:
+        lines.append(
+            f"size={r['size']:<7} mode={r['mode']:<8} files={r['files']:<7} pages={r['pages']:<7} "
+            f"wall={r['wall_seconds']:.2f}s  {r['docs_per_second']:.1f} docs/s  {r['pages_per_second']:.1f} pages/s"
+        )
+        for name, st in r["stages"].items():
+            lines.append(f"  {name:<8} {st['seconds']:>9.3f}s  calls={st['calls']}")
+        lines.append(f"  {'other':<8} {r['other_seconds']:>9.3f}s")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Offline ingest benchmark on synthetic corpora.")
+    ap.add_argument("--sizes", default=",".join(str(s) for s in SIZES),
+                    help="comma-separated corpus sizes in files (default: %(default)s)")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--mode", choices=["serial", "pipeline"], default="serial")
+    ap.add_argument("--workers", type=int, default=4, help="extractor processes for --mode pipeline")
+    ap.add_argument("--ocr-workers", type=int, default=0, help="OCR processes for --mode serial (0 = inline)")
+    ap.add_argument("--pdf-engine", choices=["pdfplumber", "pdftotext"], default="pdfplumber")
+    ap.add_argument("--images", action=argparse.BooleanOptionalAction, default=None,
+                    help="include rendered page images (default: only when tesseract is installed)")
+    ap.add_argument("--work-dir", type=Path, default=None, help="where corpora and databases are built")
+    ap.add_argument("--keep", action="store_true", help="keep generated corpora and databases")
+    ap.add_argument("--out", type=Path, default=None, help="write JSON results here")
+    ap.add_argument("--compare", type=Path, default=None, help="earlier JSON results to compare against")
+    args = ap.parse_args()
+
+    results = run_benchmark(
+        sizes=[int(s) for s in args.sizes.split(",") if s.strip()],
+        seed=args.seed, mode=args.mode, workers=args.workers, pdf_engine=args.pdf_engine,
+        images=args.images, work_dir=args.work_dir, keep=args.keep, ocr_workers=args.ocr_workers,
+    )
+    print(format_results(results), file=sys.stderr)
+    if args.compare is not None:
+        for line in compare(results, json.loads(args.compare.read_text())):
+            print(line, file=sys.stderr)
+
+    payload = json.dumps(results, indent=2)
+    if args.out is not None:
+        args.out.write_text(payload + "\n")
+    else:
+        print(payload)
@@ -1,5 +1,200 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict
+
+# Keep documents_fts in sync row by row (incremental ingest).
+# Bulk loads drop these and rebuild the index once at the end.
+FTS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+  INSERT INTO documents_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+  INSERT INTO documents_fts(documents_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+  INSERT INTO documents_fts(documents_fts, rowid, content) VALUES ('delete', old.id, old.content);
+  INSERT INTO documents_fts(rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+# Keep entity_stats / asset_stats in step with doc_entities / doc_assets
+# (inserts, ON CONFLICT count updates, and cascaded deletes when a file is replaced).
+# Bulk loads drop these and recompute both tables once at the end.
+STATS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS doc_entities_stats_ai AFTER INSERT ON doc_entities BEGIN
+  INSERT INTO entity_stats(entity_id, label, total, docs)
+  VALUES (new.entity_id, (SELECT label FROM entities WHERE id = new.entity_id), new.count, 1)
+  ON CONFLICT(entity_id) DO UPDATE SET total = total + excluded.total, docs = docs + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS doc_entities_stats_au AFTER UPDATE OF count ON doc_entities BEGIN
+  UPDATE entity_stats SET total = total + new.count - old.count WHERE entity_id = new.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS doc_entities_stats_ad AFTER DELETE ON doc_entities BEGIN
+  UPDATE entity_stats SET total = total - old.count, docs = docs - 1 WHERE entity_id = old.entity_id;
+  DELETE FROM entity_stats WHERE entity_id = old.entity_id AND docs <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS doc_assets_stats_ai AFTER INSERT ON doc_assets BEGIN
+  INSERT INTO asset_stats(asset_id, asset_type, total, docs)
+  VALUES (new.asset_id, (SELECT asset_type FROM assets WHERE id = new.asset_id), new.count, 1)
+  ON CONFLICT(asset_id) DO UPDATE SET total = total + excluded.total, docs = docs + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS doc_assets_stats_au AFTER UPDATE OF count ON doc_assets BEGIN
+  UPDATE asset_stats SET total = total + new.count - old.count WHERE asset_id = new.asset_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS doc_assets_stats_ad AFTER DELETE ON doc_assets BEGIN
+  UPDATE asset_stats SET total = total - old.count, docs = docs - 1 WHERE asset_id = old.asset_id;
+  DELETE FROM asset_stats WHERE asset_id = old.asset_id AND docs <= 0;
+END;
+"""
+
+STATS_TRIGGER_NAMES = (
+    "doc_entities_stats_ai", "doc_entities_stats_au", "doc_entities_stats_ad",
+    "doc_assets_stats_ai", "doc_assets_stats_au", "doc_assets_stats_ad",
+)
+
+# PERSON/ORG co-occurrence scopes: scope -> (context table, link table, link column).
+# Entities are keyed by their normalized text, so a PERSON and an ORG row with the
+# same normalized form count as one term (the way app.pdd has always counted them).
+COOC_SCOPES = {
+    "DOCS": ("documents", "doc_entities", "doc_id"),
+    "EVENTS": ("events", "event_entities", "event_id"),
+}
+
+# Per scope: a link adds its term to the context's marginal and pairs it with every
+# other term already there, unless the context already had that term (through an
+# entity with the same normalized text). Deletes undo the same. Pairs are stored in
+# both orders so the partners of one term are a single index range.
+_COOC_TRIGGER_TEMPLATE = """
+CREATE TRIGGER IF NOT EXISTS {links}_cooc_ai AFTER INSERT ON {links}
+WHEN (SELECT label FROM entities WHERE id = new.entity_id) IN ('PERSON','ORG')
+ AND NOT EXISTS (
+    SELECT 1 FROM {links} l JOIN entities e ON e.id = l.entity_id
+    WHERE l.{col} = new.{col} AND l.entity_id != new.entity_id AND e.label IN ('PERSON','ORG')
+      AND e.normalized = (SELECT normalized FROM entities WHERE id = new.entity_id))
+BEGIN
+  INSERT OR IGNORE INTO cooc_terms(normalized) SELECT normalized FROM entities WHERE id = new.entity_id;
+  INSERT INTO cooc_marginals(scope, term_id, n)
+  SELECT '{scope}', t.id, 1 FROM cooc_terms t
+  WHERE t.normalized = (SELECT normalized FROM entities WHERE id = new.entity_id)
+  ON CONFLICT(scope, term_id) DO UPDATE SET n = n + 1;
+  INSERT INTO cooc_pairs(scope, term_a, term_b, n)
+  SELECT '{scope}', x.id, o.term_id, 1 FROM cooc_terms x, (
+    SELECT DISTINCT t.id AS term_id FROM {links} l
+    JOIN entities e ON e.id = l.entity_id JOIN cooc_terms t ON t.normalized = e.normalized
+    WHERE l.{col} = new.{col} AND e.label IN ('PERSON','ORG')) o
+  WHERE x.normalized = (SELECT normalized FROM entities WHERE id = new.entity_id) AND o.term_id != x.id
+  ON CONFLICT(scope, term_a, term_b) DO UPDATE SET n = n + 1;
+  INSERT INTO cooc_pairs(scope, term_a, term_b, n)
+  SELECT '{scope}', o.term_id, x.id, 1 FROM cooc_terms x, (
+    SELECT DISTINCT t.id AS term_id FROM {links} l
+    JOIN entities e ON e.id = l.entity_id JOIN cooc_terms t ON t.normalized = e.normalized
+    WHERE l.{col} = new.{col} AND e.label IN ('PERSON','ORG')) o
+  WHERE x.normalized = (SELECT normalized FROM entities WHERE id = new.entity_id) AND o.term_id != x.id
+  ON CONFLICT(scope, term_a, term_b) DO UPDATE SET n = n + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS {links}_cooc_ad AFTER DELETE ON {links}
+WHEN (SELECT label FROM entities WHERE id = old.entity_id) IN ('PERSON','ORG')
+ AND NOT EXISTS (
+    SELECT 1 FROM {links} l JOIN entities e ON e.id = l.entity_id
+    WHERE l.{col} = old.{col} AND e.label IN ('PERSON','ORG')
+      AND e.normalized = (SELECT normalized FROM entities WHERE id = old.entity_id))
+BEGIN
+  UPDATE cooc_marginals SET n = n - 1
+  WHERE scope = '{scope}' AND term_id = (SELECT t.id FROM cooc_terms t JOIN entities e ON e.normalized = t.normalized WHERE e.id = old.entity_id);
+  DELETE FROM cooc_marginals
+  WHERE scope = '{scope}' AND term_id = (SELECT t.id FROM cooc_terms t JOIN entities e ON e.normalized = t.normalized WHERE e.id = old.entity_id) AND n <= 0;
+  UPDATE cooc_pairs SET n = n - 1
+  WHERE scope = '{scope}' AND term_a = (SELECT t.id FROM cooc_terms t JOIN entities e ON e.normalized = t.normalized WHERE e.id = old.entity_id)
+    AND term_b IN (
+      SELECT t.id FROM {links} l
+      JOIN entities e ON e.id = l.entity_id JOIN cooc_terms t ON t.normalized = e.normalized
+      WHERE l.{col} = old.{col} AND e.label IN ('PERSON','ORG'));
+  UPDATE cooc_pairs SET n = n - 1
+  WHERE scope = '{scope}' AND term_b = (SELECT t.id FROM cooc_terms t JOIN entities e ON e.normalized = t.normalized WHERE e.id = old.entity_id)
+    AND term_a IN (
+      SELECT t.id FROM {links} l
+      JOIN entities e ON e.id = l.entity_id JOIN cooc_terms t ON t.normalized = e.normalized
+      WHERE l.{col} = old.{col} AND e.label IN ('PERSON','ORG'));
+  DELETE FROM cooc_pairs
+  WHERE scope = '{scope}' AND term_b = (SELECT t.id FROM cooc_terms t JOIN entities e ON e.normalized = t.normalized WHERE e.id = old.entity_id)
+    AND term_a IN (SELECT term_b FROM cooc_pairs WHERE scope = '{scope}' AND term_a = (SELECT t.id FROM cooc_terms t JOIN entities e ON e.normalized = t.normalized WHERE e.id = old.entity_id) AND n <= 0);
+  DELETE FROM cooc_pairs WHERE scope = '{scope}' AND term_a = (SELECT t.id FROM cooc_terms t JOIN entities e ON e.normalized = t.normalized WHERE e.id = old.entity_id) AND n <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_cooc_ai AFTER INSERT ON {table} BEGIN
+  INSERT INTO cooc_totals(scope, n) VALUES ('{scope}', 1)
+  ON CONFLICT(scope) DO UPDATE SET n = n + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_cooc_ad AFTER DELETE ON {table} BEGIN
+  UPDATE cooc_totals SET n = n - 1 WHERE scope = '{scope}';
+END;
+"""
+
+COOC_TRIGGERS = "".join(
+    _COOC_TRIGGER_TEMPLATE.format(scope=scope, table=table, links=links, col=col)
+    for scope, (table, links, col) in COOC_SCOPES.items()
+)
+
+COOC_TRIGGER_NAMES = tuple(
+    f"{name}_cooc_{op}"
+    for table, links, _ in COOC_SCOPES.values()
+    for name in (links, table)
+    for op in ("ai", "ad")
+)
+
+# Optional substring index over the same rows (trigram tokenizer, SQLite >= 3.34).
+# Not part of SCHEMA: created by enable_trigram_index() and kept in sync by its own triggers.
+TRIGRAM_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_trigram
+USING fts5(
+  content,
+  content='documents',
+  content_rowid='id',
+  tokenize='trigram'
+);
+"""
+
+TRIGRAM_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS documents_tri_ai AFTER INSERT ON documents BEGIN
+  INSERT INTO documents_trigram(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_tri_ad AFTER DELETE ON documents BEGIN
+  INSERT INTO documents_trigram(documents_trigram, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_tri_au AFTER UPDATE ON documents BEGIN
+  INSERT INTO documents_trigram(documents_trigram, rowid, content) VALUES ('delete', old.id, old.content);
+  INSERT INTO documents_trigram(rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
+# Per link table delete counters (meta 'deletes:<table>'): in-memory link
+# graphs reload a table when it moves, since rowids freed by deleting the
+# newest rows are handed out again. Kept during bulk loads.
+LINK_DELETE_TABLES = ("doc_entities", "doc_assets", "event_entities", "event_assets")
+
+LINK_DELETE_TRIGGERS = "".join(
+    f"""
+INSERT OR IGNORE INTO meta(key, value) VALUES ('deletes:{table}', 0);
+
+CREATE TRIGGER IF NOT EXISTS {table}_deletes AFTER DELETE ON {table} BEGIN
+  UPDATE meta SET value = value + 1 WHERE key = 'deletes:{table}';
+END;
+"""
+    for table in LINK_DELETE_TABLES
+)
 
 SCHEMA = """
 PRAGMA foreign_keys = ON;
@@ -11,7 +206,8 @@ CREATE TABLE IF NOT EXISTS documents (
     id INTEGER PRIMARY KEY,
     filename TEXT NOT NULL,
     page INTEGER NOT NULL DEFAULT 1,
-    content TEXT NOT NULL
+    content TEXT NOT NULL,
+    content_hash TEXT
 );
 
 CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents(filename);
@@ -28,18 +224,7 @@ USING fts5(
   tokenize='unicode61'
 );
 
-CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
-  INSERT INTO documents_fts(rowid, content) VALUES (new.id, new.content);
-END;
-
-CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
-  INSERT INTO documents_fts(documents_fts, rowid, content) VALUES ('delete', old.id, old.content);
-END;
-
-CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
-  INSERT INTO documents_fts(documents_fts, rowid, content) VALUES ('delete', old.id, old.content);
-  INSERT INTO documents_fts(rowid, content) VALUES (new.id, new.content);
-END;
+""" + FTS_TRIGGERS + """
 
 -- =========================
 -- Entities (spaCy + regex)
@@ -94,6 +279,58 @@ CREATE TABLE IF NOT EXISTS doc_assets (
 CREATE INDEX IF NOT EXISTS idx_doc_assets_doc ON doc_assets(doc_id);
 CREATE INDEX IF NOT EXISTS idx_doc_assets_asset ON doc_assets(asset_id);
 
+-- =========================
+-- Mention offsets (character spans into documents.content, one row per occurrence)
+-- =========================
+CREATE TABLE IF NOT EXISTS entity_mentions (
+    entity_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    start_char INTEGER NOT NULL,
+    end_char INTEGER NOT NULL,
+    PRIMARY KEY(entity_id, doc_id, start_char),
+    FOREIGN KEY(doc_id) REFERENCES documents(id) ON DELETE CASCADE,
+    FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_entity_mentions_doc ON entity_mentions(doc_id);
+
+CREATE TABLE IF NOT EXISTS asset_mentions (
+    asset_id INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    start_char INTEGER NOT NULL,
+    end_char INTEGER NOT NULL,
+    PRIMARY KEY(asset_id, doc_id, start_char),
+    FOREIGN KEY(doc_id) REFERENCES documents(id) ON DELETE CASCADE,
+    FOREIGN KEY(asset_id) REFERENCES assets(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_asset_mentions_doc ON asset_mentions(doc_id);
+
+-- =========================
+-- Mention frequencies (materialized from doc_entities / doc_assets)
+-- =========================
+CREATE TABLE IF NOT EXISTS entity_stats (
+    entity_id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,          -- copy of entities.label, so top-N is one index range
+    total INTEGER NOT NULL,       -- SUM(doc_entities.count)
+    docs INTEGER NOT NULL,        -- pages mentioning the entity
+    FOREIGN KEY(entity_id) REFERENCES entities(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_stats_label_total ON entity_stats(label, total);
+
+CREATE TABLE IF NOT EXISTS asset_stats (
+    asset_id INTEGER PRIMARY KEY,
+    asset_type TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    docs INTEGER NOT NULL,
+    FOREIGN KEY(asset_id) REFERENCES assets(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_asset_stats_type_total ON asset_stats(asset_type, total);
+
+""" + STATS_TRIGGERS + """
+
 -- =========================
 -- Events (lightweight: derived from DATE + LOCATION within doc/page)
 -- =========================
@@ -128,6 +365,38 @@ CREATE TABLE IF NOT EXISTS event_assets (
     UNIQUE(event_id, asset_id)
 );
 
+-- =========================
+-- PERSON/ORG co-occurrence (materialized from doc_entities / event_entities)
+-- =========================
+CREATE TABLE IF NOT EXISTS cooc_terms (
+    id INTEGER PRIMARY KEY,
+    normalized TEXT NOT NULL UNIQUE   -- entities.normalized of a PERSON or ORG
+);
+
+CREATE TABLE IF NOT EXISTS cooc_totals (
+    scope TEXT PRIMARY KEY,           -- 'DOCS' or 'EVENTS'
+    n INTEGER NOT NULL                -- pages / events in the index
+);
+
+CREATE TABLE IF NOT EXISTS cooc_marginals (
+    scope TEXT NOT NULL,
+    term_id INTEGER NOT NULL,
+    n INTEGER NOT NULL,               -- pages / events mentioning the term
+    PRIMARY KEY(scope, term_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cooc_pairs (
+    scope TEXT NOT NULL,
+    term_a INTEGER NOT NULL,
+    term_b INTEGER NOT NULL,          -- every pair is stored as (a, b) and (b, a)
+    n INTEGER NOT NULL,               -- pages / events mentioning both
+    PRIMARY KEY(scope, term_a, term_b)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_cooc_pairs_top ON cooc_pairs(scope, term_a, n);
+
+""" + COOC_TRIGGERS + """
+
 -- =========================
 -- Registry records (offline-first)
 -- =========================
@@ -147,15 +416,415 @@ CREATE TABLE IF NOT EXISTS registry_records (
 );
 
 CREATE INDEX IF NOT EXISTS idx_registry_subject ON registry_records(subject_type, subject_norm);
+
+-- =========================
+-- Ingest manifest (file-level change detection)
+-- =========================
+CREATE TABLE IF NOT EXISTS ingest_manifest (
+    path TEXT PRIMARY KEY,        -- relative to the raw dir (posix)
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,         -- sha256 of the file bytes
+    ingested_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Page images whose text comes from a sibling text rendition instead of OCR
+CREATE TABLE IF NOT EXISTS image_renditions (
+    image_path TEXT PRIMARY KEY,  -- manifest path of the page image
+    text_path TEXT NOT NULL,      -- manifest path of the text rendition (documents.source_path)
+    bates TEXT NOT NULL           -- Bates number of the image page
+);
+
+CREATE INDEX IF NOT EXISTS idx_image_renditions_text ON image_renditions(text_path);
+
+-- Pages skipped as duplicates of an indexed page (same content_hash). When the file
+-- holding the indexed copy is replaced, the row is handed over to one of these.
+CREATE TABLE IF NOT EXISTS duplicate_pages (
+    content_hash TEXT NOT NULL,
+    source_path TEXT NOT NULL,    -- manifest path of the file whose copy was skipped
+    filename TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    PRIMARY KEY (content_hash, source_path, page)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_duplicate_pages_source ON duplicate_pages(source_path);
+
+-- Durable ingest progress (one row per run; status 'running' until it finishes)
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    id INTEGER PRIMARY KEY,
+    raw_dir TEXT NOT NULL,
+    status TEXT NOT NULL,                 -- running, complete
+    bulk_load INTEGER NOT NULL DEFAULT 0, -- FTS triggers are dropped while running
+    files_total INTEGER NOT NULL DEFAULT 0,
+    files_done INTEGER NOT NULL DEFAULT 0,
+    last_path TEXT,
+    started_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Index generation: bumped by every ingest commit so readers can tell their cached results are stale
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO meta(key, value) VALUES ('generation', 0);
+""" + LINK_DELETE_TRIGGERS
+
+
+# Columns added after the first release: (table, column, declaration)
+MIGRATIONS = [
+    ("documents", "content_hash", "TEXT"),
+    ("documents", "source_path", "TEXT"),  # manifest path of the originating file
+]
+
+# Indexes on migrated columns (must run after MIGRATIONS)
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_documents_hash ON documents(content_hash);
+CREATE INDEX IF NOT EXISTS idx_documents_source ON documents(source_path);
+
+-- pages indexed before source_path was recorded came from top-level files named filename
+UPDATE documents SET source_path = filename WHERE source_path IS NULL;
 """
 
+def migrate(conn: sqlite3.Connection):
+    for table, column, decl in MIGRATIONS:
+        cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in cols:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    conn.executescript(POST_MIGRATION_SCHEMA)
+    # SCHEMA has just put back any triggers an interrupted bulk load dropped; the indexes need the rebuild too
+    if recover_bulk_load(conn):
+        conn.commit()
+    # databases indexed before the frequency tables existed
+    if conn.execute("SELECT 1 FROM entity_stats LIMIT 1").fetchone() is None and (
+        conn.execute("SELECT 1 FROM doc_entities LIMIT 1").fetchone() is not None
+        or conn.execute("SELECT 1 FROM doc_assets LIMIT 1").fetchone() is not None
+    ):
+        rebuild_stats(conn)
+        conn.commit()
+    # ... and before the co-occurrence tables
+    if conn.execute("SELECT 1 FROM cooc_totals LIMIT 1").fetchone() is None and (
+        conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone() is not None
+        or conn.execute("SELECT 1 FROM events LIMIT 1").fetchone() is not None
+    ):
+        rebuild_cooccurrence(conn)
+        conn.commit()
+
 def init_db(path: Path):
     path.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(path))
     conn.executescript(SCHEMA)
+    migrate(conn)
     conn.close()
 
 def connect(path: Path) -> sqlite3.Connection:
     conn = sqlite3.connect(str(path))
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
+
+def enable_wal(conn: sqlite3.Connection):
+    """WAL lets readers query committed data while an ingest keeps writing. Persistent per file."""
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+
+# -----------------------------
+# Connection profiles
+# -----------------------------
+MMAP_SIZE = 256 * 1024 * 1024  # bytes of the db file mapped into memory
+READ_CACHE_KIB = 64 * 1024     # page cache per reader connection
+WRITE_CACHE_KIB = 256 * 1024   # page cache for the ingest writer
+
+READ_PRAGMAS = (
+    f"PRAGMA mmap_size={MMAP_SIZE};",
+    f"PRAGMA cache_size=-{READ_CACHE_KIB};",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA query_only=ON;",
+)
+
+WRITE_PRAGMAS = (
+    "PRAGMA foreign_keys = ON;",
+    f"PRAGMA mmap_size={MMAP_SIZE};",
+    f"PRAGMA cache_size=-{WRITE_CACHE_KIB};",
+    "PRAGMA temp_store=MEMORY;",
+)
+
+_readers = threading.local()
+
+def read_connection(path: Path) -> sqlite3.Connection:
+    """
+    Reusable read-only connection for the calling thread (UI/search).
+
+    Opened once per thread and database with mode=ro, so the schema parse and
+    the warm page cache / mmap are shared by every later query. Callers must
+    not close it. Statements run in autocommit, so each one sees the latest
+    commit from the ingest writer (the file is in WAL mode).
+    """
+    conns: Dict[str, sqlite3.Connection] = getattr(_readers, "conns", None) or {}
+    _readers.conns = conns
+    key = str(Path(path).resolve())
+    conn = conns.get(key)
+    if conn is None:
+        conn = sqlite3.connect(f"{Path(key).as_uri()}?mode=ro", uri=True)
+        for pragma in READ_PRAGMAS:
+            conn.execute(pragma)
+        conns[key] = conn
+    return conn
+
+def close_read_connections():
+    """Closes the calling thread's pooled readers (e.g. before replacing the db file)."""
+    conns = getattr(_readers, "conns", None) or {}
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
+
+@contextmanager
+def temp_writes(conn: sqlite3.Connection):
+    """
+    Lets a pooled reader create and fill temp-schema scratch tables (main is
+    still read-only via mode=ro). Everything inside runs as one transaction,
+    so it reads a single snapshot; it is committed on exit.
+    """
+    conn.execute("PRAGMA query_only=OFF;")
+    try:
+        yield conn
+    finally:
+        conn.commit()
+        conn.execute("PRAGMA query_only=ON;")
+
+@contextmanager
+def read_snapshot(conn: sqlite3.Connection):
+    """One read transaction on a pooled reader, so several statements see the same commit."""
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.commit()
+
+def write_connection(path: Path) -> sqlite3.Connection:
+    """Connection for ingest: WAL + synchronous=NORMAL, a large page cache and in-memory temp storage."""
+    conn = sqlite3.connect(str(path))
+    for pragma in WRITE_PRAGMAS:
+        conn.execute(pragma)
+    enable_wal(conn)
+    return conn
+
+# -----------------------------
+# Index generation
+# -----------------------------
+def read_generation(conn: sqlite3.Connection):
+    """Current index generation, or None on a database created before the meta table."""
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key='generation'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return int(row[0]) if row else None
+
+def bump_generation(conn: sqlite3.Connection):
+    """Call inside the writing transaction, so the bump commits together with the data."""
+    conn.execute(
+        "INSERT INTO meta(key, value) VALUES ('generation', 1) "
+        "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+    )
+
+# -----------------------------
+# Bulk load (full rebuilds)
+# -----------------------------
+FTS_TRIGGER_NAMES = (
+    "documents_ai", "documents_ad", "documents_au",
+    "documents_tri_ai", "documents_tri_ad", "documents_tri_au",
+)
+
+def drop_fts_triggers(conn: sqlite3.Connection):
+    """Stops per-row FTS maintenance. Inside a transaction this rolls back with it."""
+    for name in FTS_TRIGGER_NAMES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def restore_fts_triggers(conn: sqlite3.Connection):
+    _exec_each(conn, FTS_TRIGGERS)
+    if trigram_enabled(conn):
+        _exec_each(conn, TRIGRAM_TRIGGERS)
+
+def rebuild_fts(conn: sqlite3.Connection):
+    """Rebuilds documents_fts (and documents_trigram) from documents in one pass, then merges b-trees."""
+    for table in fts_tables(conn):
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+
+def finish_bulk_load(conn: sqlite3.Connection):
+    """Rebuilds everything a bulk load deferred (FTS indexes, frequency and co-occurrence tables) and restores the triggers."""
+    rebuild_fts(conn)
+    restore_fts_triggers(conn)
+    rebuild_stats(conn)
+    restore_stats_triggers(conn)
+    rebuild_cooccurrence(conn)
+    restore_cooc_triggers(conn)
+    mark_bulk_load(conn, False)
+
+def mark_bulk_load(conn: sqlite3.Connection, active: bool):
+    """meta 'bulk_load' is 1 from the moment a bulk load drops its triggers until finish_bulk_load()."""
+    conn.execute(
+        "INSERT INTO meta(key, value) VALUES ('bulk_load', ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (int(active),),
+    )
+
+def bulk_load_unfinished(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT value FROM meta WHERE key='bulk_load'").fetchone()
+    if row is not None:
+        return bool(row[0])
+    # databases from before the flag: an interrupted bulk run of any raw_dir
+    return conn.execute(
+        "SELECT 1 FROM ingest_runs WHERE status='running' AND bulk_load=1 LIMIT 1"
+    ).fetchone() is not None
+
+def recover_bulk_load(conn: sqlite3.Connection) -> bool:
+    """
+    Finishes a bulk load that was interrupted (its triggers dropped, indexes
+    stale), whichever run or raw_dir it belonged to. Runs in the caller's
+    transaction; True if there was one.
+    """
+    if not bulk_load_unfinished(conn):
+        return False
+    finish_bulk_load(conn)
+    return True
+
+# -----------------------------
+# Entity / asset frequency tables
+# -----------------------------
+def drop_stats_triggers(conn: sqlite3.Connection):
+    for name in STATS_TRIGGER_NAMES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def restore_stats_triggers(conn: sqlite3.Connection):
+    _exec_each(conn, STATS_TRIGGERS)
+
+def rebuild_stats(conn: sqlite3.Connection):
+    """Recomputes entity_stats / asset_stats from the link tables (bulk loads, repair)."""
+    conn.execute("DELETE FROM entity_stats")
+    conn.execute(
+        """
+        INSERT INTO entity_stats(entity_id, label, total, docs)
+        SELECT e.id, e.label, SUM(de.count), COUNT(*)
+        FROM doc_entities de
+        JOIN entities e ON e.id = de.entity_id
+        GROUP BY e.id
+        """
+    )
+    conn.execute("DELETE FROM asset_stats")
+    conn.execute(
+        """
+        INSERT INTO asset_stats(asset_id, asset_type, total, docs)
+        SELECT a.id, a.asset_type, SUM(da.count), COUNT(*)
+        FROM doc_assets da
+        JOIN assets a ON a.id = da.asset_id
+        GROUP BY a.id
+        """
+    )
+
+# -----------------------------
+# PERSON/ORG co-occurrence tables
+# -----------------------------
+def drop_cooc_triggers(conn: sqlite3.Connection):
+    for name in COOC_TRIGGER_NAMES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def restore_cooc_triggers(conn: sqlite3.Connection):
+    _exec_each(conn, COOC_TRIGGERS)
+
+def rebuild_cooccurrence(conn: sqlite3.Connection):
+    """Recomputes cooc_terms / cooc_totals / cooc_marginals / cooc_pairs from the link tables (bulk loads, repair)."""
+    for table in ("cooc_pairs", "cooc_marginals", "cooc_totals", "cooc_terms"):
+        conn.execute(f"DELETE FROM {table}")
+    conn.execute(
+        """
+        INSERT INTO cooc_terms(normalized)
+        SELECT DISTINCT normalized FROM entities WHERE label IN ('PERSON','ORG')
+        """
+    )
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS cooc_members (ctx INTEGER, term_id INTEGER, PRIMARY KEY(ctx, term_id)) WITHOUT ROWID")
+    for scope, (table, links, col) in COOC_SCOPES.items():
+        conn.execute(f"INSERT INTO cooc_totals(scope, n) SELECT ?, COUNT(*) FROM {table}", (scope,))
+        conn.execute("DELETE FROM temp.cooc_members")
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO temp.cooc_members(ctx, term_id)
+            SELECT l.{col}, t.id
+            FROM {links} l
+            JOIN entities e ON e.id = l.entity_id
+            JOIN cooc_terms t ON t.normalized = e.normalized
+            WHERE e.label IN ('PERSON','ORG')
+            """
+        )
+        conn.execute(
+            "INSERT INTO cooc_marginals(scope, term_id, n) SELECT ?, term_id, COUNT(*) FROM temp.cooc_members GROUP BY term_id",
+            (scope,),
+        )
+        conn.execute(
+            """
+            INSERT INTO cooc_pairs(scope, term_a, term_b, n)
+            SELECT ?, x.term_id, y.term_id, COUNT(*)
+            FROM temp.cooc_members x
+            JOIN temp.cooc_members y ON y.ctx = x.ctx AND y.term_id != x.term_id
+            GROUP BY x.term_id, y.term_id
+            """,
+            (scope,),
+        )
+    conn.execute("DROP TABLE temp.cooc_members")
+
+# -----------------------------
+# Trigram (substring) index
+# -----------------------------
+def trigram_enabled(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='documents_trigram'"
+    ).fetchone()
+    return row is not None
+
+def fts_tables(conn: sqlite3.Connection):
+    return ["documents_fts"] + (["documents_trigram"] if trigram_enabled(conn) else [])
+
+def enable_trigram_index(conn: sqlite3.Connection, build: bool = True):
+    """
+    Creates documents_trigram and its sync triggers. build=True fills it from
+    documents now (post-pass); a bulk load passes False and lets its final
+    rebuild_fts() fill it. Call inside the caller's transaction.
+    """
+    _exec_each(conn, TRIGRAM_TABLE)
+    _exec_each(conn, TRIGRAM_TRIGGERS)
+    if build:
+        conn.execute("INSERT INTO documents_trigram(documents_trigram) VALUES ('rebuild')")
+        conn.execute("INSERT INTO documents_trigram(documents_trigram) VALUES ('optimize')")
+
+def disable_trigram_index(conn: sqlite3.Connection):
+    for name in ("documents_tri_ai", "documents_tri_ad", "documents_tri_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute("DROP TABLE IF EXISTS documents_trigram")
+
+def fts_index_bytes(conn: sqlite3.Connection) -> Dict[str, int]:
+    """On-disk size of each FTS index (all shadow tables), via dbstat when compiled in."""
+    out: Dict[str, int] = {}
+    for table in fts_tables(conn):
+        try:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name LIKE ? ESCAPE '\\'",
+                (table.replace("_", "\\_") + "\\_%",),
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return {}
+        out[table] = int(row[0])
+    return out
+
+def _exec_each(conn: sqlite3.Connection, script: str):
+    # executescript() would COMMIT the open transaction first
+    for stmt in _split_sql(script):
+        conn.execute(stmt)
+
+def _split_sql(script: str):
+    buf = ""
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if buf.strip():
+                yield buf.strip()
+            buf = ""
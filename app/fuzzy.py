@@ -0,0 +1,124 @@
+from __future__ import annotations
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from rapidfuzz import process
+from rapidfuzz.distance import OSA
+
+from app.db import read_connection, read_generation, temp_writes
+
+# -----------------------------
+# Fuzzy (OCR-tolerant) term expansion
+# -----------------------------
+# Edit budget by term length: (min_length, max_edits), longest first
+MAX_EDITS = ((9, 2), (5, 1), (0, 0))
+MAX_EXPANSIONS = 8  # vocabulary terms OR'd in per query term
+
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def edit_budget(term: str) -> int:
+    for min_len, edits in MAX_EDITS:
+        if len(term) >= min_len:
+            return edits
+    return 0
+
+
+Bucket = Tuple[int, str]  # (term length, first or last character)
+
+
+@dataclass
+class Vocabulary:
+    """
+    Every term in documents_fts with its document frequency, bucketed twice:
+    by (length, first char) and by (length, last char).
+
+    A term of length L within k edits has length L-k..L+k, and unless both of
+    its ends were damaged it keeps its first or its last character, so a
+    lookup scores a few thin buckets instead of the whole vocabulary. For
+    k=1 this is exact (one edit cannot touch both ends).
+    """
+    generation: Optional[int]
+    by_first: Dict[Bucket, List[str]]
+    by_last: Dict[Bucket, List[str]]
+    doc_freq: Dict[str, int]
+
+    @property
+    def size(self) -> int:
+        return len(self.doc_freq)
+
+    def expand(self, term: str, max_edits: Optional[int] = None, limit: int = MAX_EXPANSIONS) -> List[str]:
+        """Closest vocabulary terms (fewest edits, then most documents); the term itself if indexed."""
+        k = edit_budget(term) if max_edits is None else int(max_edits)
+        if k <= 0:
+            return [term] if term in self.doc_freq else []
+        best: Dict[str, int] = {}
+        for n in range(max(1, len(term) - k), len(term) + k + 1):
+            for bucket in (self.by_first.get((n, term[0])), self.by_last.get((n, term[-1]))):
+                if not bucket:
+                    continue
+                # batch scoring in C; score_cutoff lets it abandon a candidate after k edits.
+                # OSA counts a transposition ("Epstien") as one edit.
+                for cand, dist, _idx in process.extract(
+                    term, bucket, scorer=OSA.distance, score_cutoff=k, limit=None
+                ):
+                    best[cand] = int(dist)
+        ranked = sorted(best.items(), key=lambda kv: (kv[1], -self.doc_freq[kv[0]], kv[0]))
+        return [cand for cand, _d in ranked[: max(1, int(limit))]]
+
+
+_vocab: Dict[str, Vocabulary] = {}
+_vocab_lock = threading.Lock()
+
+
+def load_vocabulary(conn: sqlite3.Connection) -> Vocabulary:
+    """Reads documents_fts terms through a temp fts5vocab table (temp schema only; main stays read-only)."""
+    with temp_writes(conn):
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS temp.documents_vocab USING fts5vocab(main, documents_fts, 'row')"
+        )
+    by_first: Dict[Bucket, List[str]] = {}
+    by_last: Dict[Bucket, List[str]] = {}
+    doc_freq: Dict[str, int] = {}
+    for term, docs in conn.execute("SELECT term, doc FROM temp.documents_vocab ORDER BY term"):
+        by_first.setdefault((len(term), term[0]), []).append(term)
+        by_last.setdefault((len(term), term[-1]), []).append(term)
+        doc_freq[term] = int(docs)
+    return Vocabulary(
+        generation=read_generation(conn), by_first=by_first, by_last=by_last, doc_freq=doc_freq
+    )
+
+
+def vocabulary(db_path: Path) -> Vocabulary:
+    """Vocabulary of db_path, loaded once and reloaded only after an ingest bumps the generation."""
+    conn = read_connection(db_path)
+    key = str(Path(db_path).resolve())
+    generation = read_generation(conn)
+    with _vocab_lock:
+        vocab = _vocab.get(key)
+        if vocab is None or vocab.generation != generation:
+            vocab = _vocab[key] = load_vocabulary(conn)
+    return vocab
+
+
+def expand_query(db_path: Path, query: str, max_edits: Optional[int] = None) -> Dict[str, List[str]]:
+    """{query term: [vocabulary terms]} for each word of query (lowercased, as unicode61 indexes them)."""
+    vocab = vocabulary(db_path)
+    out: Dict[str, List[str]] = {}
+    for word in TERM_RE.findall((query or "").lower()):
+        if word not in out:
+            out[word] = vocab.expand(word, max_edits=max_edits)
+    return out
+
+
+def fuzzy_fts_query(expansions: Dict[str, List[str]]) -> str:
+    """AND of per-term OR groups: ("epstein" OR "epstien") AND ("jeffrey" OR "jeffrev")."""
+    groups = []
+    for word, terms in expansions.items():
+        terms = terms or [word]
+        groups.append("(" + " OR ".join('"' + t.replace('"', '""') + '"' for t in terms) + ")")
+    return " AND ".join(groups)
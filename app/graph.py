@@ -0,0 +1,307 @@
+from __future__ import annotations
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass, field
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.db import read_connection, read_generation, read_snapshot
+
+# -----------------------------
+# Entity / asset / event / document link graph
+# -----------------------------
+ENTITY, ASSET, EVENT, DOC = "entity", "asset", "event", "doc"
+KINDS = (ENTITY, ASSET, EVENT, DOC)
+
+# link table -> (kind of first column, kind of second column)
+LINKS = {
+    "event_entities": (EVENT, "event_id", ENTITY, "entity_id"),
+    "event_assets": (EVENT, "event_id", ASSET, "asset_id"),
+    "doc_entities": (DOC, "doc_id", ENTITY, "entity_id"),
+    "doc_assets": (DOC, "doc_id", ASSET, "asset_id"),
+}
+
+# Edges added since the last full load live in a small overlay; past this
+# share of the base edges the relation is reloaded from scratch.
+OVERLAY_MAX_FRACTION = 0.1
+
+
+@dataclass
+class Adjacency:
+    """
+    One direction of one link table in CSR form, indexed by database id:
+    the neighbors of id i are indices[indptr[i]:indptr[i + 1]] (ascending).
+    """
+    indptr: array = field(default_factory=lambda: array("q", [0]))
+    indices: array = field(default_factory=lambda: array("q"))
+    overlay: Dict[int, array] = field(default_factory=dict)  # edges added after the load
+    overlay_edges: int = 0
+
+    def neighbors(self, i: int) -> array:
+        if 0 <= i < len(self.indptr) - 1:
+            out = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        else:
+            out = array("q")
+        extra = self.overlay.get(i)
+        if extra is not None:
+            out.extend(extra)
+        return out
+
+    def degree(self, i: int) -> int:
+        n = self.indptr[i + 1] - self.indptr[i] if 0 <= i < len(self.indptr) - 1 else 0
+        extra = self.overlay.get(i)
+        return n + (len(extra) if extra is not None else 0)
+
+    def copy(self) -> "Adjacency":
+        """Shares the CSR arrays (never written after a load); the overlay, which add() appends to, is copied."""
+        return Adjacency(
+            indptr=self.indptr,
+            indices=self.indices,
+            overlay={i: array("q", extra) for i, extra in self.overlay.items()},
+            overlay_edges=self.overlay_edges,
+        )
+
+    def add(self, edges: Iterable[Tuple[int, int]]):
+        for src, dst in edges:
+            self.overlay.setdefault(int(src), array("q")).append(int(dst))
+            self.overlay_edges += 1
+
+    @property
+    def edges(self) -> int:
+        return len(self.indices) + self.overlay_edges
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.indptr.itemsize * len(self.indptr)
+            + self.indices.itemsize * len(self.indices)
+            + 8 * self.overlay_edges
+        )
+
+
+def load_adjacency(cur: sqlite3.Cursor, table: str, src: str, dst: str) -> Adjacency:
+    """CSR of table grouped by src, built from SQLite's sorted output (no per-edge Python objects kept)."""
+    cur.execute(f"SELECT COALESCE(MAX({src}), 0) FROM {table}")
+    n = int(cur.fetchone()[0]) + 1
+    counts = array("q", bytes(8 * n))
+    for i, c in cur.execute(f"SELECT {src}, COUNT(*) FROM {table} GROUP BY {src}"):
+        counts[int(i)] = int(c)
+    indptr = array("q", [0])
+    indptr.extend(accumulate(counts))
+    indices = array("q", (r[0] for r in cur.execute(f"SELECT {dst} FROM {table} ORDER BY {src}, {dst}")))
+    return Adjacency(indptr=indptr, indices=indices)
+
+
+@dataclass
+class LinkState:
+    """What was loaded from one link table, to tell appends (overlay) from deletes (reload)."""
+    max_rowid: int
+    rows: int
+    deletes: Optional[int]  # meta delete counter; None on databases without it
+
+
+class Graph:
+    """
+    Bipartite links between subjects (entities, assets) and the events and
+    document pages they appear in, as integer CSR adjacency in both
+    directions. Nodes are (kind, database id) pairs.
+
+    Built once per index generation. When an ingest appends links, only the
+    new rows (rowid past the last load) are read into a per-relation overlay.
+    A deletion (changed file re-ingested, seen through the table's delete
+    counter) or a large overlay reloads that link table.
+
+    refresh() changes the graph in place. The shared graphs handed out by
+    graph() are never changed: they are caught up through refreshed(),
+    which works on a copy, so queries running on the old one are unaffected.
+    """
+
+    def __init__(self):
+        self.generation: Optional[int] = None
+        self.adj: Dict[Tuple[str, str], Adjacency] = {}  # (from kind, to kind) -> CSR
+        self.state: Dict[str, LinkState] = {}
+        self.labels: List[str] = []                      # entity label code -> label
+        self.entity_label = array("b")                   # entity id -> label code, -1 unknown
+
+    # --- loading ---
+    def load(self, conn: sqlite3.Connection):
+        with read_snapshot(conn):
+            cur = conn.cursor()
+            self.generation = read_generation(conn)
+            for table in LINKS:
+                self._load_table(cur, table)
+            self._load_labels(cur, full=True)
+
+    def refresh(self, conn: sqlite3.Connection) -> bool:
+        """Catches up with the database; False if the generation had not moved."""
+        if self.generation is not None and read_generation(conn) == self.generation:
+            return False
+        with read_snapshot(conn):
+            self._refresh(conn.cursor(), read_generation(conn))
+        return True
+
+    def refreshed(self, conn: sqlite3.Connection) -> "Graph":
+        """A caught-up copy of this graph, or the graph itself if the generation had not moved."""
+        if self.generation is not None and read_generation(conn) == self.generation:
+            return self
+        g = self.copy()
+        g.refresh(conn)
+        return g
+
+    def copy(self) -> "Graph":
+        g = Graph()
+        g.generation = self.generation
+        g.adj = {key: adj.copy() for key, adj in self.adj.items()}
+        g.state = dict(self.state)
+        g.labels = list(self.labels)
+        g.entity_label = array("b", self.entity_label)
+        return g
+
+    def _refresh(self, cur: sqlite3.Cursor, generation: Optional[int]):
+        for table, (a_kind, a_col, b_kind, b_col) in LINKS.items():
+            old = self.state.get(table)
+            max_rowid, rows, deletes = _table_state(cur, table)
+            if (
+                old is None
+                or deletes != old.deletes
+                or rows < old.rows
+                or rows - old.rows != _rows_after(cur, table, old.max_rowid)
+            ):
+                self._load_table(cur, table)  # rows were deleted (or rowids reused)
+                continue
+            if rows == old.rows:
+                continue
+            fwd, rev = self.adj[(a_kind, b_kind)], self.adj[(b_kind, a_kind)]
+            if fwd.overlay_edges + rows - old.rows > OVERLAY_MAX_FRACTION * max(1, len(fwd.indices)):
+                self._load_table(cur, table)
+                continue
+            cur.execute(f"SELECT {a_col}, {b_col} FROM {table} WHERE rowid > ?", (old.max_rowid,))
+            new = cur.fetchall()
+            fwd.add(new)
+            rev.add((b, a) for a, b in new)
+            self.state[table] = LinkState(max_rowid=max_rowid, rows=rows, deletes=deletes)
+        self._load_labels(cur, full=False)
+        self.generation = generation
+
+    def _load_table(self, cur: sqlite3.Cursor, table: str):
+        a_kind, a_col, b_kind, b_col = LINKS[table]
+        max_rowid, rows, deletes = _table_state(cur, table)
+        self.adj[(a_kind, b_kind)] = load_adjacency(cur, table, a_col, b_col)
+        self.adj[(b_kind, a_kind)] = load_adjacency(cur, table, b_col, a_col)
+        self.state[table] = LinkState(max_rowid=max_rowid, rows=rows, deletes=deletes)
+
+    def _load_labels(self, cur: sqlite3.Cursor, full: bool):
+        start = 0 if full else len(self.entity_label)
+        if full:
+            self.entity_label = array("b")
+        codes = {label: i for i, label in enumerate(self.labels)}
+        for eid, label in cur.execute("SELECT id, label FROM entities WHERE id >= ? ORDER BY id", (start,)):
+            code = codes.get(label)
+            if code is None:
+                code = codes[label] = len(self.labels)
+                self.labels.append(label)
+            if eid >= len(self.entity_label):
+                self.entity_label.extend([-1] * (eid + 1 - len(self.entity_label)))
+            self.entity_label[eid] = code
+
+    # --- queries ---
+    def neighbors(self, kind: str, node_id: int, to: str) -> array:
+        """Ids of `to` nodes linked to (kind, node_id)."""
+        adj = self.adj.get((kind, to))
+        return adj.neighbors(int(node_id)) if adj is not None else array("q")
+
+    def degree(self, kind: str, node_id: int, to: str) -> int:
+        adj = self.adj.get((kind, to))
+        return adj.degree(int(node_id)) if adj is not None else 0
+
+    def label(self, entity_id: int) -> Optional[str]:
+        code = self.entity_label[entity_id] if 0 <= entity_id < len(self.entity_label) else -1
+        return self.labels[code] if code >= 0 else None
+
+    def label_codes(self, labels: Iterable[str]) -> Set[int]:
+        wanted = set(labels)
+        return {i for i, label in enumerate(self.labels) if label in wanted}
+
+    def expand(self, kind: str, seeds: Iterable[int], path: Sequence[str], labels: Optional[Iterable[str]] = None) -> Set[int]:
+        """
+        Follows a kind path from seeds and returns the ids reached at its end,
+        e.g. expand(ENTITY, [x], [EVENT, ENTITY, DOC, ASSET]) = assets on pages
+        of people who share events with x. labels restricts every entity hop.
+        """
+        codes = self.label_codes(labels) if labels is not None else None
+        frontier = set(int(s) for s in seeds)
+        for to in path:
+            adj = self.adj.get((kind, to))
+            if adj is None:
+                return set()
+            nxt: Set[int] = set()
+            for node in frontier:
+                nxt.update(adj.neighbors(node))
+            if to == ENTITY and codes is not None:
+                nxt = {e for e in nxt if 0 <= e < len(self.entity_label) and self.entity_label[e] in codes}
+            frontier, kind = nxt, to
+        return frontier
+
+    def k_hop(self, kind: str, node_id: int, k: int) -> Dict[str, Set[int]]:
+        """Every node within k links of (kind, node_id), by kind (the start node excluded)."""
+        seen: Dict[str, Set[int]] = {kd: set() for kd in KINDS}
+        seen[kind].add(int(node_id))
+        frontier = [(kind, int(node_id))]
+        for _ in range(max(0, int(k))):
+            nxt = []
+            for fk, fid in frontier:
+                for (a, b), adj in self.adj.items():
+                    if a != fk:
+                        continue
+                    for n in adj.neighbors(fid):
+                        if n not in seen[b]:
+                            seen[b].add(n)
+                            nxt.append((b, n))
+            frontier = nxt
+        seen[kind].discard(int(node_id))
+        return seen
+
+    def stats(self) -> Dict[str, int]:
+        out = {f"{a}->{b}": adj.edges for (a, b), adj in sorted(self.adj.items())}
+        out["bytes"] = sum(adj.nbytes for adj in self.adj.values()) + len(self.entity_label)
+        return out
+
+
+def _table_state(cur: sqlite3.Cursor, table: str) -> Tuple[int, int, Optional[int]]:
+    cur.execute(f"SELECT COALESCE(MAX(rowid), 0), COUNT(*) FROM {table}")
+    max_rowid, rows = cur.fetchone()
+    try:
+        row = cur.execute("SELECT value FROM meta WHERE key=?", (f"deletes:{table}",)).fetchone()
+    except sqlite3.OperationalError:
+        row = None  # created before the meta table
+    return int(max_rowid), int(rows), int(row[0]) if row else None
+
+
+def _rows_after(cur: sqlite3.Cursor, table: str, rowid: int) -> int:
+    cur.execute(f"SELECT COUNT(*) FROM {table} WHERE rowid > ?", (int(rowid),))
+    return int(cur.fetchone()[0])
+
+
+_graphs: Dict[str, Graph] = {}
+_graphs_lock = threading.Lock()
+
+
+def graph(db_path: Path) -> Graph:
+    """
+    Graph of db_path, built on first use and caught up after each ingest
+    generation. Callers may keep using the returned graph without a lock:
+    a newer generation replaces it in the cache instead of changing it.
+    """
+    conn = read_connection(db_path)
+    key = str(Path(db_path).resolve())
+    with _graphs_lock:
+        g = _graphs.get(key)
+        if g is None:
+            g = Graph()
+            g.load(conn)
+        else:
+            g = g.refreshed(conn)
+        _graphs[key] = g
+    return g
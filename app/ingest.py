@@ -1,8 +1,13 @@
+import os
 import re
+import time
 import hashlib
-from collections import Counter
+import shutil
+import subprocess
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pdfplumber
 import pytesseract
@@ -10,13 +15,41 @@ from PIL import Image
 import spacy
 from tqdm import tqdm
 
-from app.db import connect
+from app.db import (
+    bump_generation,
+    drop_cooc_triggers,
+    drop_fts_triggers,
+    drop_stats_triggers,
+    enable_trigram_index,
+    finish_bulk_load,
+    mark_bulk_load,
+    recover_bulk_load,
+    trigram_enabled,
+    write_connection,
+)
+from app.loadfiles import find_text_renditions
+from app.timing import record, stage
 
 # -----------------------------
 # Model load (one-time)
 # -----------------------------
+def _ner_only(nlp):
+    """
+    Disables every component doc.ents does not depend on (tagger, parser,
+    attribute_ruler, lemmatizer...). tok2vec stays only if ner listens to it.
+    """
+    keep = {"ner"}
+    if "tok2vec" in nlp.pipe_names:
+        if "ner" in getattr(nlp.get_pipe("tok2vec"), "listening_components", []):
+            keep.add("tok2vec")
+    for name in list(nlp.pipe_names):
+        if name not in keep:
+            nlp.disable_pipe(name)
+    return nlp
+
+
 try:
-    NLP = spacy.load("en_core_web_sm")
+    NLP = _ner_only(spacy.load("en_core_web_sm"))
 except Exception:
     NLP = None
 
@@ -26,9 +59,39 @@ except Exception:
 MAX_FILE_SIZE_MB = 200
 MAX_FILE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
+MIN_IMAGE_BYTES = 5000
+
 TEXT_EXTS = {".txt", ".md", ".log"}
 IMG_EXTS = {".png", ".jpg", ".jpeg", ".tiff", ".bmp"}
 
+# Parallel OCR: 0 keeps OCR inline in the main process.
+# Each worker keeps OCR_PREFETCH images in flight so the pool never starves.
+OCR_WORKERS = 0
+OCR_PREFETCH = 4
+
+# PDF text layer: "pdfplumber" (default) or "pdftotext" (poppler, much faster).
+# pdftotext splits large PDFs into page ranges, each in its own pdftotext
+# process; any failure falls back to pdfplumber for that file.
+PDF_ENGINE = "pdfplumber"
+PDF_WORKERS = 4
+PDF_CHUNK_PAGES = 50
+PDF_TIMEOUT_SEC = 300
+
+# Checkpoints: commit (and record progress) every N files or T seconds,
+# whichever comes first. A restarted ingest resumes from the manifest.
+CHECKPOINT_FILES = 500
+CHECKPOINT_SECONDS = 60.0
+
+# Page images that already have a text rendition (same Bates stem or load-file
+# mapping) are linked to it instead of being OCR'd.
+REUSE_TEXT_RENDITIONS = True
+
+# Batched NER: new pages are buffered and run through NLP.pipe together.
+# NER_PROCESSES > 1 forks spaCy workers per flush, so keep the buffer large.
+NER_BUFFER_PAGES = 1000
+NER_BATCH_SIZE = 64
+NER_PROCESSES = 1
+
 EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
 PHONE_RE = re.compile(r"\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}\b")
 URL_RE = re.compile(r"https?://\S+")
@@ -45,6 +108,10 @@ AIRCRAFT_REG_RE = re.compile(
 )
 IMO_RE = re.compile(r"\bIMO\s?\d{7}\b", re.IGNORECASE)
 
+Span = Tuple[int, int]  # (start, end) character offsets into the page text
+EntMentions = Dict[Tuple[str, str, str], List[Span]]  # (text, label, normalized) -> spans
+AssetMentions = Dict[Tuple[str, str, str], List[Span]]  # (asset_type, value, normalized) -> spans
+
 
 # -----------------------------
 # Helpers
@@ -72,16 +139,175 @@ def content_hash(text: str) -> str:
 
 
 def hash_exists(cur, h: str) -> bool:
-    cur.execute("SELECT 1 FROM documents WHERE content_hash=? LIMIT 1", (h,))
-    return cur.fetchone() is not None
+    with stage("sqlite"):
+        cur.execute("SELECT 1 FROM documents WHERE content_hash=? LIMIT 1", (h,))
+        return cur.fetchone() is not None
+
+
+# -----------------------------
+# File manifest (skip unchanged files before opening them)
+# -----------------------------
+Manifest = Dict[str, Tuple[int, int, str]]  # path -> (size, mtime_ns, digest)
+
+MANIFEST_NEW = "new"
+MANIFEST_CHANGED = "changed"
+MANIFEST_TOUCHED = "touched"      # stat differs, bytes identical
+MANIFEST_UNCHANGED = "unchanged"
+
+
+def load_manifest(cur) -> Manifest:
+    cur.execute("SELECT path, size, mtime_ns, digest FROM ingest_manifest")
+    return {r[0]: (int(r[1]), int(r[2]), r[3]) for r in cur.fetchall()}
+
+
+def manifest_path(raw_dir: Path, file: Path) -> str:
+    return file.relative_to(raw_dir).as_posix()
+
+
+def file_digest(file: Path) -> str:
+    h = hashlib.sha256()
+    with file.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def manifest_status(manifest: Manifest, rel: str, file: Path, st: os.stat_result) -> Tuple[str, Optional[str]]:
+    """
+    Returns (status, digest). Unchanged files are decided from size + mtime
+    alone, so they are never opened; the digest is only computed when the
+    stat differs.
+    """
+    entry = manifest.get(rel)
+    if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+        return MANIFEST_UNCHANGED, entry[2]
+
+    digest = file_digest(file)
+    if entry is None:
+        return MANIFEST_NEW, digest
+    if entry[2] == digest:
+        return MANIFEST_TOUCHED, digest
+    return MANIFEST_CHANGED, digest
+
+
+def record_manifest(cur, rel: str, st: os.stat_result, digest: str):
+    cur.execute(
+        """
+        INSERT INTO ingest_manifest(path, size, mtime_ns, digest, ingested_at)
+        VALUES (?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(path) DO UPDATE SET
+          size = excluded.size,
+          mtime_ns = excluded.mtime_ns,
+          digest = excluded.digest,
+          ingested_at = excluded.ingested_at
+        """,
+        (rel, int(st.st_size), int(st.st_mtime_ns), digest),
+    )
+
+
+def forget_file(cur, rel: str):
+    """
+    Removes the rows a previous version of this file produced (links + FTS
+    cascade). A page that another file's copy was deduped against is handed
+    over to that file instead, so its content stays indexed.
+    """
+    cur.execute("DELETE FROM duplicate_pages WHERE source_path=?", (rel,))
+    cur.execute(
+        """
+        SELECT d.id, p.content_hash, p.source_path, p.filename, p.page
+        FROM documents d
+        JOIN duplicate_pages p ON p.content_hash = d.content_hash
+        WHERE d.source_path = ?
+        ORDER BY d.id, p.source_path, p.page
+        """,
+        (rel,),
+    )
+    heirs: Dict[int, Tuple[str, str, str, int]] = {}
+    for doc_id, h, path, filename, page in cur.fetchall():
+        heirs.setdefault(int(doc_id), (h, path, filename, int(page)))
+    for doc_id, (h, path, filename, page) in heirs.items():
+        cur.execute(
+            "UPDATE documents SET filename=?, page=?, source_path=? WHERE id=?", (filename, page, path, doc_id)
+        )
+        cur.execute(
+            "DELETE FROM duplicate_pages WHERE content_hash=? AND source_path=? AND page=?", (h, path, page)
+        )
+    cur.execute("DELETE FROM documents WHERE source_path=?", (rel,))
+    cur.execute("DELETE FROM image_renditions WHERE image_path=?", (rel,))
+    # images linked to this text file are reconsidered against its new version
+    cur.execute(
+        "DELETE FROM ingest_manifest WHERE path IN (SELECT image_path FROM image_renditions WHERE text_path=?)",
+        (rel,),
+    )
+    cur.execute("DELETE FROM image_renditions WHERE text_path=?", (rel,))
+
+
+DUPLICATE_PAGE_INSERT = """
+INSERT OR IGNORE INTO duplicate_pages(content_hash, source_path, filename, page) VALUES (?, ?, ?, ?)
+"""
+
+
+def record_duplicate(cur, h: str, filename: str, page: int, source_path: Optional[str]):
+    """Notes a page skipped as a duplicate, so forget_file() can hand the indexed copy over to it."""
+    if source_path is not None:
+        cur.execute(DUPLICATE_PAGE_INSERT, (h, source_path, filename, int(page)))
+
+
+def record_rendition(cur, image_rel: str, text_rel: str, bates: str):
+    cur.execute(
+        """
+        INSERT INTO image_renditions(image_path, text_path, bates) VALUES (?, ?, ?)
+        ON CONFLICT(image_path) DO UPDATE SET text_path = excluded.text_path, bates = excluded.bates
+        """,
+        (image_rel, text_rel, bates),
+    )
 
 
 # -----------------------------
 # Main ingest entry point
 # -----------------------------
-def ingest_all(raw_dir: Path, db_path: Path):
+def ingest_all(
+    raw_dir: Path,
+    db_path: Path,
+    ocr_workers: int = OCR_WORKERS,
+    bulk_load: Optional[bool] = None,
+    reuse_text_renditions: bool = REUSE_TEXT_RENDITIONS,
+    pdf_engine: str = PDF_ENGINE,
+    trigram: bool = False,
+):
+    """
+    Ingests every supported file under raw_dir.
+
+    Work is committed every CHECKPOINT_FILES files / CHECKPOINT_SECONDS
+    seconds (WAL mode, so readers see the committed portion meanwhile) and
+    progress is kept in ingest_runs. After a crash or Ctrl-C, re-running
+    picks up where it stopped: committed files are skipped via the manifest,
+    and an interrupted bulk load stays in bulk mode until its FTS rebuild.
+
+    bulk_load drops the FTS and frequency-table triggers for the run and
+    rebuilds documents_fts (rebuild + optimize) and entity_stats/asset_stats
+    once at the end instead of row by row. None means
+    bulk-load only when the index is empty, i.e. on a full rebuild.
+
+    With reuse_text_renditions, page images covered by a text rendition
+    (HOUSE_OVERSIGHT_010477.jpg next to .txt, or mapped by an .opt/.dat load
+    file) are recorded in image_renditions and never OCR'd.
+
+    pdf_engine="pdftotext" extracts PDF text layers with poppler, splitting
+    large PDFs across processes; pdfplumber stays the fallback.
+
+    trigram=True also creates the documents_trigram substring index if it
+    does not exist yet. Once created it is maintained by every later ingest.
+
+    Files whose manifest entry (size, mtime, digest) still matches are skipped
+    before they are opened. Changed files have their old rows replaced.
+
+    With ocr_workers > 0, images are OCR'd ahead of time in a process pool.
+    Results are still consumed in file order, so hashing, inserts and
+    extract_and_link run exactly as in a serial run and produce the same database.
+    """
     raw_dir = raw_dir.resolve()
-    conn = connect(db_path)
+    conn = write_connection(db_path)
     cur = conn.cursor()
 
     files = [p for p in raw_dir.rglob("*") if p.is_file()]
@@ -90,142 +316,766 @@ def ingest_all(raw_dir: Path, db_path: Path):
         conn.close()
         return
 
-    # One transaction for speed
     cur.execute("BEGIN;")
 
-    skipped = 0
-    inserted = 0
+    run = Checkpointer(conn, raw_dir)
+    if run.resumed:
+        print(f"Resuming interrupted ingest #{run.run_id} ({run.files_done} files already committed)")
+    bulk_load = run.begin(bulk_load)
+    prepare_index_maintenance(conn, bulk_load, trigram)
 
-    for file in tqdm(files, desc="Ingesting"):
+    renditions = find_text_renditions(files, TEXT_EXTS, IMG_EXTS) if reuse_text_renditions else {}
+    batcher = PageBatcher(cur, cache=LinkCache(cur))
+    run.before_commit = batcher.flush
+
+    # Manifest pass: only new/changed files go on to parsing or OCR
+    manifest = load_manifest(cur)
+    entries: List[Tuple[Path, str, os.stat_result, str, str, Optional[Path]]] = []
+    for file in files:
         try:
             if file.is_symlink():
                 continue
-            if file.stat().st_size > MAX_FILE_BYTES:
+            st = file.stat()
+            if st.st_size > MAX_FILE_BYTES or not is_supported(file):
                 continue
+            rel = manifest_path(raw_dir, file)
+            status, digest = manifest_status(manifest, rel, file, st)
+        except OSError:
+            continue
+        text_file = renditions.get(file.stem) if file.suffix.lower() in IMG_EXTS else None
+        entries.append((file, rel, st, digest, status, text_file))
 
-            suffix = file.suffix.lower()
+    # images linked to a text file already in stand for OCR now; to one (re)ingested below,
+    # they are recorded behind it once it is in; to any other (too large, unreadable) they are OCR'd
+    queued = {e[1] for e in entries if e[5] is None and e[4] in (MANIFEST_NEW, MANIFEST_CHANGED)}
+    ready = {e[1] for e in entries if e[5] is None and e[4] in (MANIFEST_UNCHANGED, MANIFEST_TOUCHED)}
+    linked: Dict[str, List[Tuple[str, os.stat_result, str, str]]] = {}
+    todo: List[Tuple[Path, str, os.stat_result, str, str]] = []
+    unchanged = 0
+    reused = 0
+    for file, rel, st, digest, status, text_file in entries:
+        text_rel = manifest_path(raw_dir, text_file) if text_file is not None else None
+        if status == MANIFEST_UNCHANGED:
+            unchanged += 1
+        elif status == MANIFEST_TOUCHED:
+            finish_file(batcher, rel, st, digest)
+            unchanged += 1
+        elif text_rel is not None and text_rel in ready:
+            link_image(batcher, rel, st, digest, status, text_rel, file.stem)
+            reused += 1
+        elif text_rel is not None and text_rel in queued:
+            start_file(batcher, rel, status)
+            linked.setdefault(text_rel, []).append((rel, st, digest, file.stem))
+            reused += 1
+        else:
+            todo.append((file, rel, st, digest, status))
 
-            if suffix == ".pdf":
-                s, i = ingest_pdf(cur, file)
-                skipped += s
-                inserted += i
-            elif suffix in IMG_EXTS:
-                s, i = ingest_image(cur, file)
-                skipped += s
-                inserted += i
-            elif suffix in TEXT_EXTS:
-                s, i = ingest_text(cur, file)
+    pool = None
+    if ocr_workers and ocr_workers > 0 and todo:
+        pool = ProcessPoolExecutor(max_workers=int(ocr_workers), initializer=_init_ocr_worker)
+
+    skipped = 0
+    inserted = 0
+
+    prefetched = _with_ocr_prefetch([t[0] for t in todo], pool, window=int(ocr_workers or 0) * OCR_PREFETCH)
+    run.files_total = run.files_done + len(todo)
+    run.commit()  # makes the run row (and dropped triggers) durable
+
+    try:
+        for (file, ocr), (_f, rel, st, digest, status) in zip(
+            tqdm(prefetched, total=len(todo), desc="Ingesting"), todo
+        ):
+            try:
+                start_file(batcher, rel, status)
+
+                suffix = file.suffix.lower()
+
+                if suffix == ".pdf":
+                    s, i = ingest_pdf(cur, file, source_path=rel, batcher=batcher, engine=pdf_engine)
+                elif suffix in IMG_EXTS:
+                    text = _ocr_result(ocr) if ocr is not None else None
+                    s, i = ingest_image(cur, file, text=text, source_path=rel, batcher=batcher)
+                else:
+                    s, i = ingest_text(cur, file, source_path=rel, batcher=batcher)
                 skipped += s
                 inserted += i
-            else:
+
+                finish_file(batcher, rel, st, digest, linked.get(rel, ()))
+
+            except Exception:
+                # keep ingestion resilient (bad files shouldn't stop the run)
                 continue
+            run.file_done(rel)
+        batcher.flush()
+    except KeyboardInterrupt:
+        # drop the partial checkpoint; everything up to the last commit is kept
+        conn.rollback()
+        conn.close()
+        print("Ingest interrupted. Committed progress is kept; re-run to resume.")
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
-        except Exception:
-            # keep ingestion resilient (bad files shouldn't stop the run)
-            continue
+    if bulk_load:
+        t0 = time.perf_counter()
+        with stage("fts"):
+            finish_bulk_load(conn)
+        print(f"FTS index and frequency tables rebuilt in {time.perf_counter() - t0:.1f}s (bulk load)")
 
-    conn.commit()
+    run.finish()
     conn.close()
 
-    print(f"Ingestion complete. Inserted={inserted}, Skipped(existing)={skipped}")
+    print(
+        f"Ingestion complete. Inserted={inserted}, Skipped(existing)={skipped}, "
+        f"Unchanged files={unchanged}, Images linked to text renditions={reused}"
+    )
+
+
+class Checkpointer:
+    """
+    Periodic commits plus the durable ingest_runs progress row.
+
+    An unfinished run for the same raw_dir is resumed (same row, same bulk
+    mode); otherwise a new row is started. A bulk load left unfinished by
+    any other run is finished first. before_commit is called ahead of
+    every commit so buffered pages/links land in the same transaction.
+    """
+
+    def __init__(
+        self,
+        conn,
+        raw_dir: Path,
+        every_files: Optional[int] = None,
+        every_seconds: Optional[float] = None,
+    ):
+        self.conn = conn
+        self.cur = conn.cursor()
+        self.raw_dir = str(raw_dir)
+        self.every_files = max(1, int(every_files or CHECKPOINT_FILES))
+        self.every_seconds = float(every_seconds or CHECKPOINT_SECONDS)
+        self.before_commit = None
+        self.files_total = 0
+        self.last_path: Optional[str] = None
+        self._since_commit = 0
+        self._last_commit = time.monotonic()
+
+        self.cur.execute(
+            """
+            SELECT id, bulk_load, files_done FROM ingest_runs
+            WHERE raw_dir=? AND status='running'
+            ORDER BY id DESC LIMIT 1
+            """,
+            (self.raw_dir,),
+        )
+        row = self.cur.fetchone()
+        self.resumed = row is not None
+        self.run_id = int(row[0]) if row else None
+        self.bulk_load = bool(row[1]) if row else False
+        self.files_done = int(row[2]) if row else 0
+
+    def begin(self, bulk_load: Optional[bool]) -> bool:
+        """Decides bulk mode (an interrupted bulk load must finish as one) and writes the run row."""
+        if not (self.resumed and self.bulk_load) and recover_bulk_load(self.conn):
+            print("Rebuilt the indexes of an unfinished bulk load from an earlier run")
+        if not (self.resumed and self.bulk_load):
+            self.bulk_load = index_is_empty(self.cur) if bulk_load is None else bool(bulk_load)
+        if self.run_id is None:
+            self.cur.execute(
+                "INSERT INTO ingest_runs(raw_dir, status, bulk_load) VALUES (?, 'running', ?)",
+                (self.raw_dir, int(self.bulk_load)),
+            )
+            self.run_id = int(self.cur.lastrowid)
+        else:
+            self.cur.execute("UPDATE ingest_runs SET bulk_load=? WHERE id=?", (int(self.bulk_load), self.run_id))
+        return self.bulk_load
+
+    def file_done(self, rel: str):
+        self.files_done += 1
+        self.last_path = rel
+        self._since_commit += 1
+        if self._since_commit >= self.every_files or time.monotonic() - self._last_commit >= self.every_seconds:
+            self.commit()
+
+    def _save(self, status: str):
+        self.cur.execute(
+            """
+            UPDATE ingest_runs
+            SET status=?, files_total=?, files_done=?, last_path=COALESCE(?, last_path), updated_at=datetime('now')
+            WHERE id=?
+            """,
+            (status, self.files_total, self.files_done, self.last_path, self.run_id),
+        )
+
+    def commit(self):
+        if self.before_commit is not None:
+            self.before_commit()
+        self._save("running")
+        bump_generation(self.conn)
+        with stage("sqlite"):
+            self.conn.commit()
+        self.cur.execute("BEGIN;")
+        self._since_commit = 0
+        self._last_commit = time.monotonic()
+
+    def finish(self):
+        if self.before_commit is not None:
+            self.before_commit()
+        self._save("complete")
+        bump_generation(self.conn)
+        with stage("sqlite"):
+            self.conn.commit()
+
+
+def prepare_index_maintenance(conn, bulk_load: bool, trigram: bool = False):
+    """
+    Creates the trigram index when asked for. A bulk load then drops the FTS,
+    frequency-table and co-occurrence triggers; finish_bulk_load() rebuilds
+    all three at the end.
+    """
+    if trigram and not trigram_enabled(conn):
+        # a bulk load fills it in its final rebuild
+        enable_trigram_index(conn, build=not bulk_load)
+    if bulk_load:
+        drop_fts_triggers(conn)
+        drop_stats_triggers(conn)
+        drop_cooc_triggers(conn)
+        mark_bulk_load(conn, True)
+
+
+def index_is_empty(cur) -> bool:
+    cur.execute("SELECT 1 FROM documents LIMIT 1")
+    return cur.fetchone() is None
+
+
+def is_supported(file: Path) -> bool:
+    suffix = file.suffix.lower()
+    return suffix == ".pdf" or suffix in IMG_EXTS or suffix in TEXT_EXTS
+
+
+# -----------------------------
+# Parallel OCR
+# -----------------------------
+def _init_ocr_worker():
+    # tesseract is itself multi-threaded; one thread per worker avoids oversubscription
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _wants_ocr(file: Path) -> bool:
+    if file.suffix.lower() not in IMG_EXTS or file.is_symlink():
+        return False
+    size = file.stat().st_size
+    return MIN_IMAGE_BYTES <= size <= MAX_FILE_BYTES
+
+
+def _with_ocr_prefetch(
+    files: Iterable[Path], pool: Optional[ProcessPoolExecutor], window: int
+) -> Iterator[Tuple[Path, Optional[Future]]]:
+    """
+    Yields (file, ocr_future) in the original order; read a future with
+    _ocr_result(). Images further down the list are submitted to the pool
+    ahead of time, bounded to `window` in-flight jobs.
+    """
+    if pool is None:
+        for f in files:
+            yield f, None
+        return
+
+    window = max(1, window)
+    pending: Deque[Tuple[Path, Optional[Future]]] = deque()
+    in_flight = 0
+    it = iter(files)
+    exhausted = False
+
+    while True:
+        while not exhausted and in_flight < window:
+            f = next(it, None)
+            if f is None:
+                exhausted = True
+                break
+            fut = None
+            try:
+                if _wants_ocr(f):
+                    fut = pool.submit(_pooled_ocr, f)
+                    in_flight += 1
+            except OSError:
+                fut = None
+            pending.append((f, fut))
+
+        if not pending:
+            return
+
+        f, fut = pending.popleft()
+        if fut is not None:
+            in_flight -= 1
+        yield f, fut
 
 
 # -----------------------------
 # Ingest by type
 # -----------------------------
-def ingest_pdf(cur, file: Path) -> Tuple[int, int]:
-    skipped = 0
-    inserted = 0
+def pdf_pages(file: Path, engine: str = PDF_ENGINE, workers: int = PDF_WORKERS) -> Iterator[Tuple[int, str]]:
+    """Yields (page_number, normalized_text) for every non-empty PDF page."""
+    if engine == "pdftotext" and shutil.which("pdftotext") and shutil.which("pdfinfo"):
+        try:
+            with stage("parse"):
+                pages = pdftotext_pages(file, workers=workers)
+        except (OSError, ValueError, subprocess.SubprocessError):
+            pages = None
+        if pages is not None:
+            yield from pages
+            return
 
     with pdfplumber.open(str(file)) as pdf:
         for i, page in enumerate(pdf.pages, 1):
-            text = page.extract_text() or ""
-            text = normalize_text(text)
-            if not text:
-                continue
+            with stage("parse"):
+                text = normalize_text(page.extract_text() or "")
+            if text:
+                yield i, text
 
-            h = content_hash(text)
-            if hash_exists(cur, h):
-                skipped += 1
-                continue
 
-            doc_id = insert_document(cur, file.name, i, text, h)
-            extract_and_link(cur, doc_id, file.name, i, text)
+def pdf_page_count(file: Path) -> int:
+    out = subprocess.run(
+        ["pdfinfo", str(file)], capture_output=True, text=True, check=True, timeout=PDF_TIMEOUT_SEC
+    ).stdout
+    m = re.search(r"^Pages:\s+(\d+)", out, flags=re.MULTILINE)
+    if not m:
+        raise ValueError(f"pdfinfo reported no page count for {file.name}")
+    return int(m.group(1))
+
+
+def _pdftotext_range(file: Path, first: int, last: int) -> List[str]:
+    out = subprocess.run(
+        ["pdftotext", "-f", str(first), "-l", str(last), "-enc", "UTF-8", str(file), "-"],
+        capture_output=True, check=True, timeout=PDF_TIMEOUT_SEC,
+    ).stdout.decode("utf-8", errors="ignore")
+    # pdftotext ends every page with a form feed
+    pages = out.split("\f")
+    expected = last - first + 1
+    if len(pages) < expected:
+        raise ValueError(f"pdftotext returned {len(pages)} pages for {file.name} {first}-{last}")
+    return pages[:expected]
+
+
+def pdftotext_pages(file: Path, workers: int = PDF_WORKERS) -> List[Tuple[int, str]]:
+    """Text layer via poppler, page ranges extracted concurrently, results in page order."""
+    n = pdf_page_count(file)
+    ranges = [(lo, min(lo + PDF_CHUNK_PAGES - 1, n)) for lo in range(1, n + 1, PDF_CHUNK_PAGES)]
+    if len(ranges) <= 1 or workers <= 1:
+        chunks = [_pdftotext_range(file, lo, hi) for lo, hi in ranges]
+    else:
+        with ThreadPoolExecutor(max_workers=min(int(workers), len(ranges))) as ex:
+            chunks = list(ex.map(lambda r: _pdftotext_range(file, *r), ranges))
+
+    out: List[Tuple[int, str]] = []
+    for (lo, _hi), chunk in zip(ranges, chunks):
+        for offset, raw in enumerate(chunk):
+            text = normalize_text(raw)
+            if text:
+                out.append((lo + offset, text))
+    return out
+
+
+def ingest_pdf(
+    cur,
+    file: Path,
+    source_path: Optional[str] = None,
+    batcher: Optional["PageBatcher"] = None,
+    engine: str = PDF_ENGINE,
+) -> Tuple[int, int]:
+    own = batcher is None
+    batcher = batcher or PageBatcher(cur)
+    skipped = 0
+    inserted = 0
+
+    for i, text in pdf_pages(file, engine=engine):
+        if batcher.add(file.name, i, text, source_path):
             inserted += 1
+        else:
+            skipped += 1
 
+    if own:
+        batcher.flush()
     return skipped, inserted
 
 
-def ingest_image(cur, file: Path) -> Tuple[int, int]:
+def ocr_image(file: Path) -> str:
+    """OCR one image to normalized text. Top-level so it can run in a process pool."""
+    with stage("ocr"), Image.open(file) as img:
+        text = pytesseract.image_to_string(img) or ""
+    return normalize_text(text)
+
+
+def _pooled_ocr(file: Path) -> Tuple[str, float]:
+    """
+    ocr_image() in a pool worker, plus its seconds: the worker's own stage
+    timers never reach the parent, so _ocr_result() records them there.
+    """
+    t0 = time.perf_counter()
+    text = ocr_image(file)
+    return text, time.perf_counter() - t0
+
+
+def _ocr_result(fut: Future) -> str:
+    text, seconds = fut.result()
+    record("ocr", seconds)
+    return text
+
+
+def ingest_image(
+    cur,
+    file: Path,
+    text: Optional[str] = None,
+    source_path: Optional[str] = None,
+    batcher: Optional["PageBatcher"] = None,
+) -> Tuple[int, int]:
     # quick skip tiny files (often icons/noise)
-    if file.stat().st_size < 5000:
+    if file.stat().st_size < MIN_IMAGE_BYTES:
         return 1, 0
 
-    text = pytesseract.image_to_string(Image.open(file)) or ""
-    text = normalize_text(text)
+    if text is None:
+        text = ocr_image(file)
     if not text:
         return 0, 0
 
-    h = content_hash(text)
-    if hash_exists(cur, h):
-        return 1, 0
+    return _ingest_single_page(cur, file, text, source_path, batcher)
 
-    doc_id = insert_document(cur, file.name, 1, text, h)
-    extract_and_link(cur, doc_id, file.name, 1, text)
-    return 0, 1
 
+def read_text_file(file: Path) -> str:
+    with stage("parse"):
+        return normalize_text(file.read_text(errors="ignore"))
 
-def ingest_text(cur, file: Path) -> Tuple[int, int]:
-    text = normalize_text(file.read_text(errors="ignore"))
+
+def ingest_text(
+    cur, file: Path, source_path: Optional[str] = None, batcher: Optional["PageBatcher"] = None
+) -> Tuple[int, int]:
+    text = read_text_file(file)
     if not text:
         return 0, 0
 
-    h = content_hash(text)
-    if hash_exists(cur, h):
-        return 1, 0
+    return _ingest_single_page(cur, file, text, source_path, batcher)
+
+
+def _ingest_single_page(
+    cur, file: Path, text: str, source_path: Optional[str], batcher: Optional["PageBatcher"]
+) -> Tuple[int, int]:
+    own = batcher is None
+    batcher = batcher or PageBatcher(cur)
+    added = batcher.add(file.name, 1, text, source_path)
+    if own:
+        batcher.flush()
+    return (0, 1) if added else (1, 0)
+
+
+# -----------------------------
+# Batched NER
+# -----------------------------
+# (filename, page, text, content hash, source path, features or None = extract on flush)
+PendingPage = Tuple[str, int, str, str, Optional[str], Optional[Tuple[EntMentions, AssetMentions]]]
+
+
+class PageBatcher:
+    """
+    Buffers new pages so spaCy NER runs through NLP.pipe in batches.
+
+    Dedupe is decided on add() (database + pages still in the buffer), and
+    pages are inserted and linked in arrival order on flush(), so document
+    ids and entity rows are the same as inserting each page immediately.
+    Pages whose features were extracted elsewhere (the pipeline's worker
+    processes) pass them to add() and skip NER here.
+
+    Manifest rows are buffered too (record_manifest) and written by the
+    flush that inserts the file's pages, so a file is never marked ingested
+    before its pages are in. If a batch fails it is retried one file at a
+    time; files that still fail are dropped without a manifest row, so the
+    next run retries them.
+    """
+
+    def __init__(
+        self,
+        cur,
+        buffer_pages: int = NER_BUFFER_PAGES,
+        batch_size: int = NER_BATCH_SIZE,
+        n_process: int = NER_PROCESSES,
+        cache: Optional["LinkCache"] = None,
+    ):
+        self.cur = cur
+        self.cache = cache
+        self.buffer_pages = max(1, int(buffer_pages))
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.pending: List[PendingPage] = []
+        self.pending_hashes: set = set()
+        # (position in pending, page) deduped against a buffered page; stands in if that page's file fails
+        self.pending_dupes: List[Tuple[int, PendingPage]] = []
+        self.manifest: List[Tuple[str, os.stat_result, str, Optional[Tuple[str, str]]]] = []
+        self.failed: set = set()  # source paths dropped by a failed flush
+
+    def add(
+        self,
+        filename: str,
+        page: int,
+        text: str,
+        source_path: Optional[str] = None,
+        h: Optional[str] = None,
+        features: Optional[Tuple[EntMentions, AssetMentions]] = None,
+    ) -> bool:
+        """
+        Returns False if the page is a duplicate of an existing or buffered
+        page. h and features may be passed when already computed.
+        """
+        h = h or content_hash(text)
+        if h in self.pending_hashes:
+            self.pending_dupes.append((len(self.pending), (filename, page, text, h, source_path, features)))
+            record_duplicate(self.cur, h, filename, page, source_path)
+            return False
+        if hash_exists(self.cur, h):
+            record_duplicate(self.cur, h, filename, page, source_path)
+            return False
+        self.pending.append((filename, page, text, h, source_path, features))
+        self.pending_hashes.add(h)
+        if len(self.pending) >= self.buffer_pages:
+            self.flush()
+        return True
+
+    def record_manifest(
+        self, rel: str, st: os.stat_result, digest: str, rendition: Optional[Tuple[str, str]] = None
+    ):
+        """
+        Queues rel's manifest row behind its buffered pages. rendition
+        (text_path, bates) links an image to a text file instead; its rows
+        are only written if that text file's pages went in.
+        """
+        self.manifest.append((rel, st, digest, rendition))
+
+    def flush(self):
+        if self.pending and not self._insert(self.pending):
+            self._insert_by_file()
+        with stage("sqlite"):
+            for rel, st, digest, rendition in self.manifest:
+                if rel in self.failed or (rendition is not None and rendition[0] in self.failed):
+                    continue
+                if rendition is not None:
+                    record_rendition(self.cur, rel, *rendition)
+                record_manifest(self.cur, rel, st, digest)
+        self.pending, self.pending_dupes, self.manifest = [], [], []
+        self.pending_hashes = set()
+
+    def _insert(self, pages: List[PendingPage]) -> bool:
+        """Inserts and links pages under one savepoint; False, with nothing written, if any of it fails."""
+        self.cur.execute("SAVEPOINT page_batch")
+        try:
+            features = [p[5] for p in pages]
+            missing = [i for i, f in enumerate(features) if f is None]
+            if missing:
+                extracted = extract_features_batch(
+                    [pages[i][2] for i in missing], batch_size=self.batch_size, n_process=self.n_process
+                )
+                for i, f in zip(missing, extracted):
+                    features[i] = f
+            with stage("sqlite"):
+                for (filename, page, text, h, source_path, _f), (ents, assets) in zip(pages, features):
+                    doc_id = insert_document(self.cur, filename, page, text, h, source_path)
+                    link_features(self.cur, doc_id, ents, assets, cache=self.cache)
+                if self.cache is not None:
+                    self.cache.flush()
+        except Exception:
+            self.cur.execute("ROLLBACK TO page_batch")
+            self.cur.execute("RELEASE page_batch")
+            if self.cache is not None:
+                self.cache.reset()  # ids of rolled-back entities/assets
+            return False
+        self.cur.execute("RELEASE page_batch")
+        return True
+
+    def _insert_by_file(self):
+        files: Dict[Optional[str], List[Tuple[PendingPage, bool]]] = {}
+        dupes = deque(self.pending_dupes)
+        for i in range(len(self.pending) + 1):
+            while dupes and dupes[0][0] == i:
+                d = dupes.popleft()[1]
+                files.setdefault(d[4], []).append((d, True))
+            if i < len(self.pending):
+                files.setdefault(self.pending[i][4], []).append((self.pending[i], False))
+
+        orphaned: set = set()  # hashes whose page was dropped with a failed file
+        for source_path, entries in files.items():
+            pages, hashes = [], set()
+            for page, dupe in entries:
+                if dupe and (page[3] not in orphaned or page[3] in hashes):
+                    continue
+                pages.append(page)
+                hashes.add(page[3])
+            if self._insert(pages):
+                orphaned -= hashes
+            else:
+                orphaned |= hashes
+                self.failed.add(source_path)
+
+
+# -----------------------------
+# Per-file write step (ingest_all and the pipeline writer)
+# -----------------------------
+def start_file(batcher: PageBatcher, rel: str, status: str):
+    """
+    Goes before a file's pages. A changed file loses its old rows first; the
+    buffered pages are flushed ahead of that, so they are deduped against
+    the old rows as in a serial run.
+    """
+    if status == MANIFEST_CHANGED:
+        batcher.flush()
+        forget_file(batcher.cur, rel)
+
+
+def finish_file(
+    batcher: PageBatcher,
+    rel: str,
+    st: os.stat_result,
+    digest: str,
+    images: Iterable[Tuple[str, os.stat_result, str, str]] = (),
+):
+    """
+    Goes after a file's pages: queues its manifest row, then those of the
+    page images (image_rel, stat, digest, bates) linked to it as their text
+    rendition, all written behind the pages by the next flush.
+    """
+    batcher.record_manifest(rel, st, digest)
+    for image_rel, image_st, image_digest, bates in images:
+        batcher.record_manifest(image_rel, image_st, image_digest, rendition=(rel, bates))
+
 
-    doc_id = insert_document(cur, file.name, 1, text, h)
-    extract_and_link(cur, doc_id, file.name, 1, text)
-    return 0, 1
+def link_image(
+    batcher: PageBatcher, rel: str, st: os.stat_result, digest: str, status: str, text_rel: str, bates: str
+):
+    """A page image whose text rendition is already indexed: recorded against it, never OCR'd."""
+    start_file(batcher, rel, status)
+    batcher.record_manifest(rel, st, digest, rendition=(text_rel, bates))
 
 
 # -----------------------------
 # DB insert + extraction
 # -----------------------------
-def insert_document(cur, filename: str, page: int, content: str, h: str) -> int:
+def insert_document(
+    cur, filename: str, page: int, content: str, h: str, source_path: Optional[str] = None
+) -> int:
     cur.execute(
-        "INSERT INTO documents(filename, page, content, content_hash) VALUES (?, ?, ?, ?)",
-        (filename, int(page), content, h),
+        "INSERT INTO documents(filename, page, content, content_hash, source_path) VALUES (?, ?, ?, ?, ?)",
+        (filename, int(page), content, h, source_path),
     )
     return int(cur.lastrowid)
 
 
-def extract_and_link(cur, doc_id: int, filename: str, page: int, text: str):
+def _wants_ner(text: str) -> bool:
+    # Gate spaCy on garbage/small text (saves hours)
+    if NLP is None or len(text) < 200:
+        return False
+    alpha_ratio = sum(c.isalpha() for c in text) / max(len(text), 1)
+    return alpha_ratio >= 0.30
+
+
+def _ent_mentions(doc) -> EntMentions:
+    mentions: EntMentions = {}
+    for ent in doc.ents:
+        t = ent.text.strip()
+        if t:
+            start = ent.start_char + ent.text.index(t)
+            mentions.setdefault((t, ent.label_, norm_key(t)), []).append((start, start + len(t)))
+    return mentions
+
+
+def ner_batch(
+    texts: List[str], batch_size: int = NER_BATCH_SIZE, n_process: int = NER_PROCESSES
+) -> List[EntMentions]:
+    """spaCy entity mentions for many pages through one NLP.pipe call."""
+    out: List[EntMentions] = [{} for _ in texts]
+    idx = [i for i, t in enumerate(texts) if _wants_ner(t)]
+    if not idx:
+        return out
+    with stage("ner"):
+        docs = NLP.pipe((texts[i] for i in idx), batch_size=int(batch_size), n_process=int(n_process))
+        for i, doc in zip(idx, docs):
+            out[i] = _ent_mentions(doc)
+    return out
+
+
+def _regex_mentions(out: Dict[Tuple[str, str, str], List[Span]], pattern: "re.Pattern", label: str, text: str, group: int = 0):
+    for m in pattern.finditer(text):
+        value = m.group(group)
+        out.setdefault((value, label, norm_key(value)), []).append(m.span(group))
+
+
+def extract_features(text: str, ents: Optional[EntMentions] = None) -> Tuple[EntMentions, AssetMentions]:
+    """
+    Pure extraction step (spaCy + regex), no database access.
+    Safe to run in worker processes. Pass ents to reuse batched NER output.
+    Every mention keeps its character span; the count is len(spans).
+    """
     # --- Entities ---
-    ent_counts: Counter[Tuple[str, str, str]] = Counter()  # (text, label, normalized)
+    ent_mentions: EntMentions = {}  # (text, label, normalized) -> spans
 
-    # Gate spaCy on garbage/small text (saves hours)
-    if NLP is not None and len(text) >= 200:
-        alpha_ratio = sum(c.isalpha() for c in text) / max(len(text), 1)
-        if alpha_ratio >= 0.30:
-            doc = NLP(text)
-            for ent in doc.ents:
-                t = ent.text.strip()
-                if t:
-                    ent_counts[(t, ent.label_, norm_key(t))] += 1
+    if ents is not None:
+        ent_mentions.update((k, list(spans)) for k, spans in ents.items())
+    elif _wants_ner(text):
+        with stage("ner"):
+            ent_mentions.update(_ent_mentions(NLP(text)))
+
+    with stage("regex"):
+        _regex_mentions(ent_mentions, EMAIL_RE, "EMAIL", text)
+        _regex_mentions(ent_mentions, PHONE_RE, "PHONE", text)
+        _regex_mentions(ent_mentions, URL_RE, "URL", text)
+
+        # --- Assets ---
+        # keyed (type, value, norm) like the assets table
+        found: Dict[Tuple[str, str, str], List[Span]] = {}
+        _regex_mentions(found, AIRCRAFT_REG_RE, "AIRCRAFT_REG", text, group=1)
+        _regex_mentions(found, IMO_RE, "IMO", text)
+        asset_mentions: AssetMentions = {(atype, value, norm): spans for (value, atype, norm), spans in found.items()}
 
-    for email in EMAIL_RE.findall(text):
-        ent_counts[(email, "EMAIL", norm_key(email))] += 1
+    return ent_mentions, asset_mentions
 
-    for phone in PHONE_RE.findall(text):
-        ent_counts[(phone, "PHONE", norm_key(phone))] += 1
 
-    for url in URL_RE.findall(text):
-        ent_counts[(url, "URL", norm_key(url))] += 1
+def extract_features_batch(
+    texts: List[str], batch_size: int = NER_BATCH_SIZE, n_process: int = NER_PROCESSES
+) -> List[Tuple[EntMentions, AssetMentions]]:
+    ents = ner_batch(texts, batch_size=batch_size, n_process=n_process)
+    return [extract_features(t, e) for t, e in zip(texts, ents)]
+
+
+def extract_and_link(cur, doc_id: int, filename: str, page: int, text: str):
+    ent_mentions, asset_mentions = extract_features(text)
+    link_features(cur, doc_id, ent_mentions, asset_mentions)
+
+
+DOC_ENTITY_UPSERT = """
+INSERT INTO doc_entities(doc_id, entity_id, count)
+VALUES (?, ?, ?)
+ON CONFLICT(doc_id, entity_id) DO UPDATE SET count = count + excluded.count
+"""
+
+DOC_ASSET_UPSERT = """
+INSERT INTO doc_assets(doc_id, asset_id, count)
+VALUES (?, ?, ?)
+ON CONFLICT(doc_id, asset_id) DO UPDATE SET count = count + excluded.count
+"""
+
+ENTITY_MENTION_INSERT = """
+INSERT OR IGNORE INTO entity_mentions(entity_id, doc_id, start_char, end_char) VALUES (?, ?, ?, ?)
+"""
+
+ASSET_MENTION_INSERT = """
+INSERT OR IGNORE INTO asset_mentions(asset_id, doc_id, start_char, end_char) VALUES (?, ?, ?, ?)
+"""
+
+
+def link_features(
+    cur, doc_id: int, ent_mentions: EntMentions, asset_mentions: AssetMentions, cache: Optional["LinkCache"] = None
+):
+    if cache is not None:
+        cache.link(doc_id, ent_mentions, asset_mentions)
+        return
 
     # Insert entities + link
-    entity_ids: Dict[Tuple[str, str], int] = {}
-    for (t, lab, norm), c in ent_counts.items():
+    for (t, lab, norm), spans in ent_mentions.items():
         cur.execute(
             "INSERT OR IGNORE INTO entities(text, label, normalized) VALUES (?, ?, ?)",
             (t, lab, norm),
@@ -235,27 +1085,12 @@ def extract_and_link(cur, doc_id: int, filename: str, page: int, text: str):
         if not row:
             continue
         eid = int(row[0])
-        entity_ids[(norm, lab)] = eid
-
-        cur.execute(
-            """
-            INSERT INTO doc_entities(doc_id, entity_id, count)
-            VALUES (?, ?, ?)
-            ON CONFLICT(doc_id, entity_id) DO UPDATE SET count = count + excluded.count
-            """,
-            (doc_id, eid, int(c)),
-        )
-
-    # --- Assets ---
-    asset_counts: Counter[Tuple[str, str, str]] = Counter()  # (type, value, norm)
 
-    for reg in AIRCRAFT_REG_RE.findall(text):
-        asset_counts[("AIRCRAFT_REG", reg, norm_key(reg))] += 1
+        cur.execute(DOC_ENTITY_UPSERT, (doc_id, eid, len(spans)))
+        cur.executemany(ENTITY_MENTION_INSERT, [(eid, doc_id, a, b) for a, b in spans])
 
-    for imo in IMO_RE.findall(text):
-        asset_counts[("IMO", imo, norm_key(imo))] += 1
-
-    for (atype, aval, anorm), c in asset_counts.items():
+    # Insert assets + link
+    for (atype, aval, anorm), spans in asset_mentions.items():
         cur.execute(
             "INSERT OR IGNORE INTO assets(asset_type, asset_value, normalized) VALUES (?, ?, ?)",
             (atype, aval, anorm),
@@ -266,11 +1101,143 @@ def extract_and_link(cur, doc_id: int, filename: str, page: int, text: str):
             continue
         aid = int(row[0])
 
-        cur.execute(
-            """
-            INSERT INTO doc_assets(doc_id, asset_id, count)
-            VALUES (?, ?, ?)
-            ON CONFLICT(doc_id, asset_id) DO UPDATE SET count = count + excluded.count
-            """,
-            (doc_id, aid, int(c)),
-        )
+        cur.execute(DOC_ASSET_UPSERT, (doc_id, aid, len(spans)))
+        cur.executemany(ASSET_MENTION_INSERT, [(aid, doc_id, a, b) for a, b in spans])
+
+
+class LinkCache:
+    """
+    Ingest-scoped id cache: (normalized, label) -> entity id and
+    (asset_type, normalized) -> asset id, warmed from the existing tables.
+
+    Known entities/assets cost no SQL at all; unseen ones are a single
+    INSERT. doc_entities/doc_assets links and mention offsets are buffered
+    and written with executemany on flush(). Assumes it is the only writer for the
+    duration of the ingest (the ingest transaction guarantees that).
+    """
+
+    def __init__(self, cur):
+        self.cur = cur
+        self.reset()
+
+    def reset(self):
+        """Re-reads the id maps from the tables and drops buffered links (after a rollback)."""
+        cur = self.cur
+        cur.execute("SELECT normalized, label, id FROM entities")
+        self.entities: Dict[Tuple[str, str], int] = {(r[0], r[1]): int(r[2]) for r in cur.fetchall()}
+        cur.execute("SELECT asset_type, normalized, id FROM assets")
+        self.assets: Dict[Tuple[str, str], int] = {(r[0], r[1]): int(r[2]) for r in cur.fetchall()}
+        self.doc_entities: List[Tuple[int, int, int]] = []
+        self.doc_assets: List[Tuple[int, int, int]] = []
+        self.entity_mentions: List[Tuple[int, int, int, int]] = []
+        self.asset_mentions: List[Tuple[int, int, int, int]] = []
+
+    def entity_id(self, text: str, label: str, normalized: str) -> int:
+        eid = self.entities.get((normalized, label))
+        if eid is None:
+            self.cur.execute(
+                "INSERT INTO entities(text, label, normalized) VALUES (?, ?, ?)",
+                (text, label, normalized),
+            )
+            eid = self.entities[(normalized, label)] = int(self.cur.lastrowid)
+        return eid
+
+    def asset_id(self, asset_type: str, value: str, normalized: str) -> int:
+        aid = self.assets.get((asset_type, normalized))
+        if aid is None:
+            self.cur.execute(
+                "INSERT INTO assets(asset_type, asset_value, normalized) VALUES (?, ?, ?)",
+                (asset_type, value, normalized),
+            )
+            aid = self.assets[(asset_type, normalized)] = int(self.cur.lastrowid)
+        return aid
+
+    def link(self, doc_id: int, ent_mentions: EntMentions, asset_mentions: AssetMentions):
+        # (text, label, norm) keys that share an id collapse into one link row
+        ent_links: Counter[int] = Counter()
+        for (t, lab, norm), spans in ent_mentions.items():
+            eid = self.entity_id(t, lab, norm)
+            ent_links[eid] += len(spans)
+            self.entity_mentions.extend((eid, doc_id, a, b) for a, b in spans)
+        self.doc_entities.extend((doc_id, eid, c) for eid, c in ent_links.items())
+
+        asset_links: Counter[int] = Counter()
+        for (atype, aval, anorm), spans in asset_mentions.items():
+            aid = self.asset_id(atype, aval, anorm)
+            asset_links[aid] += len(spans)
+            self.asset_mentions.extend((aid, doc_id, a, b) for a, b in spans)
+        self.doc_assets.extend((doc_id, aid, c) for aid, c in asset_links.items())
+
+    def flush(self):
+        if self.doc_entities:
+            self.cur.executemany(DOC_ENTITY_UPSERT, self.doc_entities)
+            self.doc_entities = []
+        if self.doc_assets:
+            self.cur.executemany(DOC_ASSET_UPSERT, self.doc_assets)
+            self.doc_assets = []
+        if self.entity_mentions:
+            self.cur.executemany(ENTITY_MENTION_INSERT, self.entity_mentions)
+            self.entity_mentions = []
+        if self.asset_mentions:
+            self.cur.executemany(ASSET_MENTION_INSERT, self.asset_mentions)
+            self.asset_mentions = []
+
+
+# -----------------------------
+# Mention offsets for pages indexed before they were recorded
+# -----------------------------
+BACKFILL_PAGES = 1000  # pages re-extracted (and committed) per batch
+
+
+def backfill_mentions(db_path: Path, batch_pages: int = BACKFILL_PAGES) -> int:
+    """
+    Re-runs extraction over linked pages that have no mention rows and records
+    the offsets of the entities/assets they are already linked to. Links and
+    counts are left alone. Returns the number of pages backfilled.
+    """
+    conn = write_connection(db_path)
+    cur = conn.cursor()
+    done = 0
+    try:
+        cache = LinkCache(cur)
+        last_id = 0
+        while True:
+            cur.execute(
+                """
+                SELECT d.id, d.content FROM documents d
+                WHERE d.id > ?
+                  AND (EXISTS (SELECT 1 FROM doc_entities WHERE doc_id = d.id)
+                       OR EXISTS (SELECT 1 FROM doc_assets WHERE doc_id = d.id))
+                  AND NOT EXISTS (SELECT 1 FROM entity_mentions WHERE doc_id = d.id)
+                  AND NOT EXISTS (SELECT 1 FROM asset_mentions WHERE doc_id = d.id)
+                ORDER BY d.id
+                LIMIT ?
+                """,
+                (last_id, max(1, int(batch_pages))),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            last_id = int(rows[-1][0])
+            features = extract_features_batch([r[1] for r in rows])
+
+            cur.execute("BEGIN;")
+            for (doc_id, _text), (ents, assets) in zip(rows, features):
+                cur.execute("SELECT entity_id FROM doc_entities WHERE doc_id=?", (doc_id,))
+                linked_ents = {r[0] for r in cur.fetchall()}
+                cur.execute("SELECT asset_id FROM doc_assets WHERE doc_id=?", (doc_id,))
+                linked_assets = {r[0] for r in cur.fetchall()}
+                for (_t, lab, norm), spans in ents.items():
+                    eid = cache.entities.get((norm, lab))
+                    if eid in linked_ents:
+                        cur.executemany(ENTITY_MENTION_INSERT, [(eid, doc_id, a, b) for a, b in spans])
+                for (atype, _v, anorm), spans in assets.items():
+                    aid = cache.assets.get((atype, anorm))
+                    if aid in linked_assets:
+                        cur.executemany(ASSET_MENTION_INSERT, [(aid, doc_id, a, b) for a, b in spans])
+            bump_generation(conn)
+            conn.commit()
+            done += len(rows)
+    finally:
+        conn.close()
+    return done
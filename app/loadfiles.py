@@ -0,0 +1,141 @@
+from __future__ import annotations
+import csv
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Production load files that ship alongside page images
+OPT_EXT = ".opt"   # Opticon image load file
+DAT_EXT = ".dat"   # Concordance metadata load file
+
+# Concordance delimiters: field separator ¶ (0x14), text qualifier þ
+DAT_SEP = "\x14"
+DAT_QUOTE = "\xfe"
+
+BATES_RE = re.compile(r"^(?P<prefix>.*?)(?P<num>\d+)$")
+
+BEGIN_BATES_COLS = ("BEGBATES", "BEGINBATES", "BEGDOC", "BATESBEGIN", "PRODBEGBATES", "BEGNO")
+END_BATES_COLS = ("ENDBATES", "ENDDOC", "BATESEND", "PRODENDBATES", "ENDNO")
+TEXT_PATH_COLS = ("TEXTPATH", "TEXTLINK", "EXTRACTEDTEXT", "TEXT", "OCRPATH", "TEXTFILE")
+
+
+def _col_key(name: str) -> str:
+    return re.sub(r"[^A-Z]", "", (name or "").upper())
+
+
+def _stem_of(path_text: str) -> str:
+    # load files use Windows separators regardless of platform
+    name = (path_text or "").strip().replace("\\", "/").rsplit("/", 1)[-1]
+    return name.rsplit(".", 1)[0] if "." in name else name
+
+
+def bates_range(begin: str, end: str, max_pages: int = 100000) -> List[str]:
+    """Expands HOUSE_OVERSIGHT_010477..HOUSE_OVERSIGHT_010479 into every Bates number."""
+    mb, me = BATES_RE.match(begin or ""), BATES_RE.match(end or "")
+    if not mb or not me or mb.group("prefix") != me.group("prefix"):
+        return [begin] if begin else []
+    lo, hi = int(mb.group("num")), int(me.group("num"))
+    if hi < lo or hi - lo >= max_pages:
+        return [begin]
+    width = len(mb.group("num"))
+    prefix = mb.group("prefix")
+    return [f"{prefix}{n:0{width}d}" for n in range(lo, hi + 1)]
+
+
+def parse_opt(path: Path) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (page_bates, document_start_bates) from an Opticon .opt file.
+    Row layout: BATES,VOLUME,IMAGE_PATH,DOC_BREAK(Y/blank),BOX,FOLDER,PAGE_COUNT
+    """
+    doc_start: Optional[str] = None
+    with path.open("r", encoding="utf-8", errors="ignore", newline="") as fh:
+        for row in csv.reader(fh):
+            if not row or not row[0].strip():
+                continue
+            bates = row[0].strip()
+            if doc_start is None or (len(row) > 3 and row[3].strip().upper() == "Y"):
+                doc_start = bates
+            yield bates, doc_start
+
+
+def parse_dat(path: Path) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Yields (begin_bates, end_bates, text_path_stem) rows from a Concordance .dat file."""
+    with path.open("r", encoding="utf-8-sig", errors="ignore", newline="") as fh:
+        lines = iter(fh)
+        header = next(lines, None)
+        if header is None:
+            return
+        cols = [_col_key(c.strip().strip(DAT_QUOTE)) for c in header.rstrip("\r\n").split(DAT_SEP)]
+
+        def find(names: Iterable[str]) -> Optional[int]:
+            for n in names:
+                if n in cols:
+                    return cols.index(n)
+            return None
+
+        ib, ie, it = find(BEGIN_BATES_COLS), find(END_BATES_COLS), find(TEXT_PATH_COLS)
+        if ib is None:
+            return
+        for line in lines:
+            vals = [v.strip().strip(DAT_QUOTE) for v in line.rstrip("\r\n").split(DAT_SEP)]
+            if len(vals) <= ib or not vals[ib]:
+                continue
+            begin = vals[ib]
+            end = vals[ie] if ie is not None and len(vals) > ie and vals[ie] else begin
+            text_stem = _stem_of(vals[it]) if it is not None and len(vals) > it and vals[it] else None
+            yield begin, end, text_stem
+
+
+def find_text_renditions(files: Iterable[Path], text_exts: Iterable[str], image_exts: Iterable[str]) -> Dict[str, Path]:
+    """
+    Maps page-image Bates stems to the text rendition that already covers them.
+
+    A page image is covered when
+      - a text file with the same Bates stem exists (HOUSE_OVERSIGHT_010477.jpg/.txt), or
+      - an .opt load file places it inside a document whose first page has a
+        text file, or a .dat load file's Bates range points at a text file.
+    """
+    text_exts, image_exts = set(text_exts), set(image_exts)
+    text_by_stem: Dict[str, Path] = {}
+    image_stems: set = set()
+    opts: List[Path] = []
+    dats: List[Path] = []
+
+    for f in files:
+        suffix = f.suffix.lower()
+        if suffix in text_exts:
+            try:
+                if f.stat().st_size > 0:
+                    text_by_stem.setdefault(f.stem, f)
+            except OSError:
+                continue
+        elif suffix in image_exts:
+            image_stems.add(f.stem)
+        elif suffix == OPT_EXT:
+            opts.append(f)
+        elif suffix == DAT_EXT:
+            dats.append(f)
+
+    out: Dict[str, Path] = {s: text_by_stem[s] for s in image_stems if s in text_by_stem}
+
+    for opt in opts:
+        try:
+            for bates, doc_start in parse_opt(opt):
+                if bates in image_stems and bates not in out and doc_start in text_by_stem:
+                    out[bates] = text_by_stem[doc_start]
+        except OSError:
+            continue
+
+    for dat in dats:
+        try:
+            for begin, end, text_stem in parse_dat(dat):
+                target = text_by_stem.get(text_stem or "") or text_by_stem.get(begin)
+                if target is None:
+                    continue
+                for bates in bates_range(begin, end):
+                    if bates in image_stems and bates not in out:
+                        out[bates] = target
+        except OSError:
+            continue
+
+    return out
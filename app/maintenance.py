@@ -0,0 +1,165 @@
+from __future__ import annotations
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.db import (
+    bump_generation,
+    disable_trigram_index,
+    enable_trigram_index,
+    fts_index_bytes,
+    read_connection,
+    rebuild_cooccurrence,
+    rebuild_stats,
+    trigram_enabled,
+    write_connection,
+)
+from app.search import MODE_SUBSTRING, MODE_TOKENS, RESULT_CACHE, keyword_search_page
+
+# -----------------------------
+# Index maintenance (offline, run between ingests)
+# -----------------------------
+REPORT_RUNS = 20  # timed repetitions per query and mode
+
+
+def set_trigram_index(db_path: Path, enabled: bool) -> float:
+    """Builds (post-pass over every page) or drops documents_trigram. Returns seconds taken."""
+    conn = write_connection(db_path)
+    t0 = time.perf_counter()
+    try:
+        conn.execute("BEGIN;")
+        if enabled and not trigram_enabled(conn):
+            enable_trigram_index(conn, build=True)
+        elif not enabled:
+            disable_trigram_index(conn)
+        conn.commit()
+        if not enabled:
+            conn.execute("VACUUM")  # give the shadow tables' pages back to the filesystem
+    finally:
+        conn.close()
+    return time.perf_counter() - t0
+
+
+def recompute_stats(db_path: Path) -> float:
+    """Rebuilds entity_stats / asset_stats from the link tables (repair). Returns seconds taken."""
+    conn = write_connection(db_path)
+    t0 = time.perf_counter()
+    try:
+        conn.execute("BEGIN;")
+        rebuild_stats(conn)
+        bump_generation(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return time.perf_counter() - t0
+
+
+def recompute_cooccurrence(db_path: Path) -> float:
+    """Rebuilds the PERSON/ORG co-occurrence tables from the link tables (repair). Returns seconds taken."""
+    conn = write_connection(db_path)
+    t0 = time.perf_counter()
+    try:
+        conn.execute("BEGIN;")
+        rebuild_cooccurrence(conn)
+        bump_generation(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return time.perf_counter() - t0
+
+
+def _median_ms(fn, runs: int) -> float:
+    fn()  # warm page cache
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def index_report(db_path: Path, queries: List[str], runs: int = REPORT_RUNS) -> Dict[str, object]:
+    """Size of each FTS index and first-page latency per query, token index next to trigram index."""
+    conn = read_connection(db_path)
+    has_trigram = trigram_enabled(conn)
+    report: Dict[str, object] = {
+        "documents": int(conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]),
+        "index_bytes": fts_index_bytes(conn),
+        "trigram_enabled": has_trigram,
+        "queries": [],
+    }
+
+    size = RESULT_CACHE.maxsize
+    RESULT_CACHE.resize(0)  # time the SQL, not the cache
+    try:
+        for q in queries:
+            row: Dict[str, Optional[float]] = {"query": q}
+            for mode in (MODE_TOKENS, MODE_SUBSTRING):
+                if mode == MODE_SUBSTRING and not has_trigram:
+                    continue
+                page = keyword_search_page(db_path, q, mode=mode)
+                row[f"{mode}_hits"] = page.total
+                row[f"{mode}_ms"] = round(
+                    _median_ms(lambda: keyword_search_page(db_path, q, mode=mode), runs), 3
+                )
+            report["queries"].append(row)
+    finally:
+        RESULT_CACHE.resize(size)
+    return report
+
+
+def format_report(report: Dict[str, object]) -> str:
+    lines = [f"documents: {report['documents']:,}"]
+    sizes = report["index_bytes"] or {}
+    if not sizes:
+        lines.append("index sizes: unavailable (SQLite built without dbstat)")
+    for table, n in sizes.items():
+        lines.append(f"{table:<20} {n / 1024 / 1024:10.1f} MiB")
+    if not report["trigram_enabled"]:
+        lines.append("documents_trigram    not built (python -m app.maintenance trigram --enable)")
+    for row in report["queries"]:
+        parts = [f"{row['query']!r:<24}"]
+        for mode in (MODE_TOKENS, MODE_SUBSTRING):
+            if f"{mode}_ms" in row:
+                parts.append(f"{mode}: {row[f'{mode}_hits']} hits {row[f'{mode}_ms']:.2f}ms")
+        lines.append("  ".join(parts))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Forensic index maintenance.")
+    ap.add_argument("--db", type=Path, default=Path("data/index/forensic.db"))
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    tri = sub.add_parser("trigram", help="build or drop the documents_trigram substring index")
+    group = tri.add_mutually_exclusive_group(required=True)
+    group.add_argument("--enable", action="store_true")
+    group.add_argument("--disable", action="store_true")
+
+    sub.add_parser("stats", help="recompute the entity/asset frequency tables")
+    sub.add_parser("cooccurrence", help="recompute the PERSON/ORG co-occurrence tables")
+    sub.add_parser("mentions", help="record mention offsets for pages indexed before they existed")
+
+    rep = sub.add_parser("report", help="FTS index sizes and query latency")
+    rep.add_argument("queries", nargs="*", default=["flight", "island", "0104"])
+    rep.add_argument("--runs", type=int, default=REPORT_RUNS)
+
+    args = ap.parse_args()
+    if args.command == "trigram":
+        secs = set_trigram_index(args.db, enabled=args.enable)
+        print(f"documents_trigram {'built' if args.enable else 'dropped'} in {secs:.1f}s")
+    elif args.command == "stats":
+        print(f"entity_stats / asset_stats recomputed in {recompute_stats(args.db):.1f}s")
+    elif args.command == "cooccurrence":
+        print(f"co-occurrence tables recomputed in {recompute_cooccurrence(args.db):.1f}s")
+    elif args.command == "mentions":
+        from app.ingest import backfill_mentions  # loads the spaCy model
+
+        t0 = time.perf_counter()
+        n = backfill_mentions(args.db)
+        print(f"mention offsets recorded for {n} pages in {time.perf_counter() - t0:.1f}s")
+    elif args.command == "report":
+        print(format_report(index_report(args.db, args.queries, runs=args.runs)))
@@ -3,7 +3,8 @@ from dataclasses import dataclass
 from typing import List, Dict, Tuple, Any
 from pathlib import Path
 
-from app.db import connect
+from app.db import read_connection
+from app.graph import ASSET, ENTITY, EVENT, graph
 from app.fil import FILStatement, StatementType, SourceRef
 from app.assertion import enforce_assertion_boundaries
 
@@ -15,15 +16,19 @@ def build_network_exposure(
     db_path: Path,
     focus_entity_text: str | None = None,
     max_assets: int = 10,
-    max_events: int = 50
+    max_events: int = 50,
+    use_graph: bool = False,
 ) -> NetworkSummary:
     """
     Exposes structure without accusations.
     - Assets ↔ Entities
     - Entities ↔ Events
     - Overlaps over time (based on derived events)
+
+    use_graph=True reads the per-event degrees from the in-memory link graph
+    (app.graph) instead of SQL; the statements are identical.
     """
-    conn = connect(db_path)
+    conn = read_connection(db_path)
     cur = conn.cursor()
 
     # resolve focus entity -> normalized
@@ -38,9 +43,9 @@ def build_network_exposure(
     # Strategy: find events with focus entity (if provided), then summarize overlaps
     statements: List[FILStatement] = []
 
+    # Selected events plus their entity/asset degrees
     if focus_norm:
-        cur.execute(
-            """
+        selected = """
             SELECT ev.id, ev.date_text, ev.location_text, ev.filename, ev.page
             FROM events ev
             JOIN event_entities ee ON ee.event_id = ev.id
@@ -48,45 +53,36 @@ def build_network_exposure(
             WHERE e.normalized = ? AND e.label IN ('PERSON','ORG')
             ORDER BY ev.id DESC
             LIMIT ?
-            """,
-            (focus_norm, int(max_events)),
-        )
+        """
+        params = (focus_norm, int(max_events))
     else:
-        cur.execute(
-            """
+        selected = """
             SELECT id, date_text, location_text, filename, page
             FROM events
             ORDER BY id DESC
             LIMIT ?
-            """,
-            (int(max_events),),
-        )
+        """
+        params = (int(max_events),)
 
-    events = cur.fetchall()
+    if use_graph:
+        g = graph(db_path)
+        person_org = g.label_codes(("PERSON", "ORG"))
+        cur.execute(selected, params)
+        events = [
+            (
+                *row,
+                sum(1 for e in g.neighbors(EVENT, row[0], ENTITY) if g.entity_label[e] in person_org),
+                g.degree(EVENT, row[0], ASSET),
+            )
+            for row in cur.fetchall()
+        ]
+    else:
+        events = _events_with_degrees(cur, selected, params)
 
     # Summarize overlaps per event: count unique entities + assets
-    for (ev_id, dtext, ltext, fname, page) in events:
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT e.id)
-            FROM event_entities ee
-            JOIN entities e ON e.id = ee.entity_id
-            WHERE ee.event_id=? AND e.label IN ('PERSON','ORG')
-            """,
-            (int(ev_id),),
-        )
-        ent_count = int((cur.fetchone() or [0])[0])
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT a.id)
-            FROM event_assets ea
-            JOIN assets a ON a.id = ea.asset_id
-            WHERE ea.event_id=?
-            """,
-            (int(ev_id),),
-        )
-        asset_count = int((cur.fetchone() or [0])[0])
+    for (ev_id, dtext, ltext, fname, page, ent_count, asset_count) in events:
+        ent_count = int(ent_count)
+        asset_count = int(asset_count)
 
         src = SourceRef(filename=fname, page=int(page), snippet=f"Derived event: date={dtext}, location={ltext}")
 
@@ -144,5 +140,37 @@ def build_network_exposure(
             )
         )
 
-    conn.close()
     return NetworkSummary(statements=enforce_assertion_boundaries(statements))
+
+def _events_with_degrees(cur, selected: str, params: Tuple) -> List[Tuple]:
+    """
+    Selected events plus their PERSON/ORG entity and asset degrees in one
+    statement: the counts are grouped over the selected ids, not queried per event.
+    """
+    cur.execute(
+        f"""
+        WITH sel AS ({selected}),
+        ent AS (
+            SELECT ee.event_id, COUNT(DISTINCT e.id) AS n
+            FROM event_entities ee
+            JOIN entities e ON e.id = ee.entity_id
+            WHERE ee.event_id IN (SELECT id FROM sel) AND e.label IN ('PERSON','ORG')
+            GROUP BY ee.event_id
+        ),
+        ast AS (
+            SELECT ea.event_id, COUNT(DISTINCT a.id) AS n
+            FROM event_assets ea
+            JOIN assets a ON a.id = ea.asset_id
+            WHERE ea.event_id IN (SELECT id FROM sel)
+            GROUP BY ea.event_id
+        )
+        SELECT sel.id, sel.date_text, sel.location_text, sel.filename, sel.page,
+               COALESCE(ent.n, 0), COALESCE(ast.n, 0)
+        FROM sel
+        LEFT JOIN ent ON ent.event_id = sel.id
+        LEFT JOIN ast ON ast.event_id = sel.id
+        ORDER BY sel.id DESC
+        """,
+        params,
+    )
+    return cur.fetchall()
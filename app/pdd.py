@@ -1,17 +1,57 @@
 from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple
+from functools import lru_cache
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from pathlib import Path
 import math
+import multiprocessing
+import os
+import time
 
-from app.db import connect
+import numpy as np
+
+from app.db import read_connection
+from app.postings import Postings, postings
 from app.fil import FILStatement, StatementType, SourceRef
 from app.assertion import enforce_assertion_boundaries
 
+# Permutation null (analyze_overlap_randomness(permutations=...), permutation_null)
+PERMUTATION_SEED = 0
+PERMUTATION_SECONDS = 30.0      # wall-clock bound; finished chunks are kept
+PERMUTATION_CHUNK = 250         # permutations per seeded task (results do not depend on workers)
+PERMUTATION_BATCH_CELLS = 32_000_000  # permutation x context scratch bytes per batch
+NULL_MODEL = "slot shuffle: each context keeps its PERSON/ORG term count, A and B keep their sizes"
+
 @dataclass
 class PDDResult:
     statements: List[FILStatement]
 
+@dataclass
+class OverlapScore:
+    normalized: str
+    a: int                 # contexts with the focus entity
+    b: int                 # contexts with this entity
+    k: int                 # contexts with both
+    expected: float        # a * b / N under independence
+    approx_p_value: float  # same scale as analyze_overlap_randomness
+    exact_p_value: float   # hypergeometric P(overlap >= k)
+    exact_log10_p_value: float
+
+@dataclass
+class OverlapRanking:
+    entity: str
+    scope: str
+    N: int
+    compared: int          # PERSON/ORG terms scored against the focus entity
+    rows: List[OverlapScore]
+
+@dataclass
+class Partner:
+    normalized: str
+    both: int      # pages / events mentioning the focus entity and this one
+    partner: int   # pages / events mentioning this one
+
 def _safe_log(x: float) -> float:
     return math.log(x) if x > 0 else -999.0
 
@@ -32,17 +72,99 @@ def _approx_p_value_from_overlap(N: int, a: int, b: int, k: int) -> float:
     p = 1.0 / (1.0 + max(0.0, ratio - 1.0) * 2.5)
     return max(0.0001, min(1.0, p))
 
+# Tail terms summed per pair. Hypergeometric pmfs are log-concave, so each run
+# falls at least as fast as it does from the mode: TAIL_SDS standard deviations
+# on, terms are ~e^-70 of the first (below double precision of the sum).
+TAIL_SDS = 12
+TAIL_MIN_TERMS = 32
+
+@lru_cache(maxsize=4)
+def _log_factorials(n: int) -> np.ndarray:
+    """log(i!) for i in 0..n."""
+    out = np.zeros(n + 1)
+    np.cumsum(np.log(np.arange(1, n + 1, dtype=np.float64)), out=out[1:])
+    return out
+
+def log_hypergeom_sf(N, a, b, k) -> np.ndarray:
+    """
+    Natural log of the exact upper tail P(X >= k), X ~ Hypergeometric(N, a, b):
+    the chance that b contexts drawn at random from N share k or more with a
+    given set of a. Element-wise over arrays (thousands of pairs at once).
+
+    The pmf terms are summed in log space (logaddexp.reduceat) over one flat
+    array of every pair's terms. Below the mode the complement of the lower
+    tail is used, so each pair sums a short decreasing run.
+    """
+    N, a, b, k = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in (N, a, b, k)))
+    shape = N.shape
+    N, a, b, k = (v.ravel() for v in (N, a, b, k))
+    out = np.zeros(len(N))
+    lo = np.maximum(0, a + b - N)
+    hi = np.minimum(a, b)
+    out[k > hi] = -np.inf
+    todo = np.flatnonzero((k > lo) & (k <= hi))
+    if not len(todo):
+        return out.reshape(shape)
+
+    N, a, b, k, lo, hi = (v[todo] for v in (N, a, b, k, lo, hi))
+    lf = _log_factorials(int(N.max()))
+    Nf = N.astype(np.float64)
+    sd = np.sqrt(b * (a / Nf) * (1 - a / Nf) * (N - b) / np.maximum(Nf - 1, 1))
+    upper = k >= (a + 1) * (b + 1) // (N + 2)   # k at or past the mode
+    start = np.where(upper, k, k - 1)
+    step = np.where(upper, 1, -1)
+    terms = np.where(upper, hi - k + 1, k - lo)
+    terms = np.minimum(terms, TAIL_MIN_TERMS + np.ceil(TAIL_SDS * sd).astype(np.int64))
+
+    seg = np.repeat(np.arange(len(todo)), terms)
+    first = np.cumsum(terms) - terms
+    x = start[seg] + step[seg] * (np.arange(len(seg)) - first[seg])
+    # log C(a, x) + log C(N - a, b - x) - log C(N, b), x-free factorials per pair
+    fixed = lf[a] + lf[N - a] + lf[b] + lf[N - b] - lf[N]
+    log_pmf = fixed[seg] - lf[x] - lf[a[seg] - x] - lf[b[seg] - x] - lf[(N - a - b)[seg] + x]
+    tail = np.logaddexp.reduceat(log_pmf, first)
+    with np.errstate(divide="ignore"):
+        out[todo] = np.where(upper, np.minimum(tail, 0.0), np.log(-np.expm1(np.minimum(tail, 0.0))))
+    return out.reshape(shape)
+
+def exact_p_values(N, a, b, k) -> np.ndarray:
+    """Exact hypergeometric P(overlap >= k) (one-sided Fisher test), element-wise."""
+    return np.exp(log_hypergeom_sf(N, a, b, k))
+
+def _exact_metadata(N: int, a: int, b: int, k: int) -> Dict[str, float]:
+    log_p = float(log_hypergeom_sf(N, a, b, k))
+    return {"exact_p_value": math.exp(log_p), "exact_log10_p_value": log_p / math.log(10)}
+
+def _approx_p_values(N: int, a: int, b: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """_approx_p_value_from_overlap over arrays of b and k (one focus entity a)."""
+    if N <= 0:
+        return np.ones(len(b))
+    expected = a * b / max(N, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = k / expected
+        p = 1.0 / (1.0 + np.maximum(0.0, ratio - 1.0) * 2.5)
+    p = np.clip(p, 0.0001, 1.0)
+    return np.where(expected > 0, p, np.where(k > 0, 0.5, 1.0))
+
 def analyze_overlap_randomness(
     db_path: Path,
     entity_a: str,
     entity_b: str,
-    scope: str = "EVENTS"  # EVENTS or DOCS
+    scope: str = "EVENTS",  # EVENTS or DOCS
+    permutations: int = 0,
+    seed: int = PERMUTATION_SEED,
+    workers: Optional[int] = None,
+    time_limit: float = PERMUTATION_SECONDS,
+    progress: Optional[Callable[[int, int], None]] = None,
 ) -> PDDResult:
     """
     Answers: "How many independent coincidences would need to exist for this to be random?"
     It does NOT accuse. It provides overlap counts and a conservative improbability framing.
+
+    permutations > 0 also runs the permutation null (permutation_null) and
+    attaches it to the INFERENCE statement as metadata["permutation_null"].
     """
-    conn = connect(db_path)
+    conn = read_connection(db_path)
     cur = conn.cursor()
 
     # Resolve normalized
@@ -52,7 +174,6 @@ def analyze_overlap_randomness(
     rb = cur.fetchone()
 
     if not ra or not rb:
-        conn.close()
         return PDDResult(statements=enforce_assertion_boundaries([
             FILStatement(
                 statement_type=StatementType.FACT,
@@ -66,50 +187,12 @@ def analyze_overlap_randomness(
 
     stmts: List[FILStatement] = []
 
-    if scope.upper() == "DOCS":
-        cur.execute("SELECT COUNT(*) FROM documents")
-        N = int((cur.fetchone() or [0])[0])
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT d.id)
-            FROM documents d
-            JOIN doc_entities de ON de.doc_id = d.id
-            JOIN entities e ON e.id = de.entity_id
-            WHERE e.normalized=? AND e.label IN ('PERSON','ORG')
-            """,
-            (na,),
-        )
-        a = int((cur.fetchone() or [0])[0])
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT d.id)
-            FROM documents d
-            JOIN doc_entities de ON de.doc_id = d.id
-            JOIN entities e ON e.id = de.entity_id
-            WHERE e.normalized=? AND e.label IN ('PERSON','ORG')
-            """,
-            (nb,),
-        )
-        b = int((cur.fetchone() or [0])[0])
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT d.id)
-            FROM documents d
-            JOIN doc_entities de1 ON de1.doc_id = d.id
-            JOIN entities e1 ON e1.id = de1.entity_id
-            JOIN doc_entities de2 ON de2.doc_id = d.id
-            JOIN entities e2 ON e2.id = de2.entity_id
-            WHERE e1.normalized=? AND e2.normalized=?
-              AND e1.label IN ('PERSON','ORG') AND e2.label IN ('PERSON','ORG')
-            """,
-            (na, nb),
-        )
-        k = int((cur.fetchone() or [0])[0])
+    if _scope(scope) == "DOCS":
+        N, a, b, k = _overlap_counts(cur, "DOCS", na, nb)
 
         p = _approx_p_value_from_overlap(N, a, b, k)
+        exact = _exact_metadata(N, a, b, k)
+        null = _null_metadata(db_path, "DOCS", na, nb, permutations, seed, workers, time_limit, progress)
 
         stmts.append(
             FILStatement(
@@ -126,7 +209,7 @@ def analyze_overlap_randomness(
                 confidence_score=0.7,
                 text="Overlap density can be used to assess how many independent coincidences would need to exist for repeated co-occurrence to be random. This is a probabilistic framing, not a claim of intent or wrongdoing.",
                 primary_sources=[],
-                metadata={"approx_p_value": p},
+                metadata={"approx_p_value": p, **exact, **null},
             )
         )
         stmts.append(
@@ -135,55 +218,17 @@ def analyze_overlap_randomness(
                 confidence_score=0.9,
                 text=f"Approximate randomness score (conservative): p≈{p:.4f}. Smaller values indicate that repeated overlap is less consistent with random coincidence under a simplistic independence assumption.",
                 primary_sources=[],
-                metadata={"approx_p_value": p},
+                metadata={"approx_p_value": p, **exact},
             )
         )
 
     else:
         # EVENTS
-        cur.execute("SELECT COUNT(*) FROM events")
-        N = int((cur.fetchone() or [0])[0])
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT ev.id)
-            FROM events ev
-            JOIN event_entities ee ON ee.event_id = ev.id
-            JOIN entities e ON e.id = ee.entity_id
-            WHERE e.normalized=? AND e.label IN ('PERSON','ORG')
-            """,
-            (na,),
-        )
-        a = int((cur.fetchone() or [0])[0])
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT ev.id)
-            FROM events ev
-            JOIN event_entities ee ON ee.event_id = ev.id
-            JOIN entities e ON e.id = ee.entity_id
-            WHERE e.normalized=? AND e.label IN ('PERSON','ORG')
-            """,
-            (nb,),
-        )
-        b = int((cur.fetchone() or [0])[0])
-
-        cur.execute(
-            """
-            SELECT COUNT(DISTINCT ev.id)
-            FROM events ev
-            JOIN event_entities ee1 ON ee1.event_id = ev.id
-            JOIN entities e1 ON e1.id = ee1.entity_id
-            JOIN event_entities ee2 ON ee2.event_id = ev.id
-            JOIN entities e2 ON e2.id = ee2.entity_id
-            WHERE e1.normalized=? AND e2.normalized=?
-              AND e1.label IN ('PERSON','ORG') AND e2.label IN ('PERSON','ORG')
-            """,
-            (na, nb),
-        )
-        k = int((cur.fetchone() or [0])[0])
+        N, a, b, k = _overlap_counts(cur, "EVENTS", na, nb)
 
         p = _approx_p_value_from_overlap(N, a, b, k)
+        exact = _exact_metadata(N, a, b, k)
+        null = _null_metadata(db_path, "EVENTS", na, nb, permutations, seed, workers, time_limit, progress)
 
         stmts.append(
             FILStatement(
@@ -200,7 +245,7 @@ def analyze_overlap_randomness(
                 confidence_score=0.7,
                 text="Repeated overlap in derived events can be used to evaluate how many independent coincidences would be required for a pattern to be accidental. This is a probabilistic framing, not an accusation.",
                 primary_sources=[],
-                metadata={"approx_p_value": p},
+                metadata={"approx_p_value": p, **exact, **null},
             )
         )
         stmts.append(
@@ -209,9 +254,269 @@ def analyze_overlap_randomness(
                 confidence_score=0.9,
                 text=f"Approximate randomness score (conservative): p≈{p:.4f}. Smaller values suggest overlap is less consistent with random coincidence under simplistic assumptions.",
                 primary_sources=[],
-                metadata={"approx_p_value": p},
+                metadata={"approx_p_value": p, **exact},
             )
         )
 
-    conn.close()
     return PDDResult(statements=enforce_assertion_boundaries(stmts))
+
+def _scope(scope: str) -> str:
+    return "DOCS" if scope.upper() == "DOCS" else "EVENTS"
+
+def _term_id(cur, normalized: str) -> Optional[int]:
+    cur.execute("SELECT id FROM cooc_terms WHERE normalized=?", (normalized,))
+    row = cur.fetchone()
+    return int(row[0]) if row else None
+
+def _overlap_counts(cur, scope: str, na: str, nb: str) -> Tuple[int, int, int, int]:
+    """
+    (N, a, b, k) for two normalized PERSON/ORG forms: contexts in scope, with A,
+    with B, with both. Primary-key lookups in the co-occurrence tables that
+    app.db keeps in step with the link tables.
+    """
+    cur.execute("SELECT n FROM cooc_totals WHERE scope=?", (scope,))
+    N = int((cur.fetchone() or [0])[0])
+    ta, tb = _term_id(cur, na), _term_id(cur, nb)
+
+    def marginal(t: Optional[int]) -> int:
+        if t is None:
+            return 0
+        cur.execute("SELECT n FROM cooc_marginals WHERE scope=? AND term_id=?", (scope, t))
+        return int((cur.fetchone() or [0])[0])
+
+    a, b = marginal(ta), marginal(tb)
+    if ta is None or tb is None:
+        k = 0
+    elif ta == tb:
+        k = a
+    else:
+        cur.execute("SELECT n FROM cooc_pairs WHERE scope=? AND term_a=? AND term_b=?", (scope, ta, tb))
+        k = int((cur.fetchone() or [0])[0])
+    return N, a, b, k
+
+def top_partners(db_path: Path, entity: str, scope: str = "EVENTS", limit: int = 20) -> List[Partner]:
+    """PERSON/ORG entities most often found on the same pages (DOCS) or events (EVENTS) as entity."""
+    conn = read_connection(db_path)
+    cur = conn.cursor()
+    cur.execute("SELECT normalized FROM entities WHERE text=? LIMIT 1", (entity,))
+    row = cur.fetchone()
+    term = _term_id(cur, row[0]) if row else None
+    if term is None:
+        return []
+    scope = _scope(scope)
+    cur.execute(
+        """
+        SELECT t.normalized, p.n, m.n
+        FROM cooc_pairs p
+        JOIN cooc_terms t ON t.id = p.term_b
+        JOIN cooc_marginals m ON m.scope = p.scope AND m.term_id = p.term_b
+        WHERE p.scope = ? AND p.term_a = ?
+        ORDER BY p.n DESC
+        LIMIT ?
+        """,
+        (scope, term, int(limit)),
+    )
+    return [Partner(normalized=t, both=int(k), partner=int(n)) for t, k, n in cur.fetchall()]
+
+def rank_overlaps(db_path: Path, entity: str, scope: str = "EVENTS", limit: Optional[int] = 50) -> OverlapRanking:
+    """
+    Scores entity against every PERSON/ORG entity at once: the pair analysis
+    of analyze_overlap_randomness (a, b, k, expected overlap, approximate and
+    exact p) for all of them, from in-memory postings (app.postings) instead
+    of one query per pair. Ranked by exact p ascending, then by shared contexts.
+    """
+    scope = _scope(scope)
+    conn = read_connection(db_path)
+    row = conn.execute("SELECT normalized FROM entities WHERE text=? LIMIT 1", (entity,)).fetchone()
+    post = postings(db_path, scope)
+    focus = post.rows.get(row[0]) if row else None
+    if focus is None:
+        return OverlapRanking(entity=entity, scope=scope, N=post.contexts, compared=0, rows=[])
+
+    N = post.contexts
+    b = post.marginals
+    a = int(b[focus])
+    k = post.intersections(focus)
+    p = _approx_p_values(N, a, b, k)
+    log_exact = log_hypergeom_sf(N, a, b, k)
+    order = np.lexsort((-k, log_exact))
+    order = order[order != focus]
+    if limit is not None:
+        order = order[: max(0, int(limit))]
+    rows = [
+        OverlapScore(
+            normalized=post.normalized[i],
+            a=a,
+            b=int(b[i]),
+            k=int(k[i]),
+            expected=a * int(b[i]) / max(N, 1),
+            approx_p_value=float(p[i]),
+            exact_p_value=math.exp(log_exact[i]),
+            exact_log10_p_value=float(log_exact[i]) / math.log(10),
+        )
+        for i in order
+    ]
+    return OverlapRanking(entity=entity, scope=scope, N=N, compared=len(b) - 1, rows=rows)
+
+# -----------------------------
+# Permutation null model
+# -----------------------------
+@dataclass
+class NullResult:
+    k: int                     # observed overlap
+    permutations: int          # permutations run (fewer than requested if time ran out)
+    requested: int
+    exceedances: int           # permutations with overlap >= k
+    p_value: float             # (1 + exceedances) / (1 + permutations)
+    null_mean_k: Optional[float]
+    seed: int
+    truncated: bool
+    seconds: float
+
+def permutation_null(
+    post: Postings,
+    row_a: int,
+    row_b: int,
+    permutations: int,
+    seed: int = PERMUTATION_SEED,
+    workers: Optional[int] = None,
+    time_limit: float = PERMUTATION_SECONDS,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> NullResult:
+    """
+    Empirical p-value of the overlap of two postings rows under a slot
+    shuffle: every context keeps its number of PERSON/ORG terms (its slots)
+    and A and B keep their sizes a and b. Each permutation shuffles the slots
+    and A takes the first a distinct contexts in that order; B then takes
+    the first b distinct contexts in a fresh shuffle of the slots A left
+    free, and k counts contexts holding both. So a page with one term can
+    never hold both A and B, and crowded pages host overlaps more often than
+    the independence model of the hypergeometric p assumes. Contexts with no
+    terms are never drawn. The slots left over go to the other terms, whose
+    own repeats are not checked (they do not change k).
+
+    Permutations run in chunks of PERMUTATION_CHUNK, each with its own child
+    of SeedSequence(seed), so a result depends only on seed and on how many
+    chunks finished, not on workers (0 or 1 = in this process). progress is
+    called with (permutations done, requested). Past time_limit seconds the
+    remaining chunks are dropped and truncated is set.
+    """
+    t0 = time.perf_counter()
+    a = int(post.indptr[row_a + 1] - post.indptr[row_a])
+    b = int(post.indptr[row_b + 1] - post.indptr[row_b])
+    k = int(np.intersect1d(post.members(row_a), post.members(row_b), assume_unique=True).size)
+    crowding = np.bincount(post.indices)
+    slots = crowding[crowding > 0].astype(np.float32)  # only contexts with terms take part
+    sizes = [min(PERMUTATION_CHUNK, permutations - i) for i in range(0, max(0, permutations), PERMUTATION_CHUNK)]
+    chunks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes)) if row_a != row_b else []
+    deadline = t0 + max(0.0, time_limit)
+    done = exceed = 0
+    total_k = 0.0
+
+    def collect(result: Tuple[int, int, float]):
+        nonlocal done, exceed, total_k
+        done += result[0]
+        exceed += result[1]
+        total_k += result[2]
+        if progress is not None:
+            progress(done, permutations)
+
+    workers = min(os.cpu_count() or 1, len(chunks)) if workers is None else workers
+    if not chunks:
+        pass
+    elif workers <= 1:
+        for child, n in chunks:
+            if time.perf_counter() >= deadline:
+                break
+            collect(_null_chunk(slots, child, a, b, k, n))
+    else:
+        # spawn, not fork: the callers (UI, query server) are multi-threaded
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_null_worker,
+            initargs=(slots,),
+        )
+        try:
+            pending = {pool.submit(_pooled_null_chunk, child, a, b, k, n) for child, n in chunks}
+            while pending:
+                finished, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=FIRST_COMPLETED)
+                for f in finished:
+                    collect(f.result())
+                if not finished:
+                    break  # out of time
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return NullResult(
+        k=k,
+        permutations=done,
+        requested=permutations,
+        exceedances=exceed,
+        p_value=(1 + exceed) / (1 + done),
+        null_mean_k=total_k / done if done else None,
+        seed=seed,
+        truncated=done < sum(n for _, n in chunks),
+        seconds=time.perf_counter() - t0,
+    )
+
+def _null_chunk(slots: np.ndarray, seed_seq: np.random.SeedSequence, a: int, b: int, k: int, n: int) -> Tuple[int, int, float]:
+    """n permutations: (n, how many reached k, sum of their overlaps)."""
+    rng = np.random.default_rng(seed_seq)
+    span = len(slots)
+    # per row: float32 keys, float32 free slots, int64 argpartition output, bool cells
+    batch = max(1, min(n, PERMUTATION_BATCH_CELLS // (17 * span)))
+    exceed, total = 0, 0.0
+    for start in range(0, n, batch):
+        rows = min(batch, n - start)
+        cells = np.zeros((rows, span), dtype=bool)
+        np.put_along_axis(cells, _first_contexts(rng, slots, a, rows), True, axis=1)
+        free = slots - cells  # B cannot take the slot A holds
+        ks = np.take_along_axis(cells, _first_contexts(rng, free, b, rows), axis=1).sum(axis=1)
+        exceed += int((ks >= k).sum())
+        total += float(ks.sum())
+    return n, exceed, total
+
+def _first_contexts(rng: np.random.Generator, slots: np.ndarray, m: int, rows: int) -> np.ndarray:
+    """
+    rows x m distinct context indices: the first m contexts met in a random
+    order of their slots. The first of s shuffled slots comes at an Exp(s)
+    time, so these are Efraimidis-Spirakis keys; a context with no free slot
+    gets an infinite key and is never taken.
+    """
+    if m >= slots.shape[-1]:
+        return np.broadcast_to(np.arange(slots.shape[-1]), (rows, slots.shape[-1]))
+    keys = rng.standard_exponential((rows, slots.shape[-1]), dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        keys /= slots
+    return np.argpartition(keys, m - 1, axis=1)[:, :m]
+
+_null_slots: Optional[np.ndarray] = None
+
+def _init_null_worker(slots: np.ndarray):
+    global _null_slots
+    _null_slots = slots
+
+def _pooled_null_chunk(seed_seq: np.random.SeedSequence, a: int, b: int, k: int, n: int) -> Tuple[int, int, float]:
+    return _null_chunk(_null_slots, seed_seq, a, b, k, n)
+
+def _null_metadata(
+    db_path: Path,
+    scope: str,
+    na: str,
+    nb: str,
+    permutations: int,
+    seed: int,
+    workers: Optional[int],
+    time_limit: float,
+    progress: Optional[Callable[[int, int], None]],
+) -> Dict[str, Any]:
+    if permutations <= 0:
+        return {}
+    post = postings(db_path, scope)
+    ra, rb = post.rows.get(na), post.rows.get(nb)
+    if ra is None or rb is None:
+        return {"permutation_null": {"skipped": "entity has no PERSON/ORG links in this scope"}}
+    null = permutation_null(post, ra, rb, permutations, seed=seed, workers=workers, time_limit=time_limit, progress=progress)
+    return {"permutation_null": {**null.__dict__, "model": NULL_MODEL}}
+
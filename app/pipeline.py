@@ -0,0 +1,467 @@
+from __future__ import annotations
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.db import connect, finish_bulk_load, write_connection
+from app.loadfiles import find_text_renditions
+from app.ingest import (
+    IMG_EXTS,
+    MANIFEST_TOUCHED,
+    MANIFEST_UNCHANGED,
+    MAX_FILE_BYTES,
+    MIN_IMAGE_BYTES,
+    PDF_ENGINE,
+    REUSE_TEXT_RENDITIONS,
+    TEXT_EXTS,
+    AssetMentions,
+    Checkpointer,
+    EntMentions,
+    LinkCache,
+    Manifest,
+    PageBatcher,
+    content_hash,
+    extract_features_batch,
+    finish_file,
+    is_supported,
+    link_image,
+    load_manifest,
+    manifest_path,
+    manifest_status,
+    ocr_image,
+    pdf_pages,
+    read_text_file,
+    prepare_index_maintenance,
+    start_file,
+    _init_ocr_worker,
+)
+
+# -----------------------------
+# Pipeline defaults
+# -----------------------------
+PIPELINE_WORKERS = 4
+QUEUE_SIZE = 2000      # max files buffered between extractors and writer
+BATCH_SIZE = 500       # pages buffered per writer flush
+
+_DONE = object()
+
+
+@dataclass
+class PageRecord:
+    filename: str
+    page: int
+    text: str
+    content_hash: str
+    ent_mentions: EntMentions
+    asset_mentions: AssetMentions
+    source_path: Optional[str] = None
+
+
+@dataclass
+class FileRecord:
+    """
+    One file's pages plus its manifest update. The writer applies it with the
+    same per-file steps as ingest_all (start_file, PageBatcher.add,
+    finish_file), so a checkpoint never holds a manifest row without its pages.
+    """
+    path: str
+    stat: os.stat_result
+    digest: str
+    status: str  # manifest_status(); a changed file's old rows are dropped first
+    rendition: Optional[Tuple[str, str]] = None  # (text_path, bates) when linked instead of OCR'd
+    pages: List[PageRecord] = field(default_factory=list)
+    images: List["FileRecord"] = field(default_factory=list)  # page images linked to this text file
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+    unchanged: int = 0
+
+    def add(self, items: int, seconds: float):
+        self.items += items
+        self.busy_seconds += seconds
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def to_dict(self) -> Dict[str, float]:
+        wall = self.wall_seconds
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(wall, 3),
+            "items_per_busy_second": round(self.items / self.busy_seconds, 2) if self.busy_seconds > 0 else 0.0,
+            "items_per_wall_second": round(self.items / wall, 2) if wall > 0 else 0.0,
+        }
+
+
+@dataclass
+class PipelineReport:
+    inserted: int
+    skipped: int
+    unchanged: int
+    reused: int
+    stages: List[StageStats]
+
+    def format(self) -> str:
+        lines = [
+            f"Ingestion complete. Inserted={self.inserted}, Skipped(existing)={self.skipped}, "
+            f"Unchanged files={self.unchanged}, Images linked to text renditions={self.reused}"
+        ]
+        for st in self.stages:
+            d = st.to_dict()
+            lines.append(
+                f"  {d['stage']:<10} items={d['items']:<8} busy={d['busy_seconds']:.1f}s "
+                f"wall={d['wall_seconds']:.1f}s rate={d['items_per_busy_second']:.1f}/busy-s "
+                f"{d['items_per_wall_second']:.1f}/wall-s"
+            )
+        return "\n".join(lines)
+
+
+# -----------------------------
+# Stage 1: file discovery
+# -----------------------------
+def _discover(raw_dir: Path, manifest: Manifest, out_q: "queue.Queue", stats: StageStats):
+    """Queues (file, path, stat, digest, status) for every new/changed/touched file."""
+    try:
+        for p in raw_dir.rglob("*"):
+            t0 = time.perf_counter()
+            item = None
+            try:
+                if p.is_file() and not p.is_symlink() and is_supported(p):
+                    st = p.stat()
+                    if st.st_size <= MAX_FILE_BYTES:
+                        rel = manifest_path(raw_dir, p)
+                        status, digest = manifest_status(manifest, rel, p, st)
+                        if status in (MANIFEST_UNCHANGED, MANIFEST_TOUCHED):
+                            stats.unchanged += 1
+                        if status != MANIFEST_UNCHANGED:
+                            item = (p, rel, st, digest, status)
+            except OSError:
+                item = None
+            stats.add(1 if item else 0, time.perf_counter() - t0)
+            if item:
+                out_q.put(item)
+    finally:
+        stats.stop()
+        out_q.put(_DONE)
+
+
+def _iter_queue(q: "queue.Queue") -> Iterator:
+    while True:
+        item = q.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+# -----------------------------
+# Stage 2: extraction + NER (worker processes)
+# -----------------------------
+def extract_file(
+    file: Path, source_path: Optional[str] = None, pdf_engine: str = PDF_ENGINE
+) -> Tuple[int, Optional[List[PageRecord]], float]:
+    """
+    Parses/OCRs one file and runs entity/asset extraction on every page.
+    Returns (skipped, records, busy_seconds); records is None if the file
+    failed. Runs in a worker process.
+    """
+    t0 = time.perf_counter()
+    skipped = 0
+    pages: List[Tuple[int, str]] = []
+    try:
+        suffix = file.suffix.lower()
+        if suffix == ".pdf":
+            pages = list(pdf_pages(file, engine=pdf_engine))
+        elif suffix in IMG_EXTS:
+            if file.stat().st_size < MIN_IMAGE_BYTES:
+                skipped = 1
+            else:
+                text = ocr_image(file)
+                if text:
+                    pages = [(1, text)]
+        elif suffix in TEXT_EXTS:
+            text = read_text_file(file)
+            if text:
+                pages = [(1, text)]
+
+        # one NLP.pipe call per file; parallelism comes from the worker pool
+        features = extract_features_batch([t for _p, t in pages], n_process=1)
+        records = [
+            PageRecord(file.name, page, text, content_hash(text), ents, assets, source_path)
+            for (page, text), (ents, assets) in zip(pages, features)
+        ]
+    except Exception:
+        # keep ingestion resilient (bad files shouldn't stop the run)
+        records = None
+    return skipped, records, time.perf_counter() - t0
+
+
+# -----------------------------
+# Stage 3: single batched writer
+# -----------------------------
+class _Writer:
+    """Owns the only write connection. Applies files through a PageBatcher, as ingest_all does."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        raw_dir: Path,
+        batch_size: int,
+        stats: StageStats,
+        bulk_load: Optional[bool],
+        trigram: bool = False,
+    ):
+        self.db_path = db_path
+        self.raw_dir = raw_dir
+        self.batch_size = max(1, int(batch_size))
+        self.stats = stats
+        self.bulk_load = bulk_load
+        self.trigram = trigram
+        self.fts_stats: Optional[StageStats] = None
+        self.inserted = 0
+        self.skipped = 0
+        self.error: Optional[BaseException] = None
+        self.aborted = False  # set by the dispatcher on Ctrl-C / failure
+
+    def run(self, in_q: "queue.Queue"):
+        conn = write_connection(self.db_path)
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN;")
+            run = Checkpointer(conn, self.raw_dir)
+            self.bulk_load = run.begin(self.bulk_load)
+            prepare_index_maintenance(conn, self.bulk_load, self.trigram)
+            batcher = PageBatcher(cur, buffer_pages=self.batch_size, cache=LinkCache(cur))
+            run.before_commit = batcher.flush
+            run.commit()
+
+            for rec in _iter_queue(in_q):
+                self._apply(batcher, rec)
+                run.files_total += 1
+                run.file_done(rec.path)
+            batcher.flush()
+            if self.aborted:
+                # keep what was applied; the run stays 'running' so the next one resumes it
+                run.commit()
+                return
+            if self.bulk_load:
+                self.fts_stats = StageStats("fts")
+                finish_bulk_load(conn)
+                self.fts_stats.add(1, self.fts_stats.wall_seconds)
+                self.fts_stats.stop()
+            run.files_total = run.files_done
+            run.finish()
+        except BaseException as e:
+            self.error = e
+            conn.rollback()
+            # drain so producers never block on a dead writer
+            for _ in _iter_queue(in_q):
+                pass
+        finally:
+            conn.close()
+            self.stats.stop()
+
+    def _apply(self, batcher: PageBatcher, rec: FileRecord):
+        t0 = time.perf_counter()
+        if rec.rendition is not None:
+            link_image(batcher, rec.path, rec.stat, rec.digest, rec.status, *rec.rendition)
+        else:
+            for image in rec.images:
+                start_file(batcher, image.path, image.status)
+            start_file(batcher, rec.path, rec.status)
+            for p in rec.pages:
+                features = (p.ent_mentions, p.asset_mentions)
+                if batcher.add(p.filename, p.page, p.text, p.source_path, h=p.content_hash, features=features):
+                    self.inserted += 1
+                else:
+                    self.skipped += 1
+            images = [(i.path, i.stat, i.digest, i.rendition[1]) for i in rec.images]
+            finish_file(batcher, rec.path, rec.stat, rec.digest, images)
+        self.stats.add(len(rec.pages), time.perf_counter() - t0)
+
+
+def _unchanged(manifest: Manifest, rel: str, file: Path) -> bool:
+    """True if file still matches its manifest entry (size and mtime), i.e. it is already ingested."""
+    entry = manifest.get(rel)
+    try:
+        st = file.stat()
+    except OSError:
+        return False
+    return entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+def ingest_pipeline(
+    raw_dir: Path,
+    db_path: Path,
+    workers: int = PIPELINE_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+    batch_size: int = BATCH_SIZE,
+    bulk_load: Optional[bool] = None,
+    reuse_text_renditions: bool = REUSE_TEXT_RENDITIONS,
+    pdf_engine: str = PDF_ENGINE,
+    trigram: bool = False,
+) -> PipelineReport:
+    """
+    Staged ingest: one discovery thread -> a process pool of extractors
+    (parse/OCR + NER + regex) -> one writer thread that drains a bounded
+    queue and applies executemany batches on the only write connection.
+    The writer checkpoints like ingest_all (periodic commits, ingest_runs).
+
+    The bounded queues cap memory: when the writer falls behind, extraction
+    blocks instead of buffering pages. Per-stage throughput is returned so
+    the limiting stage is visible.
+
+    bulk_load defers FTS and frequency-table maintenance to one rebuild at the end; None means
+    bulk-load only when the index is empty (see ingest_all). Page images
+    with a text rendition are linked to it instead of OCR'd. trigram=True
+    creates the substring index as in ingest_all.
+    """
+    raw_dir = raw_dir.resolve()
+    workers = max(1, int(workers))
+
+    discover_stats = StageStats("discover")
+    extract_stats = StageStats("extract")
+    write_stats = StageStats("write")
+
+    file_q: "queue.Queue" = queue.Queue(maxsize=max(1, int(queue_size)))
+    page_q: "queue.Queue" = queue.Queue(maxsize=max(1, int(queue_size)))
+
+    conn = connect(db_path)
+    manifest = load_manifest(conn.cursor())
+    conn.close()
+
+    renditions: Dict[str, Path] = {}
+    if reuse_text_renditions:
+        renditions = find_text_renditions(
+            (p for p in raw_dir.rglob("*") if p.is_file()), TEXT_EXTS, IMG_EXTS
+        )
+
+    writer = _Writer(db_path, raw_dir, batch_size, write_stats, bulk_load, trigram)
+    producer = threading.Thread(target=_discover, args=(raw_dir, manifest, file_q, discover_stats), daemon=True)
+    writer_thread = threading.Thread(target=writer.run, args=(page_q,), daemon=True)
+    producer.start()
+    writer_thread.start()
+
+    skipped = 0
+    reused = 0
+    # results are consumed in discovery order so document ids are deterministic
+    pending: Deque[Tuple[FileRecord, Future]] = deque()
+    window = workers * 4
+    # images linked to a text file that is still to be written ride along with it
+    linked: Dict[str, List[Tuple[Path, FileRecord]]] = {}
+    written: set = set()
+    discovered: set = set()
+
+    def put(frec: FileRecord):
+        frec.images = [image for _f, image in linked.pop(frec.path, ())]
+        page_q.put(frec)
+        written.add(frec.path)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker) as pool:
+            files = _iter_queue(file_q)
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < window:
+                    item = next(files, None)
+                    if item is None:
+                        exhausted = True
+                        # their text file is not being ingested (too large, unreadable): OCR instead
+                        for text_rel in [t for t in linked if t not in discovered]:
+                            for f, frec in linked.pop(text_rel):
+                                frec.rendition = None
+                                reused -= 1
+                                pending.append((frec, pool.submit(extract_file, f, frec.path, pdf_engine)))
+                        break
+                    f, rel, st, digest, status = item
+                    discovered.add(rel)
+                    frec = FileRecord(rel, st, digest, status)
+                    if status == MANIFEST_TOUCHED:
+                        put(frec)
+                        continue
+                    text_file = renditions.get(f.stem) if f.suffix.lower() in IMG_EXTS else None
+                    if text_file is not None:
+                        text_rel = manifest_path(raw_dir, text_file)
+                        frec.rendition = (text_rel, f.stem)
+                        reused += 1
+                        if text_rel in written or _unchanged(manifest, text_rel, text_file):
+                            page_q.put(frec)
+                        else:
+                            linked.setdefault(text_rel, []).append((f, frec))
+                        continue
+                    pending.append((frec, pool.submit(extract_file, f, rel, pdf_engine)))
+                if not pending:
+                    break
+                frec, fut = pending.popleft()
+                s, records, busy = fut.result()
+                extract_stats.add(1, busy)
+                if records is None:
+                    # linked images wait for a later run, when the text file is retried
+                    reused -= len(linked.pop(frec.path, ()))
+                    continue
+                skipped += s
+                frec.pages = records
+                put(frec)
+    except BaseException:
+        writer.aborted = True
+        raise
+    finally:
+        extract_stats.stop()
+        page_q.put(_DONE)
+        writer_thread.join()
+        producer.join(timeout=1)
+
+    if writer.error is not None:
+        raise writer.error
+
+    return PipelineReport(
+        inserted=writer.inserted,
+        skipped=skipped + writer.skipped,
+        unchanged=discover_stats.unchanged,
+        reused=reused,
+        stages=[discover_stats, extract_stats, write_stats] + ([writer.fts_stats] if writer.fts_stats else []),
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Staged parallel ingest of data/raw into the forensic index.")
+    ap.add_argument("--raw", type=Path, default=Path("data/raw"))
+    ap.add_argument("--db", type=Path, default=Path("data/index/forensic.db"))
+    ap.add_argument("--workers", type=int, default=PIPELINE_WORKERS)
+    ap.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    ap.add_argument("--pdf-engine", choices=["pdfplumber", "pdftotext"], default=PDF_ENGINE)
+    ap.add_argument("--bulk-load", action=argparse.BooleanOptionalAction, default=None,
+                    help="defer FTS maintenance to one rebuild (default: only when the index is empty)")
+    ap.add_argument("--trigram", action="store_true",
+                    help="also build/maintain the documents_trigram substring index")
+    args = ap.parse_args()
+
+    report = ingest_pipeline(
+        args.raw, args.db,
+        workers=args.workers, queue_size=args.queue_size, batch_size=args.batch_size,
+        bulk_load=args.bulk_load, pdf_engine=args.pdf_engine, trigram=args.trigram,
+    )
+    print(report.format())
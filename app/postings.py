@@ -0,0 +1,115 @@
+from __future__ import annotations
+import sqlite3
+import threading
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.db import COOC_SCOPES, read_connection, read_generation, read_snapshot
+
+# -----------------------------
+# PERSON/ORG postings (term -> sorted context ids) per co-occurrence scope
+# -----------------------------
+@dataclass
+class Postings:
+    """
+    The pages (scope DOCS) or events (scope EVENTS) of every PERSON/ORG term
+    in CSR form: the contexts of row i are indices[indptr[i]:indptr[i + 1]],
+    ascending. Rows are the cooc_terms present in the scope, by id; a term is
+    an entities.normalized form, as in app.pdd.
+    """
+    scope: str
+    generation: Optional[int]
+    contexts: int              # N: pages / events in the scope
+    normalized: List[str]      # row -> normalized text
+    rows: Dict[str, int]       # normalized text -> row
+    indptr: np.ndarray         # int64, one more than there are rows
+    indices: np.ndarray        # int32 context ids
+
+    @property
+    def marginals(self) -> np.ndarray:
+        """Contexts per row (the a / b of a pair analysis)."""
+        return np.diff(self.indptr)
+
+    def members(self, row: int) -> np.ndarray:
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def intersections(self, row: int) -> np.ndarray:
+        """Contexts shared by row and every row, in one vectorized pass over all postings."""
+        if not len(self.normalized):
+            return np.zeros(0, dtype=np.int64)
+        mask = np.zeros(int(self.indices.max()) + 1, dtype=bool)
+        mask[self.members(row)] = True
+        # every row has at least one posting, so no reduceat segment is empty
+        return np.add.reduceat(mask[self.indices], self.indptr[:-1], dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes
+
+
+def load_postings(conn: sqlite3.Connection, scope: str) -> Postings:
+    """
+    Reads the postings of scope ('DOCS' or 'EVENTS'): one unsorted scan of
+    the link table, mapped from entity id to term and sorted in numpy (no
+    per-link join on the normalized text).
+    """
+    table, links, col = COOC_SCOPES[scope]
+    with read_snapshot(conn):
+        generation = read_generation(conn)
+        row = conn.execute("SELECT n FROM cooc_totals WHERE scope=?", (scope,)).fetchone()
+        contexts = int(row[0]) if row else 0
+        names = dict(conn.execute("SELECT id, normalized FROM cooc_terms"))
+        entity_terms = _int_pairs(conn.execute(
+            """
+            SELECT e.id, t.id
+            FROM entities e
+            JOIN cooc_terms t ON t.normalized = e.normalized
+            WHERE e.label IN ('PERSON','ORG')
+            """
+        ))
+        linked = _int_pairs(conn.execute(f"SELECT entity_id, {col} FROM {links}"))
+
+    size = max(int(entity_terms[:, 0].max(initial=0)), int(linked[:, 0].max(initial=0))) + 1
+    term_of = np.full(size, -1, dtype=np.int64)  # entity id -> cooc_terms id, -1 not PERSON/ORG
+    term_of[entity_terms[:, 0]] = entity_terms[:, 1]
+    terms = term_of[linked[:, 0]]
+    keep = terms >= 0
+    ctx = linked[keep, 1]
+    span = int(ctx.max(initial=0)) + 1
+    # one sort on (term, context) also drops pages reached through two entities of one term
+    keys = np.unique(terms[keep] * span + ctx)
+    terms, ctx = keys // span, keys % span
+    term_ids, starts = np.unique(terms, return_index=True)
+    normalized = [names[int(t)] for t in term_ids]
+    return Postings(
+        scope=scope,
+        generation=generation,
+        contexts=contexts,
+        normalized=normalized,
+        rows={n: i for i, n in enumerate(normalized)},
+        indptr=np.append(starts, len(keys)).astype(np.int64),
+        indices=ctx.astype(np.int32),
+    )
+
+
+def _int_pairs(cur: sqlite3.Cursor) -> np.ndarray:
+    return np.fromiter(chain.from_iterable(cur), dtype=np.int64).reshape(-1, 2)
+
+
+_postings: Dict[Tuple[str, str], Postings] = {}
+_postings_lock = threading.Lock()
+
+
+def postings(db_path: Path, scope: str) -> Postings:
+    """Postings of db_path for scope, loaded on first use and reloaded after each ingest generation."""
+    conn = read_connection(db_path)
+    key = (str(Path(db_path).resolve()), scope)
+    with _postings_lock:
+        p = _postings.get(key)
+        if p is None or p.generation is None or read_generation(conn) != p.generation:
+            p = _postings[key] = load_postings(conn, scope)
+    return p
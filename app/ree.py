@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-from app.db import connect
+from app.db import read_connection, write_connection
 
 @dataclass
 class REEIngestReport:
@@ -33,7 +33,7 @@ def ingest_registry_folder(db_path: Path, registries_dir: Path) -> REEIngestRepo
     if not files:
         return REEIngestReport(files_processed=0, rows_loaded=0, rows_inserted=0, warnings=["No CSV files found in data/registries/"])
 
-    conn = connect(db_path)
+    conn = write_connection(db_path)
     cur = conn.cursor()
 
     rows_loaded = 0
@@ -91,7 +91,7 @@ def ingest_registry_folder(db_path: Path, registries_dir: Path) -> REEIngestRepo
     return REEIngestReport(files_processed=len(files), rows_loaded=rows_loaded, rows_inserted=rows_inserted, warnings=warnings)
 
 def lookup_registry_records(db_path: Path, subject_type: str, subject_value: str, limit: int = 200) -> List[Dict[str, Any]]:
-    conn = connect(db_path)
+    conn = read_connection(db_path)
     cur = conn.cursor()
     subject_type = subject_type.strip().upper()
     subject_norm = _norm(subject_value)
@@ -106,7 +106,6 @@ def lookup_registry_records(db_path: Path, subject_type: str, subject_value: str
         (subject_type, subject_norm, int(limit)),
     )
     rows = cur.fetchall()
-    conn.close()
     return [
         {
             "registry_name": r[0],
@@ -1,8 +1,13 @@
+import json
 import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
+from typing import Callable, Hashable, Iterable, List, Optional, Tuple, Dict, Any
 
-from app.db import connect
+from app.db import read_connection, read_generation, temp_writes, trigram_enabled
+from app.fuzzy import expand_query, fuzzy_fts_query
 
 def sanitize_fts_query(q: str) -> str:
     q = (q or "").strip()
@@ -19,103 +24,563 @@ def sanitize_fts_query(q: str) -> str:
         return q
     return " AND ".join(parts)
 
-def keyword_search(db_path: Path, query: str, limit: int = 200) -> List[Tuple[str, int, str]]:
-    q = sanitize_fts_query(query)
+MIN_SUBSTRING = 3  # trigram index cannot answer shorter fragments
+
+def substring_fts_query(q: str) -> str:
+    """
+    Query for documents_trigram: every fragment (a "quoted run" keeps its
+    spaces) must appear somewhere in the page, e.g. 'ightlo 010477'.
+    Fragments shorter than MIN_SUBSTRING are dropped.
+    """
+    q = (q or "").replace("\x00", " ")
+    parts = [a or b for a, b in re.findall(r'"([^"]+)"|(\S+)', q)]
+    parts = [p.strip() for p in parts if len(p.strip()) >= MIN_SUBSTRING]
+    return " AND ".join('"' + p.replace('"', '""') + '"' for p in parts)
+
+# -----------------------------
+# Result cache
+# -----------------------------
+CACHE_SIZE = 256  # result sets kept across Streamlit reruns
+
+class ResultCache:
+    """
+    Bounded LRU of result sets keyed by (db, function, normalized params).
+
+    Every entry remembers the index generation it was computed at; a lookup
+    at a newer generation (ingest committed since) is a miss, so results are
+    never served stale. Cached values are shared: callers must not mutate them.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = max(0, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, generation: Optional[int], compute: Callable[[], Any]) -> Any:
+        if generation is None or self.maxsize == 0:
+            return compute()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None and hit[0] == generation:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return hit[1]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = (generation, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def resize(self, maxsize: int):
+        with self._lock:
+            self.maxsize = max(0, int(maxsize))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+RESULT_CACHE = ResultCache()
+
+def _cached(db_path: Path, name: str, params: Tuple, compute: Callable[[], Any]) -> Any:
+    conn = read_connection(db_path)
+    generation = read_generation(conn)
+    return RESULT_CACHE.get_or_compute((str(db_path), name, params), generation, compute)
+
+def configure_cache(maxsize: int):
+    """Sets the result cache size (0 disables caching)."""
+    RESULT_CACHE.resize(maxsize)
+
+def cache_stats() -> Dict[str, int]:
+    return RESULT_CACHE.stats()
+
+# -----------------------------
+# Ranked keyword search
+# -----------------------------
+PAGE_SIZE = 50
+MODE_TOKENS = "tokens"        # documents_fts (unicode61): whole tokens, prefix*
+MODE_SUBSTRING = "substring"  # documents_trigram: any fragment of 3+ characters
+MODE_FUZZY = "fuzzy"          # documents_fts with each word OR-expanded to near vocabulary terms
+COUNT_CAP = 10000  # hit counting stops here; larger totals are reported as ">= COUNT_CAP"
+
+@dataclass
+class SearchPage:
+    rows: List[Tuple[str, int, str]]  # (filename, page, snippet), best bm25 first
+    next_cursor: Optional[str]        # pass back as cursor= for the following page
+    total: Optional[int]              # hits, capped at COUNT_CAP (first page only)
+    total_capped: bool = False
+    expansions: Optional[Dict[str, List[str]]] = None  # MODE_FUZZY: word -> terms searched
+
+def _encode_cursor(score: float, rowid: int) -> str:
+    # float.hex round-trips exactly, so ties on score are resolved by rowid alone
+    return f"{float(score).hex()}:{int(rowid)}"
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, rowid = cursor.split(":", 1)
+        return float.fromhex(score), int(rowid)
+    except ValueError:
+        raise ValueError(f"invalid search cursor: {cursor!r}") from None
+
+def count_hits(cur, fts_query: str, cap: int = COUNT_CAP, table: str = "documents_fts") -> Tuple[int, bool]:
+    """Counts matches up to cap + 1 only, so broad queries stay bounded."""
+    cur.execute(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {table} MATCH ? LIMIT ?)",
+        (fts_query, int(cap) + 1),
+    )
+    n = int(cur.fetchone()[0])
+    return (int(cap), True) if n > cap else (n, False)
+
+def keyword_search_page(
+    db_path: Path,
+    query: str,
+    limit: int = PAGE_SIZE,
+    cursor: Optional[str] = None,
+    count_cap: int = COUNT_CAP,
+    mode: str = MODE_TOKENS,
+) -> SearchPage:
+    """
+    One page of FTS hits ordered by bm25 (best first, rowid breaks ties).
+
+    mode=MODE_SUBSTRING searches the optional trigram index instead, so
+    fragments inside tokens match ("flightlog", Bates/account fragments);
+    it raises ValueError when that index has not been built. mode=MODE_FUZZY
+    expands every word to its closest indexed terms (OCR errors such as
+    "Epstien", "Jeffrev") and returns the expansions with the page.
+
+    Pagination is keyset-based: the cursor holds the last (score, rowid)
+    served, and the next page starts strictly after it, so page N never
+    re-reads or skips over pages 1..N-1 with OFFSET. The total is only
+    counted for the first page (cursor=None), and not at all with count_cap=0.
+    Pages are served from RESULT_CACHE until the next ingest commit.
+    """
+    q, table, snippet_tokens, expansions = _prepare_query(db_path, query, mode)
     if not q:
-        return []
-    conn = connect(db_path)
+        return SearchPage(rows=[], next_cursor=None, total=0)
+    limit = max(1, int(limit))
+    page = _cached(
+        db_path, "keyword_search_page", (table, q, limit, cursor, int(count_cap)),
+        lambda: _keyword_search_page(db_path, table, q, limit, cursor, count_cap, snippet_tokens),
+    )
+    return page if expansions is None else replace(page, expansions=expansions)
+
+def _prepare_query(db_path: Path, query: str, mode: str):
+    """(fts query, table, snippet tokens, fuzzy expansions or None) for a search mode."""
+    if mode == MODE_SUBSTRING:
+        if not trigram_enabled(read_connection(db_path)):
+            raise ValueError("substring search needs the trigram index (python -m app.maintenance trigram --enable)")
+        return substring_fts_query(query), "documents_trigram", 64, None
+    if mode == MODE_TOKENS:
+        return sanitize_fts_query(query), "documents_fts", 20, None
+    if mode == MODE_FUZZY:
+        expansions = expand_query(db_path, query)
+        return fuzzy_fts_query(expansions), "documents_fts", 20, expansions
+    raise ValueError(f"unknown search mode: {mode!r}")
+
+def _keyword_search_page(
+    db_path: Path, table: str, q: str, limit: int, cursor: Optional[str], count_cap: int, snippet_tokens: int
+) -> SearchPage:
+    after = ""
+    params: List[Any] = [q]
+    if cursor:
+        score, rowid = _decode_cursor(cursor)
+        after = f"AND (bm25({table}) > ? OR (bm25({table}) = ? AND {table}.rowid > ?))"
+        params += [score, score, rowid]
+
+    conn = read_connection(db_path)
     cur = conn.cursor()
+    # rank on (score, rowid) alone; snippets are built only for the rows served
     cur.execute(
-        """
-        SELECT d.filename, d.page,
-               snippet(documents_fts, 0, '[', ']', '...', 20) AS snip
-        FROM documents_fts
-        JOIN documents d ON documents_fts.rowid = d.id
-        WHERE documents_fts MATCH ?
+        f"""
+        SELECT {table}.rowid, bm25({table}) AS score
+        FROM {table}
+        WHERE {table} MATCH ? {after}
+        ORDER BY score, {table}.rowid
         LIMIT ?
         """,
-        (q, int(limit)),
+        (*params, limit + 1),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [(r[0], int(r[1]), r[2]) for r in rows]
+    ranked = cur.fetchall()
+    next_cursor = None
+    if len(ranked) > limit:
+        ranked = ranked[:limit]
+        next_cursor = _encode_cursor(ranked[-1][1], ranked[-1][0])
 
-def list_top_entities(db_path: Path, label: str, limit: int = 200):
-    conn = connect(db_path)
+    found: Dict[int, Tuple[str, int, str]] = {}
+    if ranked:
+        marks = ",".join("?" * len(ranked))
+        cur.execute(
+            f"""
+            SELECT {table}.rowid, d.filename, d.page,
+                   snippet({table}, 0, '[', ']', '...', ?) AS snip
+            FROM {table}
+            JOIN documents d ON {table}.rowid = d.id
+            WHERE {table} MATCH ? AND {table}.rowid IN ({marks})
+            """,
+            (int(snippet_tokens), q, *[r[0] for r in ranked]),
+        )
+        found = {int(r[0]): (r[1], int(r[2]), r[3]) for r in cur.fetchall()}
+
+    total, capped = (None, False)
+    if cursor is None and count_cap > 0:
+        total, capped = count_hits(cur, q, count_cap, table)
+
+    return SearchPage(
+        rows=[found[int(r[0])] for r in ranked if int(r[0]) in found],
+        next_cursor=next_cursor,
+        total=total,
+        total_capped=capped,
+    )
+
+def keyword_search(
+    db_path: Path, query: str, limit: int = 200, mode: str = MODE_TOKENS
+) -> List[Tuple[str, int, str]]:
+    """Top `limit` hits by bm25; see keyword_search_page for paging, counts and modes."""
+    return keyword_search_page(db_path, query, limit=limit, count_cap=0, mode=mode).rows
+
+# -----------------------------
+# Faceted search
+# -----------------------------
+FACET_TOP = 10          # values returned per facet (per entity label / asset type)
+FACET_SAMPLE = 20000    # facets over larger hit sets are counted on an even sample and scaled
+
+@dataclass
+class FacetResult:
+    rows: List[Tuple[str, int, str]]              # (filename, page, snippet), best first
+    total: int                                    # pages matching every filter
+    entities: Dict[str, List[Tuple[str, int]]]    # label -> [(text, pages)]
+    assets: Dict[str, List[Tuple[str, int]]]      # asset_type -> [(value, pages)]
+    files: List[Tuple[str, int]]                  # [(filename, pages)]
+    sampled: bool = False                         # facet counts estimated from FACET_SAMPLE hits
+    expansions: Optional[Dict[str, List[str]]] = None
+
+def faceted_search(
+    db_path: Path,
+    query: str = "",
+    entities: Iterable[Tuple[str, str]] = (),
+    assets: Iterable[Tuple[str, str]] = (),
+    labels: Iterable[str] = (),
+    files: Iterable[str] = (),
+    limit: int = PAGE_SIZE,
+    offset: int = 0,
+    mode: str = MODE_TOKENS,
+    facet_top: int = FACET_TOP,
+) -> FacetResult:
+    """
+    Pages matching the keyword query (optional, any search mode) AND every
+    (text, label) entity AND every (value, asset_type) asset AND at least one
+    entity of each label, restricted to files if given.
+
+    All filters run as one statement that fills a temp hit table; rows are
+    ranked by bm25 when there is a query, by page order otherwise. The facet
+    counts (pages per entity, asset and file among the hits) are joins
+    driven from that table, read in the same snapshot. Above FACET_SAMPLE
+    hits they are counted on every k-th hit in scan order (independent of
+    rank) and scaled (sampled=True); total stays exact.
+    """
+    q, table, snippet_tokens, expansions = ("", "documents_fts", 20, None)
+    if (query or "").strip():
+        q, table, snippet_tokens, expansions = _prepare_query(db_path, query, mode)
+        if not q:
+            return FacetResult(rows=[], total=0, entities={}, assets={}, files=[])
+    params = (
+        table, q,
+        tuple(sorted(set(map(tuple, entities)))), tuple(sorted(set(map(tuple, assets)))),
+        tuple(sorted(set(labels))), tuple(sorted(set(files))),
+        max(1, int(limit)), max(0, int(offset)), max(1, int(facet_top)),
+    )
+    result = _cached(
+        db_path, "faceted_search", params,
+        lambda: _faceted_search(db_path, *params, snippet_tokens),
+    )
+    return result if expansions is None else replace(result, expansions=expansions)
+
+def _faceted_search(
+    db_path: Path, table: str, q: str, entities, assets, labels, files,
+    limit: int, offset: int, facet_top: int, snippet_tokens: int,
+) -> FacetResult:
+    where: List[str] = []
+    args: List[Any] = []
+    if q:
+        source = f"{table} JOIN documents d ON d.id = {table}.rowid"
+        score = f"bm25({table})"
+        where.append(f"{table} MATCH ?")
+        args.append(q)
+    else:
+        source, score = "documents d", "0.0"
+    for text, label in entities:
+        where.append(
+            "d.id IN (SELECT de.doc_id FROM doc_entities de JOIN entities e ON e.id = de.entity_id"
+            " WHERE e.text = ? AND e.label = ?)"
+        )
+        args += [text, label]
+    for value, asset_type in assets:
+        where.append(
+            "d.id IN (SELECT da.doc_id FROM doc_assets da JOIN assets a ON a.id = da.asset_id"
+            " WHERE a.asset_value = ? AND a.asset_type = ?)"
+        )
+        args += [value, asset_type]
+    for label in labels:
+        where.append(
+            "EXISTS (SELECT 1 FROM doc_entities de JOIN entities e ON e.id = de.entity_id"
+            " WHERE de.doc_id = d.id AND e.label = ?)"
+        )
+        args.append(label)
+    if files:
+        where.append(f"d.filename IN ({','.join('?' * len(files))})")
+        args += list(files)
+
+    conn = read_connection(db_path)
     cur = conn.cursor()
+    with temp_writes(conn):
+        # n numbers the hits in scan order (not by rank), so an even sample is every stride-th n
+        cur.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS facet_hits "
+            "(n INTEGER PRIMARY KEY, doc_id INTEGER NOT NULL, score REAL NOT NULL)"
+        )
+        cur.execute("DELETE FROM temp.facet_hits")
+        cur.execute(
+            f"""
+            INSERT INTO temp.facet_hits(doc_id, score)
+            SELECT d.id, {score} AS score
+            FROM {source}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            """,
+            args,
+        )
+        total = int(cur.execute("SELECT COUNT(*) FROM temp.facet_hits").fetchone()[0])
+
+        cur.execute(
+            """
+            SELECT h.doc_id, d.filename, d.page, substr(d.content, 1, 200)
+            FROM temp.facet_hits h JOIN documents d ON d.id = h.doc_id
+            ORDER BY h.score, h.doc_id
+            LIMIT ? OFFSET ?
+            """,
+            (limit, offset),
+        )
+        served = cur.fetchall()
+        snippets: Dict[int, str] = {}
+        if q and served:
+            marks = ",".join("?" * len(served))
+            cur.execute(
+                f"""
+                SELECT {table}.rowid, snippet({table}, 0, '[', ']', '...', ?)
+                FROM {table}
+                WHERE {table} MATCH ? AND {table}.rowid IN ({marks})
+                """,
+                (int(snippet_tokens), q, *[r[0] for r in served]),
+            )
+            snippets = {int(r[0]): r[1] for r in cur.fetchall()}
+        rows = [(r[1], int(r[2]), snippets.get(int(r[0]), r[3])) for r in served]
+
+        stride = max(1, -(-total // FACET_SAMPLE))  # ceil: every stride-th hit in scan order
+        ent_facets = _top_per_group(
+            cur,
+            """
+            SELECT e.label AS grp, e.text AS value, c.pages
+            FROM (
+                SELECT de.entity_id, COUNT(*) AS pages
+                FROM temp.facet_hits h
+                CROSS JOIN doc_entities de ON de.doc_id = h.doc_id
+                WHERE h.n % ? = 0
+                GROUP BY de.entity_id
+            ) c
+            JOIN entities e ON e.id = c.entity_id
+            """,
+            stride, facet_top,
+        )
+        asset_facets = _top_per_group(
+            cur,
+            """
+            SELECT a.asset_type AS grp, a.asset_value AS value, c.pages
+            FROM (
+                SELECT da.asset_id, COUNT(*) AS pages
+                FROM temp.facet_hits h
+                CROSS JOIN doc_assets da ON da.doc_id = h.doc_id
+                WHERE h.n % ? = 0
+                GROUP BY da.asset_id
+            ) c
+            JOIN assets a ON a.id = c.asset_id
+            """,
+            stride, facet_top,
+        )
+        cur.execute(
+            """
+            SELECT d.filename, COUNT(*) AS pages
+            FROM temp.facet_hits h CROSS JOIN documents d ON d.id = h.doc_id
+            WHERE h.n % ? = 0
+            GROUP BY d.filename
+            ORDER BY pages DESC, d.filename
+            LIMIT ?
+            """,
+            (stride, facet_top),
+        )
+        file_facets = [(r[0], int(r[1]) * stride) for r in cur.fetchall()]
+        cur.execute("DELETE FROM temp.facet_hits")
+
+    return FacetResult(
+        rows=rows,
+        total=total,
+        entities=ent_facets,
+        assets=asset_facets,
+        files=file_facets,
+        sampled=stride > 1,
+    )
+
+def _top_per_group(cur, counts_sql: str, stride: int, top: int) -> Dict[str, List[Tuple[str, int]]]:
+    """Top `top` values per grp from (grp, value, pages) rows, counts scaled by the sample stride."""
     cur.execute(
-        """
-        SELECT e.text, e.label, SUM(de.count) as total_count
-        FROM entities e
-        JOIN doc_entities de ON de.entity_id = e.id
-        WHERE e.label = ?
-        GROUP BY e.id
-        ORDER BY total_count DESC
-        LIMIT ?
+        f"""
+        SELECT grp, value, pages FROM (
+            SELECT c.*, ROW_NUMBER() OVER (PARTITION BY grp ORDER BY pages DESC, value) AS rk
+            FROM ({counts_sql}) AS c
+        )
+        WHERE rk <= ?
+        ORDER BY grp, pages DESC, value
         """,
-        (label, int(limit)),
+        (stride, top),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [(r[0], r[1], int(r[2])) for r in rows]
+    out: Dict[str, List[Tuple[str, int]]] = {}
+    for grp, value, pages in cur.fetchall():
+        out.setdefault(grp, []).append((value, int(pages) * stride))
+    return out
+
+def list_top_entities(db_path: Path, label: str, limit: int = 200):
+    return _cached(db_path, "list_top_entities", (label, int(limit)), lambda: _list_top_entities(db_path, label, limit))
 
-def search_entity_mentions(db_path: Path, entity_text: str, label: str, limit: int = 300):
-    conn = connect(db_path)
+def _list_top_entities(db_path: Path, label: str, limit: int):
+    conn = read_connection(db_path)
     cur = conn.cursor()
+    # range scan of idx_entity_stats_label_total, highest totals first
     cur.execute(
         """
-        SELECT d.filename, d.page, d.content
-        FROM entities e
-        JOIN doc_entities de ON de.entity_id = e.id
-        JOIN documents d ON d.id = de.doc_id
-        WHERE e.text = ? AND e.label = ?
+        SELECT e.text, e.label, s.total
+        FROM entity_stats s
+        JOIN entities e ON e.id = s.entity_id
+        WHERE s.label = ? AND s.total > 0
+        ORDER BY s.total DESC
         LIMIT ?
         """,
-        (entity_text, label, int(limit)),
+        (label, int(limit)),
     )
     rows = cur.fetchall()
-    conn.close()
-    return [(r[0], int(r[1]), r[2]) for r in rows]
+    return [(r[0], r[1], int(r[2])) for r in rows]
+
+def search_entity_mentions(db_path: Path, entity_text: str, label: str, limit: int = 300) -> List["Mention"]:
+    return _mention_excerpts(db_path, "entity", entity_text, label, limit)
 
 def list_top_assets(db_path: Path, asset_type: str, limit: int = 200):
-    conn = connect(db_path)
+    return _cached(db_path, "list_top_assets", (asset_type, int(limit)), lambda: _list_top_assets(db_path, asset_type, limit))
+
+def _list_top_assets(db_path: Path, asset_type: str, limit: int):
+    conn = read_connection(db_path)
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT a.asset_value, a.asset_type, SUM(da.count) as total_count
-        FROM assets a
-        JOIN doc_assets da ON da.asset_id = a.id
-        WHERE a.asset_type = ?
-        GROUP BY a.id
-        ORDER BY total_count DESC
+        SELECT a.asset_value, a.asset_type, s.total
+        FROM asset_stats s
+        JOIN assets a ON a.id = s.asset_id
+        WHERE s.asset_type = ? AND s.total > 0
+        ORDER BY s.total DESC
         LIMIT ?
         """,
         (asset_type, int(limit)),
     )
     rows = cur.fetchall()
-    conn.close()
     return [(r[0], r[1], int(r[2])) for r in rows]
 
-def search_asset_mentions(db_path: Path, asset_value: str, asset_type: str, limit: int = 300):
-    conn = connect(db_path)
+def search_asset_mentions(db_path: Path, asset_value: str, asset_type: str, limit: int = 300) -> List["Mention"]:
+    return _mention_excerpts(db_path, "asset", asset_value, asset_type, limit)
+
+# -----------------------------
+# Mention excerpts (from the offsets recorded at ingest)
+# -----------------------------
+MENTION_CONTEXT = 220   # characters shown before the first mention on a page
+MENTION_EXCERPT = 1000  # characters of page text returned per page
+
+@dataclass
+class Mention:
+    """One page mentioning an entity/asset: a window of its text and every occurrence inside the window."""
+    filename: str
+    page: int
+    excerpt: str
+    offset: int                        # excerpt starts at this character of the page
+    highlights: List[Tuple[int, int]]  # (start, end) into excerpt
+    occurrences: int                   # mentions on the whole page
+    page_chars: int
+
+# kind -> (subject table, value column, type column, link table, mention table, id column)
+_MENTION_TABLES = {
+    "entity": ("entities", "text", "label", "doc_entities", "entity_mentions", "entity_id"),
+    "asset": ("assets", "asset_value", "asset_type", "doc_assets", "asset_mentions", "asset_id"),
+}
+
+def _mention_excerpts(db_path: Path, kind: str, value: str, subtype: str, limit: int) -> List[Mention]:
+    """
+    Window and highlight spans are cut in SQL from the mention offsets, so only
+    MENTION_EXCERPT characters per page leave the database. Pages indexed
+    before offsets were recorded come back with their opening text and no
+    highlights (python -m app.maintenance mentions backfills them).
+    """
+    subjects, value_col, type_col, links, mentions, ref = _MENTION_TABLES[kind]
+    conn = read_connection(db_path)
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT d.filename, d.page, d.content
-        FROM assets a
-        JOIN doc_assets da ON da.asset_id = a.id
-        JOIN documents d ON d.id = da.doc_id
-        WHERE a.asset_value = ? AND a.asset_type = ?
-        LIMIT ?
+        f"""
+        WITH hits AS (
+            SELECT l.doc_id, l.{ref} AS ref_id, l.count AS n,
+                   MAX(0, COALESCE(
+                       (SELECT MIN(m.start_char) FROM {mentions} m
+                        WHERE m.{ref} = l.{ref} AND m.doc_id = l.doc_id), 0
+                   ) - :context) AS lo
+            FROM {links} l
+            WHERE l.{ref} IN (SELECT id FROM {subjects} WHERE {value_col} = :value AND {type_col} = :subtype)
+            ORDER BY l.doc_id
+            LIMIT :limit
+        )
+        SELECT d.filename, d.page, h.lo, substr(d.content, h.lo + 1, :excerpt), length(d.content), h.n,
+               (SELECT json_group_array(json_array(m.start_char - h.lo, m.end_char - h.lo))
+                FROM {mentions} m
+                WHERE m.{ref} = h.ref_id AND m.doc_id = h.doc_id
+                  AND m.start_char >= h.lo AND m.end_char <= h.lo + :excerpt)
+        FROM hits h
+        JOIN documents d ON d.id = h.doc_id
+        ORDER BY h.doc_id
         """,
-        (asset_value, asset_type, int(limit)),
+        {
+            "value": value,
+            "subtype": subtype,
+            "context": MENTION_CONTEXT,
+            "excerpt": MENTION_EXCERPT,
+            "limit": int(limit),
+        },
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [(r[0], int(r[1]), r[2]) for r in rows]
+    return [
+        Mention(
+            filename=r[0],
+            page=int(r[1]),
+            excerpt=r[3] or "",
+            offset=int(r[2]),
+            highlights=sorted((int(a), int(b)) for a, b in json.loads(r[6] or "[]")),
+            occurrences=int(r[5]),
+            page_chars=int(r[4] or 0),
+        )
+        for r in cur.fetchall()
+    ]
 
 def list_events(db_path: Path, limit: int = 200):
-    conn = connect(db_path)
+    conn = read_connection(db_path)
     cur = conn.cursor()
     cur.execute(
         """
@@ -127,17 +592,15 @@ def list_events(db_path: Path, limit: int = 200):
         (int(limit),),
     )
     rows = cur.fetchall()
-    conn.close()
     return [(int(r[0]), r[1], r[2], r[3], int(r[4])) for r in rows]
 
 def get_event_detail(db_path: Path, event_id: int) -> Dict[str, Any]:
-    conn = connect(db_path)
+    conn = read_connection(db_path)
     cur = conn.cursor()
 
     cur.execute("SELECT date_text, location_text, filename, page FROM events WHERE id=?", (int(event_id),))
     row = cur.fetchone()
     if not row:
-        conn.close()
         return {}
 
     date_text, loc_text, filename, page = row
@@ -164,7 +627,6 @@ def get_event_detail(db_path: Path, event_id: int) -> Dict[str, Any]:
     )
     assets = [(r[0], r[1]) for r in cur.fetchall()]
 
-    conn.close()
     return {
         "event_id": int(event_id),
         "date_text": date_text,
@@ -0,0 +1,507 @@
+from __future__ import annotations
+import asyncio
+import ipaddress
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from app.db import read_connection, read_generation
+from app.network import build_network_exposure
+from app.pdd import PERMUTATION_SEED, analyze_overlap_randomness, rank_overlaps
+from app.ree import lookup_registry_records
+from app.search import (
+    MODE_TOKENS,
+    PAGE_SIZE,
+    faceted_search,
+    keyword_search_page,
+    search_asset_mentions,
+    search_entity_mentions,
+)
+
+# -----------------------------
+# Server defaults
+# -----------------------------
+HOST = "127.0.0.1"
+PORT = 8765
+SERVER_THREADS = 4        # SQLite work runs here; each thread keeps its own warmed read connection
+MAX_PENDING = 64          # requests queued for the pool before new ones get 503
+STREAM_PAGE = 500         # hits fetched per pool task while streaming /search/stream
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+IDLE_TIMEOUT_SEC = 30.0   # keep-alive connections with no request are closed
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def to_json(obj: Any) -> Any:
+    """JSON-ready form of results: FIL statements, dataclasses, tuples."""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if is_dataclass(obj):
+        return {f.name: to_json(getattr(obj, f.name)) for f in fields(obj)}
+    if isinstance(obj, dict):
+        return {str(k): to_json(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_json(v) for v in obj]
+    return obj
+
+
+def _hit(row: Tuple[str, int, str]) -> Dict[str, Any]:
+    return {"filename": row[0], "page": int(row[1]), "snippet": row[2]}
+
+
+# -----------------------------
+# Request parameters
+# -----------------------------
+class Params:
+    """Query-string and JSON-body parameters of one request (the body wins)."""
+
+    def __init__(self, query: Dict[str, List[str]], body: Dict[str, Any]):
+        self.query = query
+        self.body = body
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in self.body:
+            return self.body[name]
+        values = self.query.get(name)
+        return values[-1] if values else default
+
+    def all(self, name: str) -> List[Any]:
+        if name in self.body:
+            value = self.body[name]
+            return list(value) if isinstance(value, list) else [value]
+        return list(self.query.get(name, []))
+
+    def text(self, name: str, required: bool = True) -> Optional[str]:
+        value = self.get(name)
+        if value is None or str(value).strip() == "":
+            if required:
+                raise HTTPError(400, f"missing parameter: {name}")
+            return None
+        return str(value)
+
+    def integer(self, name: str, default: int) -> int:
+        value = self.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"{name} must be an integer") from None
+
+    def pairs(self, name: str) -> List[Tuple[str, str]]:
+        """Repeated name=value|kind parameters (or [value, kind] lists in a JSON body)."""
+        out = []
+        for item in self.all(name):
+            parts = item if isinstance(item, list) else str(item).rsplit("|", 1)
+            if len(parts) != 2:
+                raise HTTPError(400, f"{name} must be value|kind")
+            out.append((str(parts[0]), str(parts[1])))
+        return out
+
+
+# -----------------------------
+# Server
+# -----------------------------
+Handler = Callable[["QueryServer", Params], Any]
+
+
+class QueryServer:
+    """
+    Loopback-only JSON/HTTP front end to the query functions.
+
+    One asyncio loop parses requests and writes responses. Every SQLite call
+    runs on a bounded thread pool. The pooled read connections stay open in
+    those threads, so page cache, mmap and result cache stay warm for every
+    client. List endpoints stream newline-delimited JSON (chunked), one
+    pool task per page, so a large result never sits whole in memory.
+    """
+
+    def __init__(self, db_path: Path, host: str = HOST, port: int = PORT, threads: int = SERVER_THREADS):
+        if not _is_loopback(host):
+            raise ValueError(f"refusing to listen on non-loopback address {host!r}")
+        self.db_path = Path(db_path)
+        self.host = host
+        self.port = int(port)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, int(threads)), thread_name_prefix="query")
+        self.slots = asyncio.Semaphore(MAX_PENDING)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def run_db(self, fn: Callable, *args, **kwargs) -> Any:
+        """Runs fn on the query pool; 503 when MAX_PENDING calls are already waiting."""
+        if self.slots.locked():
+            raise HTTPError(503, "server busy")
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, lambda: fn(*args, **kwargs))
+
+    async def start(self) -> asyncio.AbstractServer:
+        self.server = await asyncio.start_server(
+            self._client, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self.server.sockets[0].getsockname()[1]  # port=0 picks a free one
+        return self.server
+
+    async def serve_forever(self):
+        server = self.server or await self.start()
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- connection handling ---
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), IDLE_TIMEOUT_SEC)
+                except HTTPError as e:
+                    await _send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                method, target, version, headers, body = request
+                keep_alive = _keep_alive(version, headers)
+                await self._dispatch(writer, method, target, body, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, target: str, body: bytes, keep_alive: bool):
+        url = urlsplit(target)
+        route = ROUTES.get(url.path) or STREAMS.get(url.path)
+        try:
+            if route is None:
+                raise HTTPError(404, f"no such endpoint: {url.path}")
+            if method not in ("GET", "POST"):
+                raise HTTPError(405, "use GET or POST")
+            params = Params(parse_qs(url.query), _json_body(body))
+            if url.path in STREAMS:
+                await _send_stream(writer, route(self, params), keep_alive)
+            else:
+                await _send_json(writer, 200, to_json(await route(self, params)), keep_alive)
+        except HTTPError as e:
+            await _send_json(writer, e.status, {"error": str(e)}, keep_alive)
+        except ValueError as e:  # bad query input (unknown mode, missing trigram index, cursor)
+            await _send_json(writer, 400, {"error": str(e)}, keep_alive)
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            await _send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"}, keep_alive)
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# -----------------------------
+# Endpoints
+# -----------------------------
+async def health(server: QueryServer, params: Params):
+    generation = await server.run_db(lambda: read_generation(read_connection(server.db_path)))
+    return {"status": "ok", "db": str(server.db_path), "generation": generation}
+
+
+async def search(server: QueryServer, params: Params):
+    page = await server.run_db(
+        keyword_search_page,
+        server.db_path,
+        params.text("q"),
+        limit=params.integer("limit", PAGE_SIZE),
+        cursor=params.text("cursor", required=False),
+        mode=params.get("mode", MODE_TOKENS),
+    )
+    return {
+        "hits": [_hit(r) for r in page.rows],
+        "next_cursor": page.next_cursor,
+        "total": page.total,
+        "total_capped": page.total_capped,
+        "expansions": page.expansions,
+    }
+
+
+async def search_stream(server: QueryServer, params: Params) -> AsyncIterator[Any]:
+    """Every hit (or the first `max`), best first, fetched STREAM_PAGE at a time."""
+    query = params.text("q")
+    mode = params.get("mode", MODE_TOKENS)
+    remaining = params.integer("max", 0) or None
+    cursor = None
+    while True:
+        limit = STREAM_PAGE if remaining is None else min(STREAM_PAGE, remaining)
+        page = await server.run_db(
+            keyword_search_page, server.db_path, query, limit=limit, cursor=cursor, count_cap=0, mode=mode
+        )
+        for row in page.rows:
+            yield _hit(row)
+        if remaining is not None:
+            remaining -= len(page.rows)
+        cursor = page.next_cursor
+        if cursor is None or remaining == 0:
+            return
+
+
+async def facets(server: QueryServer, params: Params):
+    return await server.run_db(
+        faceted_search,
+        server.db_path,
+        params.get("q", "") or "",
+        entities=params.pairs("entity"),
+        assets=params.pairs("asset"),
+        labels=[str(v) for v in params.all("label")],
+        files=[str(v) for v in params.all("file")],
+        limit=params.integer("limit", PAGE_SIZE),
+        offset=params.integer("offset", 0),
+        mode=params.get("mode", MODE_TOKENS),
+    )
+
+
+async def entity_mentions(server: QueryServer, params: Params) -> AsyncIterator[Any]:
+    mentions = await server.run_db(
+        search_entity_mentions, server.db_path, params.text("text"), params.text("label"),
+        limit=params.integer("limit", 300),
+    )
+    for m in mentions:
+        yield m
+
+
+async def asset_mentions(server: QueryServer, params: Params) -> AsyncIterator[Any]:
+    mentions = await server.run_db(
+        search_asset_mentions, server.db_path, params.text("value"), params.text("type"),
+        limit=params.integer("limit", 300),
+    )
+    for m in mentions:
+        yield m
+
+
+async def network(server: QueryServer, params: Params):
+    return await server.run_db(
+        build_network_exposure,
+        server.db_path,
+        focus_entity_text=params.text("focus", required=False),
+        max_assets=params.integer("max_assets", 10),
+        max_events=params.integer("max_events", 50),
+        use_graph=str(params.get("graph", "")).lower() in ("1", "true", "yes"),
+    )
+
+
+async def pdd(server: QueryServer, params: Params):
+    return await server.run_db(
+        analyze_overlap_randomness,
+        server.db_path,
+        entity_a=params.text("a"),
+        entity_b=params.text("b"),
+        scope=str(params.get("scope", "EVENTS")).upper(),
+        permutations=params.integer("permutations", 0),
+        seed=params.integer("seed", PERMUTATION_SEED),
+    )
+
+
+async def pdd_rank(server: QueryServer, params: Params):
+    return await server.run_db(
+        rank_overlaps,
+        server.db_path,
+        params.text("entity"),
+        scope=str(params.get("scope", "EVENTS")).upper(),
+        limit=params.integer("limit", 50),
+    )
+
+
+async def registry(server: QueryServer, params: Params) -> AsyncIterator[Any]:
+    rows = await server.run_db(
+        lookup_registry_records, server.db_path,
+        str(params.get("subject_type", "ENTITY")).upper(), params.text("value"),
+        limit=params.integer("limit", 200),
+    )
+    for row in rows:
+        yield row
+
+
+# path -> coroutine returning one JSON document
+ROUTES: Dict[str, Handler] = {
+    "/health": health,
+    "/search": search,
+    "/facets": facets,
+    "/network": network,
+    "/pdd": pdd,
+    "/pdd/rank": pdd_rank,
+}
+
+# path -> async generator of records, sent as application/x-ndjson
+STREAMS: Dict[str, Handler] = {
+    "/search/stream": search_stream,
+    "/entities/mentions": entity_mentions,
+    "/assets/mentions": asset_mentions,
+    "/registry": registry,
+}
+
+
+# -----------------------------
+# HTTP/1.1 plumbing
+# -----------------------------
+async def _read_request(reader: asyncio.StreamReader):
+    """(method, target, version, headers, body), or None when the client closed the connection."""
+    try:
+        line = await reader.readline()
+    except (asyncio.LimitOverrunError, ValueError):
+        raise HTTPError(400, "request line too long") from None
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+
+    headers: Dict[str, str] = {}
+    size = 0
+    while True:
+        try:
+            line = await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError):
+            raise HTTPError(400, "header line too long") from None
+        size += len(line)
+        if size > MAX_HEADER_BYTES:
+            raise HTTPError(400, "headers too large")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    raw_length = headers.get("content-length") or "0"
+    if not (raw_length.isascii() and raw_length.isdigit()):
+        raise HTTPError(400, "content-length must be a non-negative integer")
+    length = int(raw_length)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version, headers, body
+
+
+def _json_body(body: bytes) -> Dict[str, Any]:
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "body is not valid JSON") from None
+    if not isinstance(data, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return data
+
+
+def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _head(status: int, content_type: str, keep_alive: bool, extra: str) -> bytes:
+    return (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"{extra}"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("latin-1")
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(_head(status, "application/json; charset=utf-8", keep_alive, f"Content-Length: {len(data)}\r\n"))
+    writer.write(data)
+    await writer.drain()
+
+
+async def _send_stream(writer: asyncio.StreamWriter, records: AsyncIterator[Any], keep_alive: bool):
+    """
+    Chunked NDJSON. The first record is fetched before the headers go out, so
+    bad parameters still get a proper 400. A failure mid-stream ends the body
+    with an {"error": ...} line.
+    """
+    it = records.__aiter__()
+    try:
+        first = await it.__anext__()
+    except StopAsyncIteration:
+        first = None
+    writer.write(_head(200, "application/x-ndjson; charset=utf-8", keep_alive, "Transfer-Encoding: chunked\r\n"))
+    lines: List[bytes] = []
+    try:
+        if first is not None:
+            lines.append(_ndjson(first))
+            async for record in it:
+                lines.append(_ndjson(record))
+                if len(lines) >= 100:
+                    _write_chunk(writer, b"".join(lines))
+                    lines = []
+                    await writer.drain()  # backpressure: a slow client pauses the producer
+    except (ConnectionError, asyncio.CancelledError):
+        raise
+    except Exception as e:
+        lines.append(_ndjson({"error": f"{type(e).__name__}: {e}"}))
+    if lines:
+        _write_chunk(writer, b"".join(lines))
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _ndjson(record: Any) -> bytes:
+    return json.dumps(to_json(record), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _write_chunk(writer: asyncio.StreamWriter, data: bytes):
+    writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+
+
+def serve(db_path: Path, host: str = HOST, port: int = PORT, threads: int = SERVER_THREADS):
+    server = QueryServer(db_path, host=host, port=port, threads=threads)
+
+    async def main():
+        await server.start()
+        print(f"Query server on http://{server.host}:{server.port} (db={server.db_path}, threads={threads})")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Local JSON/HTTP query service (loopback only).")
+    ap.add_argument("--db", type=Path, default=Path("data/index/forensic.db"))
+    ap.add_argument("--host", default=HOST, help="loopback address to bind (127.0.0.1, ::1, localhost)")
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--threads", type=int, default=SERVER_THREADS)
+    args = ap.parse_args()
+    serve(args.db, host=args.host, port=args.port, threads=args.threads)
@@ -10,6 +10,7 @@ DISALLOWED_PATTERNS = [
     r"\b(identify|identification|this is|that is)\b.*\b(person|man|woman|face)\b",
     r"\b(face recognition|recognize(d)? (him|her|them)|match(ed)? (a )?face)\b",
 ]
+_DISALLOWED = [re.compile(p, re.IGNORECASE) for p in DISALLOWED_PATTERNS]
 
 def stopline_check(text: str) -> Tuple[bool, str]:
     """
@@ -20,7 +21,7 @@ def stopline_check(text: str) -> Tuple[bool, str]:
     if not t:
         return True, ""
 
-    for pat in DISALLOWED_PATTERNS:
-        if re.search(pat, t, flags=re.IGNORECASE):
+    for pat in _DISALLOWED:
+        if pat.search(t):
             return False, "This exceeds verifiable assertion boundaries. Relevant structured data is provided instead."
     return True, ""
@@ -0,0 +1,54 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator
+
+# -----------------------------
+# Stage timers (off unless a benchmark turns them on)
+# -----------------------------
+# Stages used by ingest: parse, ocr, ner, regex, sqlite
+ENABLED = False
+
+_seconds: Dict[str, float] = {}
+_calls: Dict[str, int] = {}
+_OFF = nullcontext()
+
+
+@contextmanager
+def _timed(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _seconds[name] = _seconds.get(name, 0.0) + (time.perf_counter() - t0)
+        _calls[name] = _calls.get(name, 0) + 1
+
+
+def stage(name: str):
+    """Context manager adding the wall time of its block to a named stage."""
+    return _timed(name) if ENABLED else _OFF
+
+
+def record(name: str, seconds: float, calls: int = 1):
+    """Adds time measured elsewhere (e.g. in a worker process) to a named stage."""
+    if ENABLED:
+        _seconds[name] = _seconds.get(name, 0.0) + float(seconds)
+        _calls[name] = _calls.get(name, 0) + int(calls)
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def reset():
+    _seconds.clear()
+    _calls.clear()
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """{stage: {"seconds": s, "calls": n}} for everything timed since reset()."""
+    return {
+        name: {"seconds": round(_seconds[name], 6), "calls": _calls.get(name, 0)}
+        for name in sorted(_seconds)
+    }
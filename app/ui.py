@@ -1,9 +1,13 @@
-import re
+import html
 from pathlib import Path
 import streamlit as st
 
 from app.search import (
-    keyword_search,
+    keyword_search_page,
+    MODE_FUZZY,
+    MODE_SUBSTRING,
+    MODE_TOKENS,
+    cache_stats,
     list_top_entities,
     search_entity_mentions,
     list_top_assets,
@@ -13,21 +17,32 @@ from app.search import (
 )
 
 from app.network import build_network_exposure
-from app.pdd import analyze_overlap_randomness
+from app.pdd import analyze_overlap_randomness, rank_overlaps
 from app.ree import ingest_registry_folder, lookup_registry_records
 
 DB = Path("data/index/forensic.db")
 REG_DIR = Path("data/registries")
 
-def snippet_around(text: str, needle: str, window: int = 220) -> str:
-    if not text or not needle:
-        return (text or "")[:500]
-    m = re.search(re.escape(needle), text, flags=re.IGNORECASE)
-    if not m:
-        return text[:500]
-    start = max(0, m.start() - window)
-    end = min(len(text), m.end() + window)
-    return text[start:end]
+def highlighted_excerpt(m) -> str:
+    """HTML for a Mention: its excerpt with every recorded occurrence marked."""
+    parts = ["…" if m.offset > 0 else ""]
+    pos = 0
+    for start, end in m.highlights:
+        parts.append(html.escape(m.excerpt[pos:start]))
+        parts.append(f"<mark>{html.escape(m.excerpt[start:end])}</mark>")
+        pos = end
+    parts.append(html.escape(m.excerpt[pos:]))
+    if m.offset + len(m.excerpt) < m.page_chars:
+        parts.append("…")
+    return f'<div style="white-space: pre-wrap; font-family: monospace">{"".join(parts)}</div>'
+
+def show_mentions(mentions):
+    st.write(f"Mentions: {len(mentions)} pages, {sum(m.occurrences for m in mentions)} occurrences")
+    for m in mentions:
+        more = m.occurrences - len(m.highlights)
+        suffix = f" ({more} more occurrence(s) outside the excerpt)" if more > 0 else ""
+        st.markdown(f"**{m.filename} — Page {m.page}**{suffix}")
+        st.markdown(highlighted_excerpt(m), unsafe_allow_html=True)
 
 st.set_page_config(page_title="Forensic Browser", layout="wide")
 st.title("Forensic Browser")
@@ -47,14 +62,65 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 with tab1:
     st.subheader("Keyword Search (FTS5)")
     q = st.text_input("Enter keywords (quotes for phrase search)", placeholder='Example: "John Smith" flight OR island')
-    limit = st.slider("Max results", 20, 500, 200, step=20)
+    limit = st.slider("Results per page", 10, 200, 50, step=10)
+    match_modes = {
+        "Whole words": MODE_TOKENS,
+        "Fuzzy (OCR errors)": MODE_FUZZY,
+        "Substring (trigram index)": MODE_SUBSTRING,
+    }
+    match = st.radio(
+        "Match", list(match_modes), horizontal=True,
+        help="Fuzzy also matches near spellings (Epstien, Jeffrev). Substring finds fragments inside "
+             "words (OCR-merged words, partial Bates/account numbers).",
+    )
+    mode = match_modes[match]
 
     if q:
-        results = keyword_search(DB, q, limit=limit)
-        st.write(f"Results: {len(results)}")
-        for fname, page, snip in results:
-            st.markdown(f"**{fname} — Page {page}**")
-            st.code(snip)
+        # cursors of the pages visited so far; reset when the query, mode or page size changes
+        key = (q, mode, limit)
+        if st.session_state.get("kw_key") != key:
+            st.session_state.kw_key = key
+            st.session_state.kw_cursors = [None]
+            st.session_state.kw_total = None
+        cursors = st.session_state.kw_cursors
+
+        try:
+            res = keyword_search_page(DB, q, limit=limit, cursor=cursors[-1], mode=mode)
+        except ValueError as e:
+            st.warning(str(e))
+            res = None
+
+        if res is not None:
+            if res.total is not None:
+                st.session_state.kw_total = (res.total, res.total_capped)
+            total, capped = st.session_state.kw_total or (None, False)
+
+            if res.expansions:
+                st.caption("Searched: " + "; ".join(
+                    f"{w} → {', '.join(terms) if terms else 'no close terms'}" for w, terms in res.expansions.items()
+                ))
+
+            first = (len(cursors) - 1) * limit + 1
+            shown = f"{first}–{first + len(res.rows) - 1}" if res.rows else "0"
+            if total is not None:
+                st.write(f"Results: {'more than ' if capped else ''}{total:,} (showing {shown}, best match first)")
+            else:
+                st.write(f"Showing {shown}")
+
+            prev_col, next_col = st.columns(2)
+            if prev_col.button("← Previous", disabled=len(cursors) <= 1):
+                cursors.pop()
+                st.rerun()
+            if next_col.button("Next →", disabled=res.next_cursor is None):
+                cursors.append(res.next_cursor)
+                st.rerun()
+
+            for fname, page, snip in res.rows:
+                st.markdown(f"**{fname} — Page {page}**")
+                st.code(snip)
+
+            cs = cache_stats()
+            st.caption(f"Result cache: {cs['hits']} hits / {cs['misses']} misses ({cs['size']}/{cs['maxsize']} entries)")
 
 # -------------------------
 # Entities & Assets
@@ -75,11 +141,7 @@ with tab2:
             selected = st.selectbox("Pick an entity", options)
             ent_text = selected.split("  (count=")[0]
 
-            mentions = search_entity_mentions(DB, ent_text, label=label, limit=300)
-            st.write(f"Mentions: {len(mentions)}")
-            for fname, page, content in mentions:
-                st.markdown(f"**{fname} — Page {page}**")
-                st.code(snippet_around(content, ent_text))
+            show_mentions(search_entity_mentions(DB, ent_text, label=label, limit=300))
         else:
             st.info("No entities found yet. Ingest data first.")
 
@@ -94,11 +156,7 @@ with tab2:
             aselected = st.selectbox("Pick an asset", aopts)
             aval = aselected.split("  (count=")[0]
 
-            am = search_asset_mentions(DB, aval, asset_type=asset_type, limit=300)
-            st.write(f"Mentions: {len(am)}")
-            for fname, page, content in am:
-                st.markdown(f"**{fname} — Page {page}**")
-                st.code(snippet_around(content, aval))
+            show_mentions(search_asset_mentions(DB, aval, asset_type=asset_type, limit=300))
         else:
             st.info("No assets found yet. Ensure ingestion ran and the dataset contains recognizable asset patterns.")
 
@@ -148,15 +206,35 @@ with tab4:
     a = st.text_input("Entity A (exact text)")
     b = st.text_input("Entity B (exact text)")
     scope = st.selectbox("Scope", ["EVENTS", "DOCS"])
+    permutations = st.number_input(
+        "Permutation null (0 = off)", min_value=0, max_value=100000, value=0, step=1000,
+        help="Shuffles entity mentions across pages/events, keeping each one's entity count. Seeded, so reruns agree.",
+    )
 
     if st.button("Analyze overlap"):
-        out = analyze_overlap_randomness(DB, entity_a=a.strip(), entity_b=b.strip(), scope=scope)
+        bar = st.progress(0.0) if permutations else None
+        out = analyze_overlap_randomness(
+            DB, entity_a=a.strip(), entity_b=b.strip(), scope=scope, permutations=int(permutations),
+            progress=(lambda done, total: bar.progress(done / total)) if bar else None,
+        )
         for s in out.statements:
             st.markdown(f"**{s.statement_type.value}** (confidence={s.confidence_score:.2f})")
             st.write(s.text)
             if s.metadata:
                 st.json(s.metadata)
 
+    st.markdown("### Rank against every PERSON/ORG entity")
+    focus = st.text_input("Focus entity (exact text)", value=a)
+    rank_rows = st.slider("Rows", 10, 500, 50, step=10, key="pdd_rank_rows")
+
+    if st.button("Rank overlaps"):
+        ranking = rank_overlaps(DB, focus.strip(), scope=scope, limit=rank_rows)
+        if not ranking.rows:
+            st.info("Entity not found as PERSON/ORG in this scope.")
+        else:
+            st.write(f"Compared against {ranking.compared:,} entities (scope={ranking.scope}, N={ranking.N:,}); lowest exact p first.")
+            st.dataframe([r.__dict__ for r in ranking.rows], use_container_width=True)
+
 # -------------------------
 # REE
 # -------------------------
@@ -11,6 +11,9 @@ INDEX = DATA / "index"
 REGISTRIES = DATA / "registries"
 DB_PATH = INDEX / "forensic.db"
 
+# OCR worker processes for image ingest (0 = serial)
+OCR_WORKERS = max(0, (os.cpu_count() or 1) - 1)
+
 def check_python():
     if sys.version_info < (3, 10):
         print("ERROR: Python 3.10+ required.")
@@ -67,6 +70,6 @@ if __name__ == "__main__":
 
     if ingest_prompt():
         from app.ingest import ingest_all
-        ingest_all(raw_dir=RAW, db_path=DB_PATH)
+        ingest_all(raw_dir=RAW, db_path=DB_PATH, ocr_workers=OCR_WORKERS)
 
     launch_ui()
@@ -0,0 +1,77 @@
+import random
+
+from app.db import connect, init_db, rebuild_cooccurrence
+
+# (text, label, normalized): two labels share "maxwell", so they count as one term
+ENTITIES = [
+    ("Ghislaine Maxwell", "PERSON", "maxwell"),
+    ("Maxwell", "ORG", "maxwell"),
+    ("Jeffrey Epstein", "PERSON", "epstein"),
+    ("JP Morgan", "ORG", "jp morgan"),
+    ("Sarah Kellen", "PERSON", "kellen"),
+    ("Palm Beach", "GPE", "palm beach"),
+    ("Deutsche Bank", "ORG", "deutsche bank"),
+    ("Jean-Luc Brunel", "PERSON", "brunel"),
+]
+
+
+def _state(conn):
+    """Trigger-maintained counts keyed by normalized text (term ids differ after a rebuild)."""
+    name = "(SELECT normalized FROM cooc_terms WHERE id = {})"
+    return {
+        "totals": sorted(conn.execute("SELECT scope, n FROM cooc_totals")),
+        "marginals": sorted(conn.execute(f"SELECT scope, {name.format('term_id')}, n FROM cooc_marginals")),
+        "pairs": sorted(conn.execute(
+            f"SELECT scope, {name.format('term_a')}, {name.format('term_b')}, n FROM cooc_pairs"
+        )),
+    }
+
+
+def _rebuilt(conn):
+    conn.execute("SAVEPOINT rebuild")
+    rebuild_cooccurrence(conn)
+    state = _state(conn)
+    conn.execute("ROLLBACK TO rebuild")
+    conn.execute("RELEASE rebuild")
+    return state
+
+
+def test_triggers_match_rebuild_through_inserts_and_deletes(tmp_path):
+    db = tmp_path / "cooc.db"
+    init_db(db)
+    conn = connect(db)
+    conn.isolation_level = None
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO entities(text, label, normalized) VALUES (?, ?, ?)", ENTITIES)
+    for i in range(30):
+        conn.execute("INSERT INTO documents(filename, page, content) VALUES (?, 1, 'text')", (f"f{i}.txt",))
+        conn.execute(
+            "INSERT INTO events(event_key, filename, page) VALUES (?, ?, 1)", (f"k{i}", f"f{i}.txt")
+        )
+
+    rng = random.Random(7)
+    links = {"doc_entities": "doc_id", "event_entities": "event_id"}
+    for step in range(600):
+        table = rng.choice(list(links))
+        ctx, entity = rng.randint(1, 30), rng.randint(1, len(ENTITIES))
+        col = links[table]
+        if rng.random() < 0.65:
+            extra = ", count" if table == "doc_entities" else ""
+            conn.execute(
+                f"INSERT OR IGNORE INTO {table}({col}, entity_id{extra}) VALUES (?, ?{', 1' if extra else ''})",
+                (ctx, entity),
+            )
+        else:
+            conn.execute(f"DELETE FROM {table} WHERE {col}=? AND entity_id=?", (ctx, entity))
+        if step % 100 == 99:
+            assert _state(conn) == _rebuilt(conn), f"diverged after step {step}"
+
+    # deleting contexts cascades to their links
+    conn.execute("DELETE FROM documents WHERE id IN (3, 4, 30)")
+    conn.execute("DELETE FROM events WHERE id % 4 = 0")
+    state = _state(conn)
+    assert state == _rebuilt(conn)
+    assert ("DOCS", 27) in state["totals"] and ("EVENTS", 23) in state["totals"]
+    assert any(p[1] == "maxwell" for p in state["pairs"])
+    conn.execute("COMMIT")
+    conn.close()
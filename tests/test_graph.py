@@ -0,0 +1,81 @@
+from app.db import bump_generation, connect, init_db
+from app.graph import DOC, ENTITY, Graph, graph
+
+
+def _link(conn, doc_id: int, entity_id: int):
+    conn.execute("INSERT INTO doc_entities(doc_id, entity_id, count) VALUES (?, ?, 1)", (doc_id, entity_id))
+
+
+def test_refresh_reloads_after_delete_then_reinsert(tmp_path):
+    db = tmp_path / "graph.db"
+    init_db(db)
+    conn = connect(db)
+    for name in ("alice", "bob"):
+        conn.execute("INSERT INTO entities(text, label, normalized) VALUES (?, 'PERSON', ?)", (name, name))
+    for page in (1, 2, 3):
+        conn.execute("INSERT INTO documents(filename, page, content) VALUES ('a.pdf', ?, 'text')", (page,))
+    _link(conn, 1, 1)
+    _link(conn, 2, 2)
+    _link(conn, 3, 2)
+    bump_generation(conn)
+    conn.commit()
+
+    g = Graph()
+    g.load(conn)
+
+    # deleting the newest rows frees their rowids; the re-inserted link takes one back
+    conn.execute("DELETE FROM documents WHERE id=3")
+    conn.execute("INSERT INTO documents(filename, page, content) VALUES ('a.pdf', 3, 'changed')")
+    _link(conn, 3, 1)
+    bump_generation(conn)
+    conn.commit()
+
+    assert g.refresh(conn)
+    fresh = Graph()
+    fresh.load(conn)
+    for kind, node, to in ((ENTITY, 1, DOC), (ENTITY, 2, DOC), (DOC, 3, ENTITY)):
+        assert sorted(g.neighbors(kind, node, to)) == sorted(fresh.neighbors(kind, node, to))
+    assert sorted(g.neighbors(ENTITY, 1, DOC)) == [1, 3]
+    assert list(g.neighbors(ENTITY, 2, DOC)) == [2]
+
+
+def test_shared_graph_is_replaced_not_changed(tmp_path):
+    db = tmp_path / "graph.db"
+    init_db(db)
+    conn = connect(db)
+    conn.executemany(
+        "INSERT INTO entities(text, label, normalized) VALUES (?, 'PERSON', ?)", [(n, n) for n in ("alice", "bob")]
+    )
+    conn.executemany(
+        "INSERT INTO documents(filename, page, content) VALUES ('a.pdf', ?, 'text')", [(p,) for p in range(1, 40)]
+    )
+    for page in range(1, 30):
+        _link(conn, page, 1)
+    bump_generation(conn)
+    conn.commit()
+
+    first = graph(db)
+    assert graph(db) is first  # same generation: no copy
+
+    # appends go into the overlay of a new graph; a reader holding the old one sees no change
+    _link(conn, 30, 1)
+    bump_generation(conn)
+    conn.commit()
+    second = graph(db)
+    assert second is not first
+    assert first.degree(ENTITY, 1, DOC) == 29 and second.degree(ENTITY, 1, DOC) == 30
+    assert second.adj[(ENTITY, DOC)].overlay_edges == 1
+
+    # the next append must not reach into the overlay the second graph's readers share
+    _link(conn, 31, 1)
+    conn.execute("INSERT INTO entities(text, label, normalized) VALUES ('acme', 'ORG', 'acme')")
+    _link(conn, 31, 3)
+    bump_generation(conn)
+    conn.commit()
+    third = graph(db)
+    assert list(second.neighbors(ENTITY, 1, DOC))[-1] == 30
+    assert list(third.neighbors(ENTITY, 1, DOC))[-2:] == [30, 31]
+    assert second.label(3) is None and third.label(3) == "ORG"
+    assert first.k_hop(DOC, 31, 1)[ENTITY] == set()
+    assert third.k_hop(DOC, 31, 1)[ENTITY] == {1, 3}
+    conn.close()
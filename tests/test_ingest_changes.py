@@ -0,0 +1,93 @@
+import os
+
+from app.db import connect, init_db
+from app.ingest import ingest_all
+
+SHARED = "Ghislaine Maxwell booked the flight on N908JE to Palm Beach, confirmed by jeevacation@gmail.com. " * 4
+
+
+def _write(path, text: str, mtime_ns: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _pages(db):
+    conn = connect(db)
+    try:
+        return sorted(conn.execute("SELECT source_path, filename, page, content FROM documents"))
+    finally:
+        conn.close()
+
+
+def _fts_hits(db, query: str):
+    conn = connect(db)
+    try:
+        return sorted(r[0] for r in conn.execute(
+            "SELECT d.source_path FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+            "WHERE documents_fts MATCH ?", (query,)
+        ))
+    finally:
+        conn.close()
+
+
+def _corpus(tmp_path):
+    raw = tmp_path / "raw"
+    _write(raw / "x.txt", SHARED, 1_000_000_000)
+    _write(raw / "sub" / "y.txt", SHARED, 1_000_000_000)
+    db = tmp_path / "index.db"
+    init_db(db)
+    ingest_all(raw, db, ocr_workers=0)
+    return raw, db
+
+
+def test_changed_duplicate_file_keeps_the_indexed_copy(tmp_path):
+    raw, db = _corpus(tmp_path)
+    assert [p[0] for p in _pages(db)] == ["x.txt"]  # sub/y.txt was deduped against it
+
+    _write(raw / "sub" / "y.txt", "Flight logs for the Teterboro departure. " * 6, 2_000_000_000)
+    ingest_all(raw, db, ocr_workers=0)
+
+    assert [p[0] for p in _pages(db)] == ["sub/y.txt", "x.txt"]
+    assert _fts_hits(db, "maxwell") == ["x.txt"]
+    assert _fts_hits(db, "teterboro") == ["sub/y.txt"]
+    conn = connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM duplicate_pages").fetchone()[0] == 0
+    conn.close()
+
+
+def test_replaced_file_hands_its_page_to_the_duplicate(tmp_path):
+    raw, db = _corpus(tmp_path)
+
+    _write(raw / "x.txt", "A different memo about the New Mexico ranch. " * 6, 2_000_000_000)
+    ingest_all(raw, db, ocr_workers=0)
+
+    pages = _pages(db)
+    assert ("sub/y.txt", "y.txt", 1, SHARED.strip()) in [(p[0], p[1], p[2], p[3].strip()) for p in pages]
+    assert sorted(p[0] for p in pages) == ["sub/y.txt", "x.txt"]
+    assert _fts_hits(db, "maxwell") == ["sub/y.txt"]
+    assert _fts_hits(db, "ranch") == ["x.txt"]
+    conn = connect(db)
+    # the promoted page keeps its links
+    linked = conn.execute(
+        """
+        SELECT (SELECT COUNT(*) FROM doc_entities WHERE doc_id = d.id), (SELECT COUNT(*) FROM doc_assets WHERE doc_id = d.id)
+        FROM documents d WHERE d.source_path = 'sub/y.txt'
+        """
+    ).fetchone()
+    conn.close()
+    assert linked == (1, 1)
+
+
+def test_unchanged_size_and_mtime_is_skipped(tmp_path):
+    raw, db = _corpus(tmp_path)
+    before = _pages(db)
+
+    # same size and mtime: the manifest skips the file without reading it
+    swapped = SHARED.replace("Maxwell", "Maxwelm")
+    assert len(swapped) == len(SHARED)
+    _write(raw / "x.txt", swapped, 1_000_000_000)
+    ingest_all(raw, db, ocr_workers=0)
+
+    assert _pages(db) == before
+    assert _fts_hits(db, "maxwelm") == []
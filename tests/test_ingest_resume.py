@@ -0,0 +1,110 @@
+import pytest
+
+import app.ingest as ingest
+from app.db import COOC_TRIGGER_NAMES, FTS_TRIGGER_NAMES, STATS_TRIGGER_NAMES, connect, init_db
+
+FILES = 20
+
+
+def _corpus(raw, prefix="memo", start=0):
+    raw.mkdir(parents=True, exist_ok=True)
+    for i in range(start, start + FILES):
+        (raw / f"{prefix}_{i:02d}.txt").write_text(
+            f"Page {i} of the {prefix} file: wire to account {1000 + i} via jeevacation@gmail.com, tail N908JE. " * 3
+        )
+
+
+def _interrupted_ingest(raw, db, monkeypatch, stop_after: int):
+    """Runs ingest_all until Ctrl-C lands on the stop_after-th file (checkpoints every 3 files)."""
+    monkeypatch.setattr(ingest, "CHECKPOINT_FILES", 3)
+    real = ingest.ingest_text
+    seen = {"n": 0}
+
+    def ingest_text(cur, file, **kw):
+        seen["n"] += 1
+        if seen["n"] == stop_after:
+            raise KeyboardInterrupt
+        return real(cur, file, **kw)
+
+    monkeypatch.setattr(ingest, "ingest_text", ingest_text)
+    with pytest.raises(KeyboardInterrupt):
+        ingest.ingest_all(raw, db, ocr_workers=0)
+    monkeypatch.setattr(ingest, "ingest_text", real)
+
+
+def _check_index(db, pages: int):
+    conn = connect(db)
+    try:
+        assert conn.execute("SELECT COUNT(*), COUNT(DISTINCT content_hash) FROM documents").fetchone() == (pages, pages)
+        assert conn.execute("SELECT COUNT(*) FROM ingest_manifest").fetchone()[0] == pages
+        conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('integrity-check')")
+        assert conn.execute("SELECT COUNT(*) FROM documents_fts WHERE documents_fts MATCH 'wire'").fetchone()[0] == pages
+        triggers = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger'")}
+        assert set(FTS_TRIGGER_NAMES[:3]) | set(STATS_TRIGGER_NAMES) | set(COOC_TRIGGER_NAMES) <= triggers
+        assert conn.execute("SELECT value FROM meta WHERE key='bulk_load'").fetchone() == (0,)
+        assert conn.execute("SELECT COUNT(*) FROM ingest_runs WHERE status='running'").fetchone()[0] == 0
+        # frequency table matches a recount of the links
+        assert conn.execute("SELECT docs FROM asset_stats").fetchall() == [(pages,)]
+    finally:
+        conn.close()
+
+
+def test_interrupted_ingest_resumes_without_duplicates(tmp_path, monkeypatch):
+    raw, db = tmp_path / "raw", tmp_path / "index.db"
+    _corpus(raw)
+    init_db(db)
+    _interrupted_ingest(raw, db, monkeypatch, stop_after=11)
+
+    conn = connect(db)
+    committed = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    run = conn.execute("SELECT status, bulk_load, files_done FROM ingest_runs").fetchall()
+    conn.close()
+    assert 0 < committed < FILES
+    assert run == [("running", 1, committed)]
+
+    ingest.ingest_all(raw, db, ocr_workers=0)
+    _check_index(db, FILES)
+
+
+def test_reopening_a_database_mid_bulk_load_restores_the_index(tmp_path, monkeypatch):
+    raw, db = tmp_path / "raw", tmp_path / "index.db"
+    _corpus(raw)
+    init_db(db)
+    _interrupted_ingest(raw, db, monkeypatch, stop_after=8)
+
+    conn = connect(db)
+    dropped = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name='documents_ai'").fetchone()[0]
+    committed = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    conn.close()
+    assert dropped == 0 and committed > 0
+
+    init_db(db)  # puts the triggers back and rebuilds what the bulk load deferred
+    conn = connect(db)
+    conn.execute("UPDATE ingest_runs SET status='complete'")  # the run itself is abandoned
+    conn.commit()
+    conn.close()
+    ingest.ingest_all(raw, db, ocr_workers=0, bulk_load=False)
+    _check_index(db, FILES)
+
+
+def test_other_raw_dir_finishes_an_interrupted_bulk_load(tmp_path, monkeypatch):
+    raw, db = tmp_path / "raw", tmp_path / "index.db"
+    _corpus(raw)
+    init_db(db)
+    _interrupted_ingest(raw, db, monkeypatch, stop_after=8)
+    conn = connect(db)
+    committed = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    conn.close()
+
+    other = tmp_path / "other"
+    _corpus(other, prefix="log", start=FILES)
+    ingest.ingest_all(other, db, ocr_workers=0)
+
+    conn = connect(db)
+    try:
+        conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('integrity-check')")
+        pages = committed + FILES
+        assert conn.execute("SELECT COUNT(*) FROM documents_fts WHERE documents_fts MATCH 'wire'").fetchone()[0] == pages
+        assert conn.execute("SELECT value FROM meta WHERE key='bulk_load'").fetchone() == (0,)
+    finally:
+        conn.close()
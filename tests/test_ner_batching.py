@@ -0,0 +1,89 @@
+import pytest
+import spacy
+
+import app.ingest as ingest
+from app.db import connect, init_db
+
+PEOPLE = ["Ghislaine Maxwell", "Jeffrey Epstein", "Jean-Luc Brunel", "Sarah Kellen"]
+ORGS = ["JP Morgan", "Southern Trust", "Deutsche Bank"]
+PLACES = ["Palm Beach", "Little St. James", "Teterboro"]
+
+
+@pytest.fixture
+def ruler_nlp(monkeypatch):
+    """A deterministic NER pipeline (entity ruler), so the test does not depend on a trained model."""
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [{"label": "PERSON", "pattern": p} for p in PEOPLE]
+        + [{"label": "ORG", "pattern": o} for o in ORGS]
+        + [{"label": "GPE", "pattern": g} for g in PLACES]
+    )
+    monkeypatch.setattr(ingest, "NLP", nlp)
+    return nlp
+
+
+def _corpus(raw):
+    raw.mkdir(parents=True)
+    for i in range(40):
+        names = [PEOPLE[i % 4], ORGS[i % 3], PLACES[(i // 2) % 3]]
+        body = f"Memo {i}: {names[0]} met {names[1]} staff in {names[2]} about the wire. " * 4
+        if i % 5 == 0:
+            body += f" Contact jeevacation{i % 3}@gmail.com, tail N{900 + i % 4}JE."
+        if i % 7 == 0:
+            body = "short note"  # below the NER threshold
+        if i % 9 == 4:
+            body = "Memo 0: " + (f"{PEOPLE[0]} met {ORGS[0]} staff in {PLACES[0]} about the wire. Memo 0: " * 4)
+        (raw / f"memo_{i:02d}.txt").write_text(body)
+
+
+def _dump(db):
+    conn = connect(db)
+    try:
+        return {
+            table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+            for table in ("entities", "doc_entities", "assets", "doc_assets", "entity_mentions", "asset_mentions")
+        } | {"documents": conn.execute("SELECT id, filename, content_hash, source_path FROM documents ORDER BY id").fetchall()}
+    finally:
+        conn.close()
+
+
+def _ingest(tmp_path, name):
+    db = tmp_path / f"{name}.db"
+    init_db(db)
+    ingest.ingest_all(tmp_path / "raw", db, ocr_workers=0)
+    return _dump(db)
+
+
+def test_batched_ner_matches_per_page_ner(tmp_path, monkeypatch, ruler_nlp):
+    _corpus(tmp_path / "raw")
+    batched = _ingest(tmp_path, "batched")
+    assert batched["doc_entities"] and batched["doc_assets"]
+    assert {r[2] for r in batched["entities"]} >= {"PERSON", "ORG", "GPE"}
+
+    # one NLP(text) call per page instead of NLP.pipe over the buffer
+    monkeypatch.setattr(
+        ingest, "extract_features_batch", lambda texts, **kw: [ingest.extract_features(t) for t in texts]
+    )
+    per_page = _ingest(tmp_path, "per_page")
+    assert per_page == batched
+
+
+def test_failed_batch_retried_per_file_matches(tmp_path, monkeypatch, ruler_nlp):
+    _corpus(tmp_path / "raw")
+    batched = _ingest(tmp_path, "batched")
+
+    # the first multi-page batch fails once, so flush() rolls back and goes file by file
+    real = ingest.extract_features_batch
+    calls = {"failed": False}
+
+    def flaky(texts, **kw):
+        if len(texts) > 1 and not calls["failed"]:
+            calls["failed"] = True
+            raise RuntimeError("NER worker died")
+        return real(texts, **kw)
+
+    monkeypatch.setattr(ingest, "extract_features_batch", flaky)
+    retried = _ingest(tmp_path, "retried")
+    assert calls["failed"]
+    assert retried == batched
@@ -0,0 +1,36 @@
+import time
+from concurrent.futures import Future
+
+import app.ingest as ingest
+from app import timing
+
+
+def test_pooled_ocr_time_is_recorded_in_the_parent(tmp_path, monkeypatch):
+    def slow_ocr(file):
+        time.sleep(0.05)
+        return "scanned page"
+
+    monkeypatch.setattr(ingest, "ocr_image", slow_ocr)
+    # what a worker sends back: the text and the seconds it spent on it
+    text, seconds = ingest._pooled_ocr(tmp_path / "HOUSE_OVERSIGHT_000100.jpg")
+    assert text == "scanned page" and seconds >= 0.05
+
+    timing.reset()
+    timing.enable(True)
+    try:
+        for _ in range(3):
+            fut = Future()
+            fut.set_result((text, seconds))
+            assert ingest._ocr_result(fut) == "scanned page"
+        stages = timing.snapshot()
+    finally:
+        timing.enable(False)
+        timing.reset()
+    assert stages["ocr"]["calls"] == 3
+    assert abs(stages["ocr"]["seconds"] - 3 * seconds) < 1e-5
+
+
+def test_record_is_off_with_the_timers():
+    timing.reset()
+    timing.record("ocr", 1.0)
+    assert timing.snapshot() == {}
@@ -0,0 +1,121 @@
+import numpy as np
+
+from app.pdd import _null_chunk, exact_p_values, permutation_null
+from app.postings import Postings
+
+
+def _postings(pages: int, crowding: np.ndarray, a: int, b: int, k: int) -> Postings:
+    """Two rows A and B with the given sizes and overlap, plus filler terms so page p holds crowding[p] terms."""
+    rows = [list(range(a)), list(range(a - k, a - k + b))]
+    fill = np.zeros(pages, dtype=np.int64)
+    for r in rows:
+        fill[r] += 1
+    assert (fill <= crowding).all()
+    for slot in range(int(crowding.max())):
+        rows.append([p for p in range(pages) if fill[p] <= slot < crowding[p]])
+    indptr = np.cumsum([0] + [len(r) for r in rows]).astype(np.int64)
+    names = [f"t{i}" for i in range(len(rows))]
+    return Postings(
+        scope="DOCS",
+        generation=None,
+        contexts=pages,
+        normalized=names,
+        rows={n: i for i, n in enumerate(names)},
+        indptr=indptr,
+        indices=np.concatenate([np.asarray(r, dtype=np.int32) for r in rows if r]),
+    )
+
+
+def _uniform_postings(pages: int, terms_per_page: int, a: int, b: int, k: int) -> Postings:
+    return _postings(pages, np.full(pages, terms_per_page), a, b, k)
+
+
+def _wallenius(n: int, m1: int, m2: int, odds: float) -> np.ndarray:
+    """pmf of how many of n successive weighted draws come from the m1 items of weight odds (the rest weigh 1)."""
+    pmf = np.zeros(n + 1)
+    pmf[0] = 1.0
+    for t in range(n):
+        i = np.arange(t + 1)
+        w1 = odds * (m1 - i)
+        p1 = w1 / (w1 + m2 - (t - i))
+        step = np.zeros(n + 1)
+        step[1:t + 2] += pmf[:t + 1] * p1
+        step[:t + 1] += pmf[:t + 1] * (1 - p1)
+        pmf = step
+    return pmf
+
+
+def _first_distinct(order: np.ndarray, m: int) -> np.ndarray:
+    _, first = np.unique(order, return_index=True)
+    return order[np.sort(first)[:m]]
+
+
+def _slot_shuffle_ks(crowding: np.ndarray, a: int, b: int, n: int, seed: int) -> np.ndarray:
+    """The null spelled out one permutation at a time: shuffle the slot list, A then B take their first distinct pages."""
+    rng = np.random.default_rng(seed)
+    owner = np.repeat(np.arange(len(crowding)), crowding)
+    ks = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        order = rng.permutation(len(owner))
+        taken_a = _first_distinct(owner[order], a)
+        # A holds one slot on each of its pages; B shuffles what is left
+        held = np.zeros(len(owner), dtype=bool)
+        held[np.searchsorted(owner, taken_a)] = True
+        rest = owner[~held]
+        taken_b = _first_distinct(rest[rng.permutation(len(rest))], b)
+        ks[i] = np.intersect1d(taken_a, taken_b).size
+    return ks
+
+
+def test_null_matches_exact_distribution_under_uniform_crowding():
+    # A lands on 300 uniform pages; each then has 9 free slots against 10 elsewhere,
+    # so B's hits on A's pages are Wallenius(300, 300, 700, 9/10)
+    pmf = _wallenius(300, 300, 700, 0.9)
+    mean = float((np.arange(301) * pmf).sum())
+    assert 84.4 < mean < 84.7  # below a*b/N = 90: A's own slot is not B's to take
+    for k in (70, 80, 84, 90, 100):
+        post = _uniform_postings(1000, 10, 300, 300, k)
+        assert (np.bincount(post.indices) == 10).all()
+        null = permutation_null(post, 0, 1, 4000, seed=3, workers=0, time_limit=60.0)
+        assert null.k == k and null.permutations == 4000
+        exact = float(pmf[k:].sum())
+        # 4 binomial standard errors of the exceedance count
+        assert abs(null.exceedances / 4000 - exact) < 4 * np.sqrt(exact * (1 - exact) / 4000) + 1e-3, k
+        assert abs(null.null_mean_k - mean) < 0.35
+    assert float(pmf[84:].sum()) < 0.6 < float(exact_p_values(1000, 300, 300, 84))
+
+
+def test_null_matches_a_literal_slot_shuffle_under_uneven_crowding():
+    rng = np.random.default_rng(5)
+    crowding = rng.choice([1, 1, 1, 2, 3, 5, 8, 20], size=1000)
+    crowding[:300] = np.maximum(crowding[:300], 2)  # room for the observed A and B
+    post = _postings(1000, crowding, 300, 300, 60)
+    assert (np.bincount(post.indices) == crowding).all()
+
+    null = permutation_null(post, 0, 1, 4000, seed=9, workers=0, time_limit=60.0)
+    literal = _slot_shuffle_ks(crowding, 300, 300, 2000, seed=10)
+    assert abs(null.null_mean_k - literal.mean()) < 4 * np.sqrt(literal.var() / 2000 + literal.var() / 4000)
+    p_literal = float((literal >= 60).mean())
+    assert abs(null.exceedances / 4000 - p_literal) < 4 * np.sqrt(p_literal * (1 - p_literal) * (1 / 2000 + 1 / 4000)) + 1e-3
+    # the crowded pages draw the overlaps, far above the independence model's a*b/N = 90
+    assert null.null_mean_k > 110
+
+
+def test_pages_with_one_term_never_hold_both():
+    # the 100 pages A and B share have room for two terms, the other 900 hold one
+    pages = np.arange(1000)
+    crowding = np.where((pages >= 300) & (pages < 400), 2, 1)
+    post = _postings(1000, crowding, 400, 400, 100)
+    slots = np.bincount(post.indices).astype(np.float32)
+    # no permutation reaches 101, where weighting pages by their term count alone
+    # (B blind to the slot A took) would average a*b/N = 160
+    n, exceed, total = _null_chunk(slots, np.random.SeedSequence(1), 400, 400, 101, 2000)
+    assert (n, exceed) == (2000, 0)
+    assert 0 < total / n < 100
+
+
+def test_null_is_reproducible_across_workers():
+    post = _uniform_postings(400, 4, 60, 50, 20)
+    inline = permutation_null(post, 0, 1, 600, seed=11, workers=0)
+    pooled = permutation_null(post, 0, 1, 600, seed=11, workers=2)
+    assert (inline.exceedances, inline.null_mean_k) == (pooled.exceedances, pooled.null_mean_k)
@@ -0,0 +1,86 @@
+import os
+
+from app.db import connect, init_db
+from app.ingest import ingest_all
+from app.pipeline import ingest_pipeline
+
+MEMO = "Memo {i}: wire to account {n} via jeevacation{m}@gmail.com, flight on N{t}JE to Teterboro. "
+
+
+def _write(path, text, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text) if isinstance(text, str) else path.write_bytes(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _corpus(raw):
+    for i in range(40):
+        _write(raw / "memos" / f"memo_{i:02d}.txt", MEMO.format(i=i, n=1000 + i, m=i % 3, t=900 + i % 4) * 3)
+    # copies of earlier pages, in another folder
+    for i in (3, 17, 29):
+        _write(raw / "copies" / f"copy_{i:02d}.txt", MEMO.format(i=i, n=1000 + i, m=i % 3, t=900 + i % 4) * 3)
+    # page images with a text rendition next to them are linked, never OCR'd
+    for bates in ("HOUSE_OVERSIGHT_000100", "HOUSE_OVERSIGHT_000101"):
+        _write(raw / "vol" / f"{bates}.txt", f"{bates}: the wire went out the day of the Palm Beach flight. " * 4)
+        _write(raw / "vol" / f"{bates}.jpg", b"\xff\xd8" + bates.encode() * 500)
+    _write(raw / "vol" / "tiny.png", b"\x89PNG" + b"0" * 100)  # below MIN_IMAGE_BYTES
+    _write(raw / "empty.txt", "")
+
+
+def _dump(db):
+    conn = connect(db)
+    try:
+        out = {
+            table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+            for table in (
+                "documents", "entities", "assets", "doc_entities", "doc_assets",
+                "entity_mentions", "asset_mentions", "duplicate_pages", "image_renditions",
+            )
+        }
+        out["manifest"] = conn.execute(
+            "SELECT path, size, mtime_ns, digest FROM ingest_manifest ORDER BY path"
+        ).fetchall()
+        out["fts"] = conn.execute(
+            "SELECT rowid FROM documents_fts WHERE documents_fts MATCH 'wire' ORDER BY rowid"
+        ).fetchall()
+        conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('integrity-check')")
+        return out
+    finally:
+        conn.close()
+
+
+def _both(tmp_path, raw):
+    serial, staged = tmp_path / "serial.db", tmp_path / "pipeline.db"
+    for db in (serial, staged):
+        if not db.exists():
+            init_db(db)
+    ingest_all(raw, serial, ocr_workers=0)
+    report = ingest_pipeline(raw, staged, workers=2, batch_size=7, queue_size=5)
+    return _dump(serial), _dump(staged), report
+
+
+def test_pipeline_and_serial_ingest_build_the_same_database(tmp_path):
+    raw = tmp_path / "raw"
+    _corpus(raw)
+    serial, staged, report = _both(tmp_path, raw)
+    assert staged == serial
+    assert len(serial["documents"]) == 40 + 2
+    assert len(serial["duplicate_pages"]) == 3
+    assert [r[:2] for r in serial["image_renditions"]] == [
+        ("vol/HOUSE_OVERSIGHT_000100.jpg", "vol/HOUSE_OVERSIGHT_000100.txt"),
+        ("vol/HOUSE_OVERSIGHT_000101.jpg", "vol/HOUSE_OVERSIGHT_000101.txt"),
+    ]
+    assert (report.inserted, report.reused) == (42, 2)
+
+    # second run: a changed original with a copy, a touched file, a new file
+    _write(raw / "memos" / "memo_17.txt", "Rewritten memo about the New Mexico ranch. " * 6)
+    memo_05 = raw / "memos" / "memo_05.txt"
+    _write(memo_05, memo_05.read_text(), mtime_ns=2_000_000_000)
+    _write(raw / "memos" / "memo_99.txt", MEMO.format(i=99, n=7, m=1, t=901) * 3)
+    serial, staged, report = _both(tmp_path, raw)
+    assert staged == serial
+    sources = {r[5] for r in serial["documents"]}
+    assert {"copies/copy_17.txt", "memos/memo_17.txt", "memos/memo_99.txt"} <= sources
+    assert len(serial["duplicate_pages"]) == 2
+    assert (report.inserted, report.unchanged) == (2, 48)
@@ -0,0 +1,81 @@
+from app.db import connect, init_db
+from app.ingest import ingest_all
+from app.search import RESULT_CACHE, keyword_search_page
+
+# bm25 depends only on term frequency and page length here, so every page of
+# one group ties with the rest of its group
+GROUPS = [
+    "wire transfer to the Southern Trust account",
+    "wire wire transfer to the account",
+    "the wire went out on the flight day with the pilots and staff",
+    "wire",
+]
+
+
+def _tied_index(tmp_path, pages: int = 130):
+    db = tmp_path / "search.db"
+    init_db(db)
+    conn = connect(db)
+    conn.executemany(
+        "INSERT INTO documents(filename, page, content) VALUES (?, ?, ?)",
+        [(f"f{i:03d}.txt", i, GROUPS[i % len(GROUPS)]) for i in range(pages)],
+    )
+    conn.commit()
+    conn.close()
+    return db
+
+
+def _walk(db, query: str, limit: int):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page = keyword_search_page(db, query, limit=limit, cursor=cursor)
+        rows += page.rows
+        pages += 1
+        if page.next_cursor is None:
+            return rows, pages
+        cursor = page.next_cursor
+
+
+def test_keyset_pages_cover_every_tied_hit_once_in_order(tmp_path):
+    db = _tied_index(tmp_path)
+    whole = keyword_search_page(db, "wire", limit=1000)
+    assert whole.next_cursor is None and whole.total == 130 == len(whole.rows)
+
+    conn = connect(db)
+    scores = [r[0] for r in conn.execute(
+        "SELECT bm25(documents_fts) FROM documents_fts WHERE documents_fts MATCH 'wire'"
+    )]
+    conn.close()
+    assert len(set(scores)) == len(GROUPS)  # four scores over 130 hits
+
+    for limit in (1, 7, 32, 129, 130):
+        rows, pages = _walk(db, "wire", limit)
+        assert rows == whole.rows, f"limit={limit}"
+        assert pages == -(-130 // limit)
+    assert len({r[0] for r in whole.rows}) == 130
+
+
+def test_ingest_invalidates_cached_results(tmp_path):
+    raw, db = tmp_path / "raw", tmp_path / "index.db"
+    raw.mkdir()
+    (raw / "a.txt").write_text("Wire transfer to the Southern Trust account in the islands. " * 5)
+    init_db(db)
+    ingest_all(raw, db, ocr_workers=0)
+
+    first = keyword_search_page(db, "wire", limit=10)
+    hits = RESULT_CACHE.hits
+    assert keyword_search_page(db, "wire", limit=10) is first
+    assert RESULT_CACHE.hits == hits + 1
+
+    # a write that does not bump the generation is not seen: the result really is cached
+    conn = connect(db)
+    conn.execute("INSERT INTO documents(filename, page, content) VALUES ('stray.txt', 1, 'wire')")
+    conn.commit()
+    conn.close()
+    assert keyword_search_page(db, "wire", limit=10).total == 1
+
+    (raw / "b.txt").write_text("A second wire went out the day of the Teterboro flight. " * 5)
+    ingest_all(raw, db, ocr_workers=0)
+    after = keyword_search_page(db, "wire", limit=10)
+    assert after.total == 3
+    assert {r[0] for r in after.rows} == {"a.txt", "b.txt", "stray.txt"}
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+
+import app.server as server_mod
+from app.db import connect, init_db
+from app.search import keyword_search_page
+from app.server import QueryServer
+
+PAGES = 250
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    db = tmp_path_factory.mktemp("server") / "index.db"
+    init_db(db)
+    conn = connect(db)
+    conn.executemany(
+        "INSERT INTO documents(filename, page, content) VALUES (?, ?, ?)",
+        [(f"memo_{i:03d}.txt", 1, f"wire number {i} to the Southern Trust account" + " wire" * (i % 5))
+         for i in range(PAGES)],
+    )
+    conn.commit()
+    conn.close()
+    return db
+
+
+@pytest.fixture
+def serve(db):
+    """Starts QueryServer on an ephemeral loopback port in a background loop."""
+    running = []
+
+    def start(**kw):
+        loop = asyncio.new_event_loop()
+        server = QueryServer(db, port=0, **kw)
+        loop.run_until_complete(server.start())
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        running.append((loop, thread, server))
+        return server
+
+    yield start
+    for loop, thread, server in running:
+        loop.call_soon_threadsafe(server.close)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+def _request(port: int, raw: bytes) -> bytes:
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as sock:
+        sock.sendall(raw)
+        out = b""
+        while chunk := sock.recv(65536):
+            out += chunk
+    return out
+
+
+def _get(port: int, target: str) -> bytes:
+    return _request(port, f"GET {target} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+
+
+def _split(response: bytes):
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:])}
+    return status, headers, body
+
+
+def _dechunk(body: bytes):
+    """Chunk payloads in order; fails unless the body is exactly well-formed chunked framing."""
+    chunks = []
+    while True:
+        size_line, sep, body = body.partition(b"\r\n")
+        assert sep, "chunk size line not terminated"
+        size = int(size_line, 16)
+        if size == 0:
+            assert body == b"\r\n", "missing or trailing data after the last chunk"
+            return chunks
+        assert body[size:size + 2] == b"\r\n", "chunk data not terminated by CRLF"
+        chunks.append(body[:size])
+        body = body[size + 2:]
+
+
+@pytest.mark.parametrize("host", ["0.0.0.0", "192.168.1.10", "::", "example.com"])
+def test_refuses_non_loopback_hosts(db, host):
+    with pytest.raises(ValueError, match="non-loopback"):
+        QueryServer(db, host=host, port=0)
+
+
+@pytest.mark.parametrize("host", ["127.0.0.1", "127.0.0.2", "::1", "localhost"])
+def test_accepts_loopback_hosts(db, host):
+    server = QueryServer(db, host=host, port=0)
+    server.close()
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", "+5", "1e3", "٣"])
+def test_bad_content_length_is_400(serve, length):
+    server = serve()
+    status, headers, body = _split(_request(
+        server.port,
+        f"POST /search HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n{{}}".encode(),
+    ))
+    assert status == 400
+    assert headers["connection"] == "close"
+    assert "content-length" in json.loads(body)["error"]
+
+
+def test_health_and_search(serve):
+    server = serve()
+    status, _, body = _split(_get(server.port, "/health"))
+    assert status == 200 and json.loads(body)["status"] == "ok"
+    status, _, body = _split(_get(server.port, "/search?q=wire&limit=5"))
+    data = json.loads(body)
+    assert status == 200 and len(data["hits"]) == 5 and data["total"] == PAGES
+    assert _split(_get(server.port, "/nope"))[0] == 404
+
+
+def test_full_queue_answers_503(serve, monkeypatch):
+    monkeypatch.setattr(server_mod, "MAX_PENDING", 1)
+    entered, release = threading.Event(), threading.Event()
+
+    def blocked(*args, **kw):
+        entered.set()
+        release.wait(10)
+        return keyword_search_page(*args, **kw)
+
+    monkeypatch.setattr(server_mod, "keyword_search_page", blocked)
+    server = serve(threads=1)
+
+    first = {}
+    holder = threading.Thread(target=lambda: first.update(r=_get(server.port, "/search?q=wire")))
+    holder.start()
+    assert entered.wait(10)
+    try:
+        status, _, body = _split(_get(server.port, "/health"))
+        assert status == 503
+        assert json.loads(body) == {"error": "server busy"}
+    finally:
+        release.set()
+        holder.join(10)
+    assert _split(first["r"])[0] == 200
+    # the slot is free again
+    assert _split(_get(server.port, "/health"))[0] == 200
+
+
+def test_search_stream_is_chunked_ndjson(serve, db, monkeypatch):
+    monkeypatch.setattr(server_mod, "STREAM_PAGE", 40)  # several pool tasks per stream
+    server = serve()
+    status, headers, body = _split(_get(server.port, "/search/stream?q=wire"))
+    assert status == 200
+    assert headers["content-type"] == "application/x-ndjson; charset=utf-8"
+    assert headers["transfer-encoding"] == "chunked"
+    assert "content-length" not in headers
+
+    chunks = _dechunk(body)
+    assert len(chunks) > 1
+    assert all(c.endswith(b"\n") for c in chunks)  # records never straddle a chunk
+    records = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+    whole = keyword_search_page(db, "wire", limit=PAGES)
+    assert [(r["filename"], r["page"], r["snippet"]) for r in records] == [tuple(r) for r in whole.rows]
+
+    status, _, body = _split(_get(server.port, "/search/stream?q=wire&max=7"))
+    assert status == 200
+    assert len(b"".join(_dechunk(body)).splitlines()) == 7
+
+
+def test_stream_with_bad_parameters_is_plain_400(serve):
+    server = serve()
+    status, headers, body = _split(_get(server.port, "/search/stream"))
+    assert status == 400
+    assert headers["content-type"].startswith("application/json")
+    assert json.loads(body) == {"error": "missing parameter: q"}